@@ -0,0 +1,100 @@
+"""
+Broker throughput with article texts inside task messages vs. claim-check
+mode, where the texts go to the blob store (Redis or disk) and messages carry
+only a reference.
+
+For each article size and mode, --messages process tasks are published to a
+scratch queue on the broker at MQ_URL, then drained with a plain consumer
+that resolves each text the way a worker does (no task runs). It reports
+publish and drain rates, message bytes and the bytes written to the blob
+store. The drain rate includes the blob fetch, so it is the rate at which
+workers could pick up articles.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_claim_check.py --messages 2000 --sizes 2 20 100
+"""
+import argparse
+import time
+import uuid
+
+from kombu import Exchange, Queue
+
+from common import load_corpus
+from src.app.worker import redis
+from src.app.worker.task import app, process
+from src.configs.app import app_settings
+from src.modules.blob_store import ClaimCheck
+
+
+def make_articles(count: int, size_kb: float):
+    """Sample articles repeated up to ``size_kb`` each; a counter keeps their blobs distinct"""
+    corpus = [article["text"] for article in load_corpus()]
+    target = int(size_kb * 1024)
+    articles = []
+    for i in range(count):
+        text = f"[{i}] " + corpus[i % len(corpus)]
+        while len(text) < target:
+            text += "\n\n" + corpus[(i + len(text)) % len(corpus)]
+        articles.append(text[:target])
+    return articles
+
+
+def run(mode: str, articles, batch: int):
+    claim_check = ClaimCheck(redis, mode=mode, min_bytes=app_settings.CLAIM_CHECK_MIN_BYTES)
+    name = f"bench.claimcheck.{uuid.uuid4().hex[:8]}"
+    queue = Queue(name, Exchange(name), routing_key=name)
+
+    start = time.perf_counter()
+    blob_bytes = 0
+    with app.producer_or_acquire() as producer:
+        for offset in range(0, len(articles), batch):
+            chunk = articles[offset:offset + batch]
+            for text, kwargs in zip(chunk, claim_check.check_in(chunk)):
+                if "text_ref" in kwargs:
+                    blob_bytes += len(text.encode("utf-8"))
+                process.apply_async(kwargs=kwargs, queue=queue, producer=producer)
+    publish_seconds = time.perf_counter() - start
+
+    message_bytes, received = 0, 0
+    start = time.perf_counter()
+    with app.connection_for_read() as connection:
+        simple = connection.SimpleQueue(queue)
+        while received < len(articles):
+            message = simple.get(timeout=10)
+            message_bytes += len(message.body)
+            kwargs = message.decode()[1]
+            if kwargs.get("text_ref"):
+                claim_check.check_out(kwargs["text_ref"])
+            message.ack()
+            received += 1
+        simple.queue.delete()
+        simple.close()
+    drain_seconds = time.perf_counter() - start
+    return {
+        "publish": len(articles) / publish_seconds,
+        "drain": len(articles) / drain_seconds,
+        "message_bytes": message_bytes / len(articles),
+        "blob_mb": blob_bytes / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[2, 20, 100], help="Article sizes in KB")
+    parser.add_argument("--mode", nargs="+", default=["off", "redis", "disk"], choices=["off", "redis", "disk"])
+    parser.add_argument("--batch", type=int, default=100, help="Articles stored per blob store round trip, as in /process/batch")
+    args = parser.parse_args()
+
+    print(f"{'size KB':>8}  {'mode':<6}{'publish/s':>11}{'drain/s':>10}{'msg bytes':>11}{'broker MB':>11}{'blob MB':>9}")
+    for size in args.sizes:
+        articles = make_articles(args.messages, size)
+        for mode in args.mode:
+            stats = run(mode, articles, args.batch)
+            broker_mb = stats["message_bytes"] * args.messages / 1024 / 1024
+            print(f"{size:>8g}  {mode:<6}{stats['publish']:>11.0f}{stats['drain']:>10.0f}"
+                  f"{stats['message_bytes']:>11.0f}{broker_mb:>11.1f}{stats['blob_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
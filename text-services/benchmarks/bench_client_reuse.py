@@ -0,0 +1,58 @@
+"""
+Per-task setup cost: building a fresh LLMClient for every task vs. reusing the
+per-process client from the registry.
+
+Only client/service construction is timed, no model request is sent, so any
+configured provider can be used offline (the default Ollama client does not
+connect on construction).
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_client_reuse.py --iterations 200
+"""
+import argparse
+import statistics
+import time
+
+from src.configs.app import app_settings
+from src.modules import client_registry
+from src.modules.model_factory import LLMClient
+from src.modules.text_processing_services import TextProcessingService
+
+
+def _time_calls(fn, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def per_task_client():
+    # Behaviour before the registry: every task built its own client and service
+    TextProcessingService(LLMClient())
+
+
+def registry_client():
+    client_registry.get_text_service()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    if not app_settings.LLM_PROVIDER:
+        app_settings.LLM_PROVIDER = "ollama"
+
+    client_registry.reset()
+    print(f"Provider: {app_settings.LLM_PROVIDER}, model: {app_settings.get_model_name()}")
+    print(f"{'mode':<18}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, fn in (("per-task client", per_task_client), ("registry", registry_client)):
+        timings = sorted(_time_calls(fn, args.iterations))
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(f"{name:<18}{statistics.mean(timings):>10.3f}{statistics.median(timings):>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Tail latency of LLM calls with and without hedged requests.
+
+Sends ``--calls`` summarize prompts through LLMClient with ``--concurrency``
+callers against the fake provider, whose latency is lognormal, first without
+and then with hedging. Reports p50/p95/p99/max latency, the share of extra
+requests and how often the hedge answered first.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_hedging.py --calls 2000 --latency-sigma 0.8 --percentile 95
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import add_fake_provider_args, load_corpus, percentile, use_fake_provider
+from src.configs.app import app_settings
+from src.configs._prompts import SUMMARIZE_PROMPT
+from src.modules.metrics import LLM_HEDGES
+
+
+def hedge_counts() -> dict:
+    counts = {}
+    for sample in list(LLM_HEDGES.collect())[0].samples:
+        if sample.name.endswith("_total"):
+            counts[sample.labels["outcome"]] = counts.get(sample.labels["outcome"], 0) + sample.value
+    return counts
+
+
+def run(hedging: bool, args, prompts) -> None:
+    app_settings.LLM_HEDGING_ENABLED = hedging
+    from src.modules.model_factory import LLMClient
+    client = LLMClient()
+    before = hedge_counts()
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        client.query(prompts[i % len(prompts)], operation="summarize")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = sorted(pool.map(one, range(args.calls)))
+
+    after = hedge_counts()
+    hedges = {outcome: after.get(outcome, 0) - before.get(outcome, 0) for outcome in ("won", "lost", "failed", "throttled")}
+    issued = hedges["won"] + hedges["lost"] + hedges["failed"]
+    print(f"hedging {'on' if hedging else 'off'}:")
+    print(f"  p50/p95/p99/max:  {percentile(latencies, 50) * 1000:,.0f} / {percentile(latencies, 95) * 1000:,.0f} / "
+          f"{percentile(latencies, 99) * 1000:,.0f} / {latencies[-1] * 1000:,.0f} ms")
+    if hedging:
+        print(f"  extra requests:   {issued / args.calls:.1%} ({hedges['throttled']:.0f} held back by the budget)")
+        print(f"  hedges won:       {hedges['won'] / issued:.0%}" if issued else "  hedges won:       n/a")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--percentile", type=float, default=95.0, help="Latency percentile that triggers a hedge")
+    parser.add_argument("--budget", type=float, default=0.05, help="Maximum extra requests per call")
+    parser.add_argument("--min-delay", type=float, default=0.0, help="Earliest hedge in seconds")
+    add_fake_provider_args(parser)
+    args = parser.parse_args()
+
+    use_fake_provider(args.latency_ms, args.latency_sigma, args.tokens_per_second, args.failure_rate, args.seed)
+    app_settings.LLM_HEDGE_PERCENTILE = args.percentile
+    app_settings.LLM_HEDGE_BUDGET = args.budget
+    app_settings.LLM_HEDGE_MIN_DELAY = args.min_delay
+    prompts = [SUMMARIZE_PROMPT.format(text=article["text"]) for article in load_corpus()]
+
+    for hedging in (False, True):
+        run(hedging, args, prompts)
+
+
+if __name__ == "__main__":
+    main()
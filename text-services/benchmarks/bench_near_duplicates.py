@@ -0,0 +1,136 @@
+"""
+Throughput, memory and accuracy of the near-duplicate index at scale.
+
+Indexes ``--articles`` synthetic articles (random text over the sample corpus
+vocabulary, regenerated from a per-article seed so nothing is held in memory),
+then queries edited copies of indexed articles (byline, trailing boilerplate
+and a few replaced words) and articles that were never indexed. Reports
+signature and index throughput, Redis memory per article, recall on the
+copies and false matches on the unseen articles.
+
+Needs the Redis server configured by REDIS_URL. Keys are written under a
+separate prefix and removed at the end unless --keep is given.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_near_duplicates.py --articles 1000000 --workers 8
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from redis import Redis
+
+from common import load_corpus, max_rss_mb
+from src.configs.app import app_settings
+from src.modules.near_duplicates import MinHasher, NearDuplicateIndex
+
+PREFIX = "bench:neardup"
+VARIANT = "summarize|bench|bench|1"
+
+
+def build_vocabulary():
+    words = {w.strip(".,;:!?\"'()").lower() for article in load_corpus() for w in article["text"].split()}
+    return sorted(w for w in words if w.isalpha())
+
+
+def article(vocabulary, index: int, words: int) -> str:
+    rng = random.Random(index)
+    return " ".join(rng.choices(vocabulary, k=words))
+
+
+def edited_copy(vocabulary, text: str, index: int, edit_rate: float) -> str:
+    rng = random.Random(-index - 1)
+    words = [rng.choice(vocabulary) if rng.random() < edit_rate else w for w in text.split()]
+    return ("By Staff Reporter, Example Wire. " + " ".join(words) +
+            " Copyright Example Wire. All rights reserved. Sign up for our newsletter.")
+
+
+def used_memory(redis: Redis) -> Optional[int]:
+    try:
+        return int(redis.info("memory")["used_memory"])
+    except Exception:
+        # Redis-compatible servers without INFO
+        return None
+
+
+def delete_prefix(redis: Redis) -> None:
+    batch = []
+    for key in redis.scan_iter(f"{PREFIX}:*", count=10000):
+        batch.append(key)
+        if len(batch) == 10000:
+            redis.unlink(*batch)
+            batch = []
+    if batch:
+        redis.unlink(*batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100000, help="Articles to index")
+    parser.add_argument("--words", type=int, default=400, help="Words per synthetic article")
+    parser.add_argument("--queries", type=int, default=2000, help="Edited copies and unseen articles to look up, each")
+    parser.add_argument("--edit-rate", type=float, default=0.005, help="Share of words replaced in the copies")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent Redis clients")
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--keep", action="store_true", help="Keep the index keys after the run")
+    args = parser.parse_args()
+
+    redis = Redis.from_url(app_settings.REDIS_URL)
+    delete_prefix(redis)
+    vocabulary = build_vocabulary()
+    # Long TTL so the whole run lands in one generation
+    index = NearDuplicateIndex(redis, hasher=MinHasher(num_perm=app_settings.NEAR_DUP_NUM_PERM),
+                               ttl=10 ** 9, prefix=PREFIX)
+    memory_before = used_memory(redis)
+
+    sign_time = add_time = 0.0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for start in range(0, args.articles, args.batch):
+            ids = range(start, min(start + args.batch, args.articles))
+            begin = time.perf_counter()
+            signatures = [index.signature(article(vocabulary, i, args.words)) for i in ids]
+            sign_time += time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            list(pool.map(lambda item: index.add(item[1], VARIANT, f"task-{item[0]}"), zip(ids, signatures)))
+            add_time += time.perf_counter() - begin
+            if (start // args.batch) % 50 == 0:
+                print(f"  indexed {ids[-1] + 1} articles")
+
+        memory_after = used_memory(redis)
+
+        rng = random.Random(0)
+        sources = [rng.randrange(args.articles) for _ in range(args.queries)]
+        copies = [index.signature(edited_copy(vocabulary, article(vocabulary, i, args.words), i, args.edit_rate))
+                  for i in sources]
+        unseen = [index.signature(article(vocabulary, args.articles + j, args.words)) for j in range(args.queries)]
+
+        begin = time.perf_counter()
+        copy_matches = list(pool.map(lambda signature: index.lookup(signature, VARIANT), copies))
+        unseen_matches = list(pool.map(lambda signature: index.lookup(signature, VARIANT), unseen))
+        lookup_time = time.perf_counter() - begin
+
+    found = sum(match is not None and match[0] == f"task-{i}" for i, match in zip(sources, copy_matches))
+    false_matches = sum(match is not None for match in unseen_matches)
+
+    print(f"articles indexed:      {args.articles}")
+    print(f"signatures/sec:        {args.articles / sign_time:,.0f} (one thread)")
+    print(f"index adds/sec:        {args.articles / add_time:,.0f} ({args.workers} clients)")
+    print(f"lookups/sec:           {2 * args.queries / lookup_time:,.0f} ({args.workers} clients)")
+    if memory_before is not None and memory_after is not None:
+        memory = memory_after - memory_before
+        print(f"redis memory:          {memory / 1024 / 1024:,.1f} MB ({memory / args.articles:,.0f} bytes/article)")
+    else:
+        print("redis memory:          n/a (server does not support INFO)")
+    print(f"recall on copies:      {found / args.queries:.1%}")
+    print(f"false matches:         {false_matches / args.queries:.2%}")
+    print(f"client max RSS:        {max_rss_mb():,.0f} MB")
+
+    if not args.keep:
+        delete_prefix(redis)
+
+
+if __name__ == "__main__":
+    main()
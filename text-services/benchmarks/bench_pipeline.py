@@ -0,0 +1,115 @@
+"""
+Offline throughput benchmark of the text pipeline on the fake local provider.
+
+Drives TextProcessingService directly and/or the Celery tasks (executed
+in-process with Task.apply, so no broker is needed) over the bundled news
+corpus at several concurrency levels, and reports articles/sec, latency
+percentiles, error count and memory. No network access is required, so the
+numbers are comparable across CI runs.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_pipeline.py --target service task \\
+        --operation process --concurrency 1 4 16 --articles 96 --json results.json
+"""
+import argparse
+import functools
+import json
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from common import add_fake_provider_args, load_corpus, max_rss_mb, percentile, use_fake_provider
+
+OPERATIONS = ("summarize", "categorize", "extract_keywords", "process")
+KEYWORD_OPERATIONS = ("extract_keywords", "process")
+
+
+def _is_error(result) -> bool:
+    if result is None:
+        return True
+    if isinstance(result, dict):
+        return result.get("status") == "ERROR"
+    return str(getattr(result.status, "value", result.status)) == "ERROR"
+
+
+def build_runner(target: str, operation: str, keyword_engine: Optional[str] = None):
+    options = {"keyword_engine": keyword_engine} if keyword_engine and operation in KEYWORD_OPERATIONS else {}
+    if target == "service":
+        from src.modules import client_registry
+        service = client_registry.get_text_service()
+        return functools.partial(getattr(service, operation), **options)
+
+    from src.app.worker import task as worker_tasks
+    celery_task = getattr(worker_tasks, operation)
+    return lambda text: celery_task.apply(kwargs={"text": text, **options}).get()
+
+
+def run_level(runner, articles, concurrency: int):
+    latencies = []
+    errors = 0
+
+    def one(article):
+        start = time.perf_counter()
+        result = runner(article["text"])
+        return time.perf_counter() - start, _is_error(result)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, failed in pool.map(one, articles):
+            latencies.append(latency * 1000)
+            errors += failed
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "articles": len(articles),
+        "articles_per_sec": len(articles) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "errors": errors,
+        "peak_alloc_mb": peak / 1024 / 1024,
+        "max_rss_mb": max_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", nargs="+", choices=("service", "task"), default=["service", "task"])
+    parser.add_argument("--operation", choices=OPERATIONS, default="process")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--keyword-engine", choices=("llm", "local", "hybrid"),
+                        help="Keyword engine for extract_keywords/process (default: KEYWORD_ENGINE)")
+    parser.add_argument("--articles", type=int, default=48, help="Articles per level (corpus is repeated)")
+    parser.add_argument("--json", help="Write the results to this file")
+    add_fake_provider_args(parser)
+    args = parser.parse_args()
+
+    use_fake_provider(args.latency_ms, args.latency_sigma, args.tokens_per_second, args.failure_rate, args.seed)
+    articles = load_corpus(args.articles)
+
+    results = []
+    print(f"{'target':<9}{'conc':>6}{'art/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'peak MB':>9}{'rss MB':>8}")
+    for target in args.target:
+        runner = build_runner(target, args.operation, args.keyword_engine)
+        for concurrency in args.concurrency:
+            row = {"target": target, "operation": args.operation, "keyword_engine": args.keyword_engine,
+                   **run_level(runner, articles, concurrency)}
+            results.append(row)
+            print(f"{target:<9}{concurrency:>6}{row['articles_per_sec']:>9.1f}{row['p50_ms']:>9.1f}"
+                  f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['errors']:>8}"
+                  f"{row['peak_alloc_mb']:>9.1f}{row['max_rss_mb']:>8.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput of LLM calls against a provider with limited capacity, with and
+without the client-side rate limiter.
+
+``--threads`` callers query the fake provider, which rejects calls beyond
+``--capacity`` concurrent ones with a 429, for ``--duration`` seconds. Failed
+calls are retried immediately, as an eager worker would. Reports successful
+calls/sec, 429s and, with the limiter, the adaptive concurrency limit once per
+second so its convergence to the capacity is visible.
+
+Needs the Redis server configured by REDIS_URL when the limiter is enabled.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_rate_limit.py --mode off on --threads 32 --capacity 8
+"""
+import argparse
+import threading
+import time
+
+from common import add_fake_provider_args, load_corpus, use_fake_provider
+from src.configs.app import app_settings
+from src.configs._prompts import SUMMARIZE_PROMPT
+from src.modules.fake_llm import FakeRateLimitError
+
+
+def run(mode: str, args, prompts) -> None:
+    app_settings.LLM_RATE_LIMIT_ENABLED = mode == "on"
+    from src.modules.model_factory import LLMClient
+    client = LLMClient()
+    limiter = client.rate_limiter
+    if limiter is not None:
+        limiter.redis.delete(limiter.leases_key, limiter.state_key, limiter.requests_key, limiter.tokens_key)
+
+    counts = {"ok": 0, "throttled": 0, "other": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + args.duration
+
+    def caller(offset: int) -> None:
+        i = offset
+        while time.monotonic() < stop:
+            try:
+                client.query(prompts[i % len(prompts)], operation="summarize")
+                outcome = "ok"
+            except FakeRateLimitError:
+                outcome = "throttled"
+            except Exception:
+                outcome = "other"
+            with lock:
+                counts[outcome] += 1
+            i += args.threads
+
+    threads = [threading.Thread(target=caller, args=(n,)) for n in range(args.threads)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    timeline = []
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(1)
+        if limiter is not None:
+            timeline.append(limiter.state()["limit"])
+    elapsed = time.monotonic() - start
+
+    print(f"limiter {mode}:")
+    print(f"  calls/sec:        {counts['ok'] / elapsed:,.1f}")
+    print(f"  429s:             {counts['throttled']}")
+    print(f"  other errors:     {counts['other']}")
+    if timeline:
+        print(f"  concurrency:      {' '.join(f'{limit:.1f}' for limit in timeline)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", nargs="+", choices=("off", "on"), default=["off", "on"])
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent callers")
+    parser.add_argument("--capacity", type=int, default=8, help="Concurrent calls the fake provider accepts")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per mode")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="Ceiling of the adaptive limit")
+    add_fake_provider_args(parser)
+    args = parser.parse_args()
+
+    use_fake_provider(args.latency_ms, args.latency_sigma, args.tokens_per_second, args.failure_rate, args.seed)
+    app_settings.FAKE_LLM_CAPACITY = args.capacity
+    app_settings.LLM_MAX_CONCURRENCY = args.max_concurrency
+    # Measure raw 429s: no retries inside LLMClient and no circuit breaker tripping
+    app_settings.TASK_RETRY_COUNT = 0
+    app_settings.LLM_BREAKER_FAILURES = 10 ** 9
+    prompts = [SUMMARIZE_PROMPT.format(text=article["text"]) for article in load_corpus()]
+
+    ideal = args.capacity / (args.latency_ms / 1000)
+    print(f"{args.threads} callers, provider capacity {args.capacity}, ideal {ideal:,.1f} calls/sec")
+    for mode in args.mode:
+        run(mode, args, prompts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Size and cost of task results in the Celery result backend: the previous
+payloads (nested status dict) as JSON vs. the normalized payload as JSON,
+msgpack and msgpack with zlib compression of large results.
+
+Results come from running the process task on the sample corpus with the
+local fake provider, so they carry real-looking summaries, keywords and
+usage. A second set replaces each summary with the full article, standing in
+for the long summaries of chunked documents. Each result is wrapped in the
+task meta Celery stores. With --redis, the metas are also written to the
+Redis at REDIS_URL and the growth of its used_memory is reported.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_result_storage.py --articles 200 --redis
+"""
+import argparse
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+from celery import states
+
+from common import load_corpus, use_fake_provider
+from src.configs.app import app_settings
+
+
+def legacy_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Shape written before the normalization, including the fields error payloads padded with
+    legacy = {field: payload.get(field, default) for field, default in (("summary", ""), ("category", ""), ("keywords", []))}
+    legacy["status"] = {"Status": payload["status"], "Status Message": payload.get("message", "")}
+    if "usage" in payload:
+        legacy["usage"] = payload["usage"]
+    return legacy
+
+
+def build_results(count: int) -> List[Dict[str, Any]]:
+    from src.app.worker.task import process
+    return [process(article["text"]) for article in load_corpus(count)]
+
+
+def serializers(compress_min_bytes: int) -> Dict[str, Tuple[Callable, Callable]]:
+    from src.app.worker import serialization
+
+    def compact_dumps(value):
+        app_settings.RESULT_COMPRESS_MIN_BYTES = compress_min_bytes
+        return serialization.dumps(value)
+
+    def msgpack_dumps(value):
+        app_settings.RESULT_COMPRESS_MIN_BYTES = 0
+        return serialization.dumps(value)
+
+    def json_dumps(value):
+        return json.dumps(value).encode("utf-8")
+
+    return {
+        "json": (json_dumps, json.loads),
+        "msgpack": (msgpack_dumps, serialization.loads),
+        "compact": (compact_dumps, serialization.loads),
+    }
+
+
+def measure(metas: List[Dict[str, Any]], dumps: Callable, loads: Callable, rounds: int) -> Dict[str, float]:
+    encoded = [dumps(meta) for meta in metas]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for meta in metas:
+            dumps(meta)
+    encode_us = (time.perf_counter() - start) / (rounds * len(metas)) * 1e6
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for raw in encoded:
+            loads(raw)
+    decode_us = (time.perf_counter() - start) / (rounds * len(metas)) * 1e6
+    return {
+        "encoded": encoded,
+        "bytes": sum(len(raw) for raw in encoded) / len(encoded),
+        "encode_us": encode_us,
+        "decode_us": decode_us,
+    }
+
+
+def redis_bytes_per_result(encoded: List[bytes], ttl: int) -> float:
+    """Growth of Redis used_memory per stored result, keys and expiry included"""
+    from src.app.worker import redis
+
+    prefix = f"bench:results:{uuid.uuid4()}:"
+    before = redis.info("memory")["used_memory"]
+    pipe = redis.pipeline(transaction=False)
+    for i, raw in enumerate(encoded):
+        pipe.set(f"{prefix}{i}", raw, ex=ttl)
+    pipe.execute()
+    after = redis.info("memory")["used_memory"]
+    redis.delete(*(f"{prefix}{i}" for i in range(len(encoded))))
+    return (after - before) / len(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20, help="Encode/decode passes timed per variant")
+    parser.add_argument("--compress-min-bytes", type=int, default=app_settings.RESULT_COMPRESS_MIN_BYTES)
+    parser.add_argument("--redis", action="store_true", help="Also measure memory in the Redis at REDIS_URL")
+    parser.add_argument("--budget-mb", type=float, default=1024, help="Redis memory used for the results-kept column")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    use_fake_provider(0, 0.0, 0, 0.0, args.seed)
+    from src.app.worker.task import app
+
+    results = build_results(args.articles)
+    long_results = [dict(result, summary=article["text"]) for result, article in zip(results, load_corpus(args.articles))]
+    codecs = serializers(args.compress_min_bytes)
+
+    def meta(payload):
+        return app.backend._get_result_meta(payload, states.SUCCESS, None, None)
+
+    print(f"{'results':<10}{'variant':<20}{'bytes':>8}{'ratio':>8}{'enc us':>9}{'dec us':>9}"
+          + (f"{'redis B':>10}{'kept/budget':>13}" if args.redis else ""))
+    for name, payloads in (("process", results), ("long", long_results)):
+        variants = (
+            ("legacy json", [meta(legacy_payload(p)) for p in payloads], "json"),
+            ("normalized json", [meta(p) for p in payloads], "json"),
+            ("msgpack", [meta(p) for p in payloads], "msgpack"),
+            (f"msgpack+zlib>={args.compress_min_bytes}", [meta(p) for p in payloads], "compact"),
+        )
+        baseline = None
+        for label, metas, codec in variants:
+            stats = measure(metas, *codecs[codec], args.rounds)
+            baseline = baseline or stats["bytes"]
+            line = (f"{name:<10}{label:<20}{stats['bytes']:>8.0f}{stats['bytes'] / baseline:>8.2f}"
+                    f"{stats['encode_us']:>9.1f}{stats['decode_us']:>9.1f}")
+            if args.redis:
+                per_result = redis_bytes_per_result(stats["encoded"], app_settings.RESULT_EXPIRES)
+                line += f"{per_result:>10.0f}{args.budget_mb * 1024 * 1024 / per_result:>13,.0f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
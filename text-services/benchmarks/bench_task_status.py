@@ -0,0 +1,87 @@
+"""
+Latency of GET /tasks/{task_id} under concurrency: the previous handler, which
+called the blocking AsyncResult.ready()/.get() on the event loop, vs. the
+asyncio Redis reader now used by the API.
+
+Both handlers run in-process over an ASGI transport against the Redis result
+backend configured by REDIS_URL, so only Redis needs to be reachable.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_task_status.py --requests 2000 --concurrency 50 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from celery.result import AsyncResult
+
+from src.app.worker.task import app as celery_app
+from src.main import app
+from src.schemas.task import TaskResult
+
+
+@app.get("/legacy/tasks/{task_id}", response_model=TaskResult, include_in_schema=False)
+async def legacy_get_task_result(task_id: str):
+    # Handler as it was before the asyncio Redis reader
+    task_result = AsyncResult(task_id, app=celery_app)
+    if task_result.ready():
+        if task_result.successful():
+            return TaskResult(status="SUCCESS", result=task_result.get())
+        return TaskResult(status="FAILURE", error=str(task_result.get(propagate=False)))
+    return TaskResult(status="PENDING")
+
+
+def seed_results(count: int):
+    task_ids = [str(uuid.uuid4()) for _ in range(count)]
+    for task_id in task_ids:
+        celery_app.backend.store_result(task_id, {"summary": "Seeded summary.", "status": "SUCCESS"}, "SUCCESS")
+    return task_ids
+
+
+async def run(path: str, task_ids, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"{path}/{task_ids[i % len(task_ids)]}")
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+async def run_all(args, task_ids):
+    print(f"{'handler':<10}{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for concurrency in args.concurrency:
+        for name, path in (("legacy", "/legacy/tasks"), ("async", "/tasks")):
+            stats = await run(path, task_ids, args.requests, concurrency)
+            print(f"{name:<10}{concurrency:>12}{stats['rps']:>10.0f}{stats['p50']:>10.2f}{stats['p99']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--seed", type=int, default=100, help="Number of stored task results to read")
+    args = parser.parse_args()
+
+    # One event loop for the whole run: the asyncio Redis client is bound to it
+    asyncio.run(run_all(args, seed_results(args.seed)))
+
+
+if __name__ == "__main__":
+    main()
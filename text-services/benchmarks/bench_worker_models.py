@@ -0,0 +1,117 @@
+"""
+Tasks/sec per GB of RAM of the worker execution models.
+
+Runs ``--tasks`` process tasks against the fake provider in forked worker
+processes, the way Celery runs them:
+
+- ``prefork``: ``--processes`` processes, each blocking on one task at a time
+  (Celery's default pool with ``--concurrency``)
+- ``threads``: one process with ``--threads`` threads blocking on their own
+  LLM calls (``--pool=threads`` with WORKER_EXECUTION=sync)
+- ``async``: one process with ``--threads`` threads whose LLM calls share the
+  process's event loop (``--pool=threads`` with WORKER_EXECUTION=async)
+
+Memory is the summed PSS (proportional set size, so pages shared after the
+fork are not counted twice) of the parent and the workers, measured while
+all of them are alive after the run.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_worker_models.py --mode prefork async --processes 8 --threads 64
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import add_fake_provider_args, load_corpus, use_fake_provider
+from src.configs.app import app_settings
+
+
+def pss_mb() -> float:
+    """Proportional set size of this process, falling back to RSS where smaps_rollup is unavailable"""
+    for path, field in (("/proc/self/smaps_rollup", "Pss:"), ("/proc/self/status", "VmRSS:")):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            continue
+    return 0.0
+
+
+def worker(texts, threads: int, execution: str, finished, measured, results) -> None:
+    app_settings.WORKER_EXECUTION = execution
+    from src.modules import client_registry
+    from src.app.worker.task import run_service
+    client_registry.reset()
+    service = client_registry.get_text_service()
+
+    def one(text: str) -> bool:
+        return run_service(service, "process", text).status.value == "SUCCESS"
+
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            ok = sum(pool.map(one, texts))
+    else:
+        ok = sum(one(text) for text in texts)
+    # Measure once every worker is done, then stay alive until all have measured
+    finished.wait()
+    results.put((ok, len(texts) - ok, pss_mb()))
+    measured.wait()
+
+
+def run(mode: str, args, texts) -> None:
+    processes = args.processes if mode == "prefork" else 1
+    threads = 1 if mode == "prefork" else args.threads
+    execution = "async" if mode == "async" else "sync"
+    context = multiprocessing.get_context("fork")
+    finished, measured = context.Barrier(processes + 1), context.Barrier(processes + 1)
+    results = context.Queue()
+
+    start = time.perf_counter()
+    children = [
+        context.Process(target=worker, args=(texts[n::processes], threads, execution, finished, measured, results))
+        for n in range(processes)
+    ]
+    for child in children:
+        child.start()
+    finished.wait()
+    elapsed = time.perf_counter() - start
+    reports = [results.get() for _ in children]
+    total_mb = pss_mb() + sum(report[2] for report in reports)
+    measured.wait()
+    for child in children:
+        child.join()
+
+    succeeded = sum(report[0] for report in reports)
+    rate = succeeded / elapsed
+    print(f"{mode} ({processes} process{'es' if processes > 1 else ''} x {threads} thread{'s' if threads > 1 else ''}):")
+    print(f"  tasks/sec:        {rate:,.1f}")
+    print(f"  errors:           {sum(report[1] for report in reports)}")
+    print(f"  memory (PSS):     {total_mb:,.0f} MB")
+    print(f"  tasks/sec per GB: {rate / (total_mb / 1024):,.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", nargs="+", choices=("prefork", "threads", "async"), default=["prefork", "async"])
+    parser.add_argument("--tasks", type=int, default=512)
+    parser.add_argument("--processes", type=int, default=8, help="Worker processes of the prefork mode")
+    parser.add_argument("--threads", type=int, default=64, help="Task threads of the threads and async modes")
+    add_fake_provider_args(parser)
+    args = parser.parse_args()
+
+    use_fake_provider(args.latency_ms, args.latency_sigma, args.tokens_per_second, args.failure_rate, args.seed)
+    app_settings.PROCESS_MODE = "multi"
+    texts = [article["text"] for article in load_corpus(args.tasks)]
+    # Import the pipeline before forking, as the Celery parent does
+    from src.app.worker import task  # noqa: F401
+
+    print(f"{args.tasks} process tasks, median LLM latency {args.latency_ms:.0f} ms")
+    for mode in args.mode:
+        run(mode, args, texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import json
+import resource
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from src.configs.app import app_settings
+
+CORPUS_PATH = Path(__file__).parent / "data" / "news_articles.json"
+
+
+def load_corpus(size: int = 0) -> List[Dict[str, str]]:
+    """Load the bundled sample articles, repeated or truncated to ``size`` entries when given"""
+    articles = json.loads(CORPUS_PATH.read_text())
+    if not size:
+        return articles
+    return [articles[i % len(articles)] for i in range(size)]
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def use_fake_provider(latency_ms: float, latency_sigma: float, tokens_per_second: float,
+                      failure_rate: float, seed: int) -> None:
+    """Point every LLMClient created afterwards at the deterministic local stub"""
+    app_settings.LLM_PROVIDER = "fake"
+    app_settings.FAKE_LLM_LATENCY_MS = latency_ms
+    app_settings.FAKE_LLM_LATENCY_SIGMA = latency_sigma
+    app_settings.FAKE_LLM_TOKENS_PER_SECOND = tokens_per_second
+    app_settings.FAKE_LLM_FAILURE_RATE = failure_rate
+    app_settings.FAKE_LLM_SEED = seed
+    # Repeated corpus entries must reach the model on every run
+    app_settings.RESULT_CACHE_ENABLED = False
+    app_settings.NEAR_DUP_ENABLED = False
+
+
+def add_fake_provider_args(parser) -> None:
+    group = parser.add_argument_group("fake provider")
+    group.add_argument("--latency-ms", type=float, default=200.0, help="Median model latency")
+    group.add_argument("--latency-sigma", type=float, default=0.3, help="Lognormal spread of the latency")
+    group.add_argument("--tokens-per-second", type=float, default=0.0, help="Output rate; 0 for instant output")
+    group.add_argument("--failure-rate", type=float, default=0.0, help="Probability that a call fails")
+    group.add_argument("--seed", type=int, default=0)
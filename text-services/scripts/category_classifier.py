@@ -0,0 +1,88 @@
+"""
+Train and evaluate the local category classifier used in front of the LLM.
+
+Training data is JSON lines of {"text": ..., "category": ...} as written by the
+worker when CATEGORY_SAMPLES_PATH is set, i.e. articles labelled by the LLM. A
+JSON array (such as benchmarks/data/news_articles.json) is accepted as well.
+
+``evaluate`` reports agreement with the LLM labels and, for each confidence
+threshold, the share of articles the classifier would answer on its own and
+its accuracy on that share. Pick CATEGORY_CLASSIFIER_THRESHOLD from that table.
+
+Usage:
+    PYTHONPATH=. python scripts/category_classifier.py train samples.jsonl -o category.npz
+    PYTHONPATH=. python scripts/category_classifier.py evaluate samples.jsonl -m category.npz
+    PYTHONPATH=. python scripts/category_classifier.py evaluate samples.jsonl --holdout 0.2
+"""
+import argparse
+import json
+import random
+from typing import Dict, List
+
+from src.modules.local_classifier import HashedCategoryClassifier, match_category
+
+
+def load_samples(path: str) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+    rows = json.loads(content) if content.startswith("[") else [json.loads(line) for line in content.splitlines() if line.strip()]
+    samples = []
+    for row in rows:
+        category = match_category(str(row.get("category", "")))
+        if row.get("text") and category is not None:
+            samples.append({"text": row["text"], "category": category.value})
+    return samples
+
+
+def train(samples: List[Dict[str, str]], args) -> HashedCategoryClassifier:
+    model = HashedCategoryClassifier(n_features=2 ** args.hash_bits)
+    return model.fit([s["text"] for s in samples], [s["category"] for s in samples], epochs=args.epochs,
+                     learning_rate=args.learning_rate, seed=args.seed)
+
+
+def evaluate(model: HashedCategoryClassifier, samples: List[Dict[str, str]], thresholds: List[float]) -> None:
+    predictions = [(*model.predict(s["text"]), s["category"]) for s in samples]
+    correct = sum(label == expected for label, _, expected in predictions)
+    print(f"samples: {len(samples)}  agreement with LLM: {correct / len(samples):.1%}")
+    print(f"{'threshold':>10}{'bypass':>10}{'accuracy':>10}")
+    for threshold in thresholds:
+        bypassed = [(label, expected) for label, confidence, expected in predictions if confidence >= threshold]
+        accuracy = sum(label == expected for label, expected in bypassed) / len(bypassed) if bypassed else 0.0
+        print(f"{threshold:>10.2f}{len(bypassed) / len(samples):>10.1%}{accuracy:>10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("samples", help="JSON lines (or JSON array) of LLM-labelled articles")
+    parser.add_argument("-o", "--output", default="category.npz", help="Where train writes the model")
+    parser.add_argument("-m", "--model", help="Model to evaluate; omitted means train on the non-holdout part first")
+    parser.add_argument("--holdout", type=float, default=0.0, help="Fraction of samples held out for evaluate")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--learning-rate", type=float, default=2.0)
+    parser.add_argument("--hash-bits", type=int, default=18)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.7, 0.8, 0.9, 0.95, 0.99])
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"No usable samples in {args.samples}")
+
+    if args.command == "train":
+        model = train(samples, args)
+        model.save(args.output)
+        print(f"Trained on {len(samples)} samples, saved to {args.output}")
+        return
+
+    random.Random(args.seed).shuffle(samples)
+    split = int(len(samples) * (1 - args.holdout)) if args.holdout else len(samples)
+    if args.model:
+        model = HashedCategoryClassifier.load(args.model)
+    else:
+        model = train(samples[:split], args)
+    evaluate(model, samples[split:] if args.holdout else samples, args.thresholds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Build or update the document-frequency table used by the local keyword engine.
+
+Input is JSON lines with a "text" field (or a JSON array of such objects, like
+benchmarks/data/news_articles.json). With --update the counts are added to the
+existing table, so the table can be refreshed from each day's articles.
+Terms seen in fewer than --min-df documents are dropped to keep the file small;
+the local engine treats unseen terms as rare.
+
+Usage:
+    PYTHONPATH=. python scripts/keyword_df.py articles.jsonl -o keyword_df.json
+    PYTHONPATH=. python scripts/keyword_df.py today.jsonl -o keyword_df.json --update
+"""
+import argparse
+import json
+import os
+from typing import Iterator
+
+from src.modules.keyword_extractor import LocalKeywordExtractor
+
+
+def iter_texts(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+    if content.startswith("["):
+        rows = json.loads(content)
+    else:
+        rows = (json.loads(line) for line in content.splitlines() if line.strip())
+    for row in rows:
+        if row.get("text"):
+            yield row["text"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("articles", nargs="+", help="JSON lines (or JSON array) files of articles")
+    parser.add_argument("-o", "--output", default="keyword_df.json")
+    parser.add_argument("--update", action="store_true", help="Add to the counts already in --output")
+    parser.add_argument("--min-df", type=int, default=1, help="Drop terms seen in fewer documents")
+    args = parser.parse_args()
+
+    table = None
+    if args.update and os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            table = json.load(f)
+
+    for path in args.articles:
+        table = LocalKeywordExtractor.build_table(iter_texts(path), table)
+
+    table["df"] = {term: count for term, count in table["df"].items() if count >= args.min_df}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    print(f"{table['documents']} documents, {len(table['df'])} terms written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import logging
+from typing import Any, Dict, List, Optional
+from celery import group
+from celery import states
+from celery.result import GroupResult
+from src.app.worker.task import app, claim_check, normalize_payload, summarize, categorize, extract_keywords, process
+from src.schemas.task import BatchStatus
+
+logger = logging.getLogger(__name__)
+
+BATCH_TASKS = {
+    "summarize": summarize,
+    "categorize": categorize,
+    "extract_keywords": extract_keywords,
+    "process": process,
+}
+# Tasks accepting a keyword_engine argument
+KEYWORD_TASKS = ("extract_keywords", "process")
+
+
+def submit_batch(operation: str, texts: List[str], keyword_engine: Optional[str] = None,
+                 publish_options: Optional[Dict[str, Any]] = None) -> GroupResult:
+    """
+    Enqueue one task per article as a single Celery group.
+
+    The group is published over one producer connection instead of one
+    apply_async round trip per article, and the GroupResult is saved in the
+    result backend so progress can be aggregated later from its ID alone.
+
+    Args:
+        operation (str): One of BATCH_TASKS
+        texts (List[str]): Article texts, in request order
+        keyword_engine (str): Keyword engine for extract_keywords and process tasks
+        publish_options (Dict[str, Any]): apply_async options for every task, such as priority
+
+    Returns:
+        GroupResult: The saved group, whose children follow the order of ``texts``
+    """
+    task = BATCH_TASKS[operation]
+    options = {"keyword_engine": keyword_engine} if keyword_engine and operation in KEYWORD_TASKS else {}
+    # In claim-check mode large texts go to the blob store and the messages carry references
+    group_result = group(task.s(**kwargs, **options) for kwargs in claim_check.check_in(texts)).apply_async(
+        **(publish_options or {})
+    )
+    group_result.save(backend=app.backend)
+    logger.info(f"Submitted batch {group_result.id} with {len(texts)} {operation} tasks")
+    return group_result
+
+
+def _is_error_payload(result: Any) -> bool:
+    return isinstance(result, dict) and normalize_payload(result).get("status") == "ERROR"
+
+
+def get_batch_status(batch_id: str) -> Optional[BatchStatus]:
+    """
+    Aggregate the state of every task in a batch.
+
+    Task metadata is fetched with one MGET against the result backend rather
+    than one round trip per task. Tasks store their own errors as ERROR
+    payloads in the SUCCESS state, so those count as failed.
+
+    Args:
+        batch_id (str): ID returned by submit_batch
+
+    Returns:
+        BatchStatus: Counts per state, or None if the batch is unknown
+    """
+    group_result = GroupResult.restore(batch_id, app=app, backend=app.backend)
+    if group_result is None:
+        return None
+
+    task_ids = [result.id for result in group_result.results]
+    backend = app.backend
+    metas = backend.mget([backend.get_key_for_task(task_id) for task_id in task_ids]) if task_ids else []
+
+    counts = {"pending": 0, "started": 0, "successful": 0, "failed": 0}
+    for raw in metas:
+        meta = backend.decode_result(raw) if raw else {"status": states.PENDING}
+        state = meta["status"]
+        if state == states.SUCCESS and _is_error_payload(meta.get("result")):
+            counts["failed"] += 1
+        elif state == states.SUCCESS:
+            counts["successful"] += 1
+        elif state in states.PROPAGATE_STATES:
+            counts["failed"] += 1
+        elif state in (states.STARTED, states.RETRY):
+            counts["started"] += 1
+        else:
+            counts["pending"] += 1
+
+    return BatchStatus(
+        batch_id=batch_id,
+        total=len(task_ids),
+        completed=counts["successful"] + counts["failed"] == len(task_ids),
+        **counts,
+    )
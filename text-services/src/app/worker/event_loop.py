@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import TimeoutError
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+# One loop per worker process, running in a daemon thread. Created lazily so a
+# prefork parent never starts a thread its forked children would inherit dead.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _start() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def serve() -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    threading.Thread(target=serve, name="worker-event-loop", daemon=True).start()
+    ready.wait()
+    logger.info(f"Started worker event loop in process {os.getpid()}")
+    return loop
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's background event loop, starting it on first use"""
+    global _loop, _loop_pid
+    with _lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = _start()
+            _loop_pid = os.getpid()
+        return _loop
+
+
+def run(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run ``coro`` on the worker event loop and block the calling thread for its result.
+
+    Every Celery thread of a process submits to the same loop, so their LLM
+    calls are multiplexed over one set of connections instead of each thread
+    holding one open.
+
+    Args:
+        coro: The coroutine to run, e.g. ``service.aprocess(text)``
+        timeout (float): Seconds to wait; the coroutine is cancelled when it expires
+
+    Returns:
+        The coroutine's result
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
@@ -0,0 +1,306 @@
+import json
+import time
+import uuid
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from celery import states
+from celery.result import AsyncResult, GroupResult
+from src.app.worker import redis
+from src.app.worker.batch import BATCH_TASKS, KEYWORD_TASKS
+from src.app.worker.task import app, claim_check, get_text_service, task_payload, usage_ledger
+from src.configs.app import app_settings
+from src.modules.batch_providers import get_batch_provider
+from src.modules.keyword_extractor import get_keyword_extractor
+from src.modules.metrics import OFFLINE_REQUESTS, PARSE_LATENCY
+from src.modules.response_parsers import parse_process_response
+from src.modules.text_processing_services import MAX_KEYWORDS, TextProcessingService
+from src.modules.usage import UsageTracker, record_preprocessing, track_usage
+from src.schemas.model import Status
+
+logger = logging.getLogger(__name__)
+
+# Result fields of each operation's task payload
+RESULT_FIELDS = {
+    "summarize": ("summary",),
+    "categorize": ("category",),
+    "extract_keywords": ("keywords",),
+    "process": ("summary", "category", "keywords"),
+}
+# Provider jobs and queued articles outlive the 24h completion window of the batch APIs
+_JOB_TTL = 2 * 86400
+
+
+def _queue_key(operation: str, keyword_engine: str) -> str:
+    return f"offline:queue:{operation}:{keyword_engine}"
+
+
+def _job_key(job_id: str) -> str:
+    return f"offline:job:{job_id}"
+
+
+def submit_offline_batch(operation: str, texts: List[str], keyword_engine: Optional[str] = None,
+                         publish_options: Optional[Dict[str, Any]] = None) -> GroupResult:
+    """
+    Queue articles for the provider's batch interface instead of one task each.
+
+    Articles are collected per operation for OFFLINE_COLLECT_WINDOW seconds and
+    then submitted as one provider job; results are stored under the task IDs
+    returned here, so the usual task and batch endpoints report them.
+
+    Args:
+        operation (str): One of BATCH_TASKS
+        texts (List[str]): Article texts, in request order
+        keyword_engine (str): Keyword engine for extract_keywords and process
+        publish_options (Dict[str, Any]): apply_async options for articles that fall back to regular tasks
+
+    Returns:
+        GroupResult: The saved group, whose children follow the order of ``texts``
+    """
+    keyword_engine = (keyword_engine or app_settings.KEYWORD_ENGINE) if operation in KEYWORD_TASKS else "-"
+    task_ids = [str(uuid.uuid4()) for _ in texts]
+    group_result = GroupResult(str(uuid.uuid4()), [AsyncResult(task_id, app=app) for task_id in task_ids], app=app)
+    group_result.save(backend=app.backend)
+
+    queue_key = _queue_key(operation, keyword_engine)
+    pipe = redis.pipeline(transaction=False)
+    for task_id, text in zip(task_ids, texts):
+        pipe.rpush(queue_key, json.dumps({"task_id": task_id, "text": text, "options": publish_options or {}}))
+    pipe.expire(queue_key, _JOB_TTL)
+    pipe.execute()
+
+    # The first article of a window schedules the flush that collects everything queued until then
+    if redis.set(f"{queue_key}:flush", 1, nx=True, ex=app_settings.OFFLINE_COLLECT_WINDOW * 2):
+        flush_offline_queue.apply_async(args=[operation, keyword_engine], countdown=app_settings.OFFLINE_COLLECT_WINDOW)
+    logger.info(f"Queued batch {group_result.id} with {len(texts)} {operation} articles for offline processing")
+    return group_result
+
+
+def _tenant(entry: Dict[str, Any]) -> str:
+    return (entry["options"].get("headers") or {}).get("tenant") or "anonymous"
+
+
+def _store(task_id: str, operation: str, result, usage: UsageTracker, tenant: str) -> None:
+    # Same usage reporting as the with_usage decorator of the regular tasks
+    succeeded = result.status == Status.SUCCESS
+    payload = task_payload(
+        result.status,
+        "Processed through the provider batch interface" if succeeded else "Offline processing failed",
+        **{field: getattr(result, field) for field in RESULT_FIELDS[operation]},
+    )
+    payload["usage"] = usage.to_dict()
+    app.backend.store_result(task_id, payload, states.SUCCESS)
+    usage_ledger.record(tenant, operation, usage)
+
+
+def _run_online(entry: Dict[str, Any], operation: str, keyword_engine: str) -> None:
+    # A regular task under the original ID, so callers polling it never notice the fallback
+    kwargs = claim_check.check_in([entry["text"]])[0]
+    if operation in KEYWORD_TASKS:
+        kwargs["keyword_engine"] = keyword_engine
+    BATCH_TASKS[operation].apply_async(kwargs=kwargs, task_id=entry["task_id"], **entry["options"])
+
+
+def _route(service: TextProcessingService, operation: str, text: str, keyword_engine: str) -> Tuple[str, Any]:
+    if operation != "categorize" and len(service._split(text)) > 1:
+        return "online", None
+    # Same prompts as the online calls: the article prefix, then the operation's instructions
+    prefix = service.prompts.article(text)
+    if operation == "summarize":
+        return "batch", (service.prompts.summarize_instructions, prefix)
+    if operation == "categorize":
+        local = service._local_category(text)
+        if local is not None:
+            return "local", local
+        return "batch", (service.prompts.category_instructions, prefix)
+    if operation == "process":
+        return "batch", (service.prompts.process_instructions, prefix)
+    if keyword_engine == "local":
+        keywords = get_keyword_extractor().extract(text, top_k=MAX_KEYWORDS)
+        return "local", service._keywords_result(keywords, keyword_engine, "")
+    if keyword_engine == "hybrid":
+        candidates, prompt = service._rerank_prompt(text)
+        if prompt is None:
+            return "local", service._keywords_result(candidates, keyword_engine, "")
+        return "batch", (prompt, None)
+    return "batch", (service.prompts.extract_keywords_instructions, prefix)
+
+
+def _prepare(service: TextProcessingService, operation: str, text: str,
+             keyword_engine: str) -> Tuple[str, Any, str, int]:
+    """
+    Decide how an article is answered.
+
+    Returns ("batch", (instructions, prefix)) for the provider job, ("local", result) when no
+    model call is needed and ("online", None) for articles the batch path
+    does not cover, such as articles that need chunking, each followed by
+    the preprocessed article text and the estimated tokens preprocessing removed.
+    """
+    text, removed = service._prepare(text, operation)
+    return (*_route(service, operation, text, keyword_engine), text, removed)
+
+
+def _finish(service: TextProcessingService, operation: str, text: str, keyword_engine: str, response: str):
+    """Turn a batched completion into the result the per-article service method would return"""
+    if operation == "summarize":
+        return service._summary_result(response)
+    if operation == "categorize":
+        return service._category_result(text, response)
+    if operation == "extract_keywords":
+        if keyword_engine == "hybrid":
+            candidates, _ = service._rerank_prompt(text)
+            return service._keywords_result(service._apply_rerank(candidates, response), keyword_engine, response)
+        keywords, response = service._parse_keywords(response)
+        return service._keywords_result(keywords, keyword_engine, response)
+
+    with PARSE_LATENCY.labels("process").time():
+        parsed = parse_process_response(response)
+    results, missing = service._single_call_results(parsed, keyword_engine)
+    if missing:
+        # Same fill-in as the single-call mode; local keywords cost no model call
+        results.update(service._run_sub_tasks(text, missing, keyword_engine))
+    return service._process_result(results)
+
+
+def _call_operation(operation: str, keyword_engine: str) -> str:
+    # Operation label of the model calls, as the online keyword reranking reports it
+    return "rerank_keywords" if operation == "extract_keywords" and keyword_engine == "hybrid" else operation
+
+
+def _record_answer_usage(client, usage: UsageTracker, tokens: Dict[str, Any], operation: str) -> None:
+    if "calls" not in tokens:
+        client._record_token_usage(client.backends[0], tokens, operation, tokens.get("estimated", False))
+        return
+    # Made through LLMClient.query when submitted: the token metrics counted them then
+    for provider, model, calls, input_tokens, output_tokens, cached_tokens in tokens["calls"]:
+        usage.add(provider, model, operation, input_tokens, output_tokens, cached_tokens, tokens["estimated"], calls)
+
+
+def _submit_job(service: TextProcessingService, operation: str, keyword_engine: str,
+                entries: List[Dict[str, Any]]) -> None:
+    provider = get_batch_provider(service.llm_client, redis)
+    requests, pending = [], {}
+    for entry in entries:
+        try:
+            route, value, text, removed = _prepare(service, operation, entry["text"], keyword_engine)
+        except Exception as e:
+            logger.error(f"Error preparing offline request {entry['task_id']}: {str(e)}")
+            route, value, text, removed = "online", None, entry["text"], 0
+        OFFLINE_REQUESTS.labels(provider.name, operation, route).inc()
+        if route == "local":
+            usage = UsageTracker()
+            usage.add_removed(removed)
+            _store(entry["task_id"], operation, value, usage, _tenant(entry))
+        elif route == "online":
+            _run_online(entry, operation, keyword_engine)
+        else:
+            requests.append((entry["task_id"], *value))
+            # Results are read against the text the prompt was built from
+            pending[entry["task_id"]] = {**entry, "text": text, "tokens_removed": removed}
+    if not requests:
+        return
+
+    try:
+        job_id = provider.submit(requests, _call_operation(operation, keyword_engine))
+    except Exception as e:
+        logger.error(f"Error submitting {provider.name} batch, running {len(requests)} articles online: {str(e)}")
+        for entry in pending.values():
+            _run_online(entry, operation, keyword_engine)
+        return
+    job = {
+        "provider": provider.name,
+        "operation": operation,
+        "keyword_engine": keyword_engine,
+        "submitted_at": time.time(),
+        "entries": pending,
+    }
+    redis.set(_job_key(job_id), json.dumps(job), ex=_JOB_TTL)
+    logger.info(f"Submitted {provider.name} batch job {job_id} with {len(requests)} {operation} requests")
+    poll_offline_job.apply_async(args=[job_id], countdown=app_settings.OFFLINE_POLL_INTERVAL)
+
+
+@app.task(name="app.worker.offline_flush")
+def flush_offline_queue(operation: str, keyword_engine: str) -> int:
+    """
+    Submit every article queued for ``operation`` as provider batch jobs.
+
+    Returns:
+        int: Number of articles collected
+    """
+    queue_key = _queue_key(operation, keyword_engine)
+    # Articles queued from now on schedule the next flush
+    redis.delete(f"{queue_key}:flush")
+    service = get_text_service()
+    collected = 0
+    while True:
+        raw = redis.lpop(queue_key, app_settings.OFFLINE_BATCH_MAX_REQUESTS)
+        if not raw:
+            break
+        collected += len(raw)
+        _submit_job(service, operation, keyword_engine, [json.loads(item) for item in raw])
+    return collected
+
+
+@app.task(name="app.worker.offline_poll")
+def poll_offline_job(job_id: str) -> Optional[int]:
+    """
+    Check a provider batch job and store its results once it has ended.
+
+    Unfinished jobs are checked again after OFFLINE_POLL_INTERVAL seconds.
+    Articles the provider failed, or whose job ran past OFFLINE_MAX_WAIT, are
+    re-run as regular tasks under the same task ID.
+
+    Returns:
+        int: Number of results stored, or None while the job is running
+    """
+    raw = redis.get(_job_key(job_id))
+    if raw is None:
+        logger.warning(f"Offline batch job {job_id} not found")
+        return 0
+    job = json.loads(raw)
+    operation, keyword_engine, entries = job["operation"], job["keyword_engine"], job["entries"]
+    service = get_text_service()
+    provider = get_batch_provider(service.llm_client, redis)
+
+    results, done = {}, True
+    if provider.name != job["provider"]:
+        logger.error(f"Batch job {job_id} belongs to {job['provider']}, now configured: {provider.name}")
+    else:
+        try:
+            done = provider.poll(job_id)
+            if done:
+                results = provider.results(job_id)
+        except Exception as e:
+            logger.error(f"Error polling batch job {job_id}: {str(e)}")
+            done = False
+    if not done:
+        if time.time() - job["submitted_at"] < app_settings.OFFLINE_MAX_WAIT:
+            poll_offline_job.apply_async(args=[job_id], countdown=app_settings.OFFLINE_POLL_INTERVAL)
+            return None
+        logger.warning(f"Batch job {job_id} unfinished after {app_settings.OFFLINE_MAX_WAIT}s, running it online")
+
+    client = service.llm_client
+    call_operation = _call_operation(operation, keyword_engine)
+    stored = 0
+    for task_id, entry in entries.items():
+        answer = results.get(task_id)
+        result = None
+        with track_usage() as usage:
+            record_preprocessing(entry.get("tokens_removed", 0))
+            if answer is not None:
+                response, tokens = answer
+                _record_answer_usage(client, usage, tokens, call_operation)
+                try:
+                    # Fill-in calls of a partial process answer add to the same usage
+                    result = _finish(service, operation, entry["text"], keyword_engine, response)
+                except Exception as e:
+                    logger.error(f"Error reading batched result {task_id}: {str(e)}")
+        if result is not None and result.status == Status.SUCCESS:
+            _store(task_id, operation, result, usage, _tenant(entry))
+            stored += 1
+            OFFLINE_REQUESTS.labels(provider.name, operation, "completed").inc()
+        else:
+            _run_online(entry, operation, keyword_engine)
+            OFFLINE_REQUESTS.labels(provider.name, operation, "failed").inc()
+    redis.delete(_job_key(job_id))
+    logger.info(f"Batch job {job_id}: stored {stored} of {len(entries)} results")
+    return stored
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+from celery import states
+from redis.asyncio import Redis as AsyncRedis
+from src.app.worker.task import app
+from src.configs.app import app_settings
+from src.schemas.task import TaskResult
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("SUCCESS", "FAILURE")
+
+
+class TaskResultStore:
+    """
+    Non-blocking reader for task results in the Celery Redis result backend.
+
+    ``AsyncResult.ready()``/``.get()`` issue synchronous Redis calls that stall
+    the event loop. This reads the same task meta keys through an asyncio Redis
+    client and decodes them with the backend's own serializer.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.backend = app.backend
+        self.redis_url = redis_url or app_settings.REDIS_URL
+        self._client = None
+        self._loop = None
+
+    @property
+    def client(self) -> AsyncRedis:
+        # asyncio connections are bound to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = AsyncRedis.from_url(self.redis_url)
+            self._loop = loop
+        return self._client
+
+    def _to_task_result(self, raw: Optional[bytes], intermediate: bool = False) -> TaskResult:
+        """
+        Map a stored task meta to the API result.
+
+        Unfinished tasks are reported as PENDING unless ``intermediate`` is set,
+        in which case the Celery state (STARTED, RETRY, ...) is passed through.
+        """
+        if raw is None:
+            return TaskResult(status="PENDING")
+        meta = self.backend.decode_result(raw)
+        state = meta.get("status")
+        if state == states.SUCCESS:
+            return TaskResult(status="SUCCESS", result=meta.get("result"))
+        if state in states.READY_STATES:
+            error = self.backend.exception_to_python(meta.get("result"))
+            return TaskResult(status="FAILURE", error=str(error))
+        return TaskResult(status=state if intermediate and state else "PENDING")
+
+    async def get(self, task_id: str) -> TaskResult:
+        raw = await self.client.get(self.backend.get_key_for_task(task_id))
+        return self._to_task_result(raw)
+
+    async def get_many(self, task_ids: List[str]) -> Dict[str, TaskResult]:
+        """Fetch many results with a single MGET"""
+        if not task_ids:
+            return {}
+        raws = await self.client.mget([self.backend.get_key_for_task(task_id) for task_id in task_ids])
+        return {task_id: self._to_task_result(raw) for task_id, raw in zip(task_ids, raws)}
+
+    async def stream(self, task_id: str, timeout: float, keepalive: float = 15.0) -> AsyncIterator[Optional[TaskResult]]:
+        """
+        Yield the task's state transitions until it finishes.
+
+        The Redis result backend publishes every stored meta on a channel named
+        after the task key, so one subscription replaces per-client polling. The
+        channel is subscribed before the current state is read so no transition
+        is missed in between.
+
+        Args:
+            task_id (str): Task to follow
+            timeout (float): Seconds to wait for a final state before yielding TIMEOUT
+            keepalive (float): Seconds of silence after which None is yielded
+
+        Yields:
+            TaskResult: Current state first, then each transition; None as a keepalive
+        """
+        key = self.backend.get_key_for_task(task_id)
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(key)
+        try:
+            current = self._to_task_result(await self.client.get(key), intermediate=True)
+            yield current
+            if current.status in FINAL_STATUSES:
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    yield TaskResult(status="TIMEOUT", error="Task processing timed out")
+                    return
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=min(remaining, keepalive))
+                if message is None:
+                    yield None
+                    continue
+                update = self._to_task_result(message["data"], intermediate=True)
+                if update.status == current.status and update.status not in FINAL_STATUSES:
+                    continue
+                current = update
+                yield current
+                if current.status in FINAL_STATUSES:
+                    return
+        finally:
+            await pubsub.reset()
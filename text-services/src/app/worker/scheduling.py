@@ -0,0 +1,76 @@
+import math
+import time
+import logging
+from typing import Any, Dict, Optional
+from redis import Redis
+from src.configs.app import app_settings
+
+logger = logging.getLogger(__name__)
+
+# RabbitMQ priority bands (higher runs first); every interactive task outranks every bulk task
+PRIORITY_TIERS = {
+    "interactive": (5, 9),
+    "bulk": (0, 4),
+}
+MAX_PRIORITY = 9
+
+
+class FairShareScheduler:
+    """
+    Assigns RabbitMQ message priorities per request.
+
+    The tier (interactive or bulk) selects a priority band. Within the band a
+    tenant drops one level each time its number of tasks submitted over the
+    last ``window`` seconds doubles beyond ``unit``, so a tenant running a
+    backfill queues behind tenants submitting a few articles. Usage is a
+    sliding-window count in Redis that decays on its own; if Redis is
+    unavailable the top of the band is used.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        window: Optional[int] = None,
+        unit: Optional[int] = None,
+        prefix: str = "sched:usage",
+    ):
+        self.redis = redis
+        self.window = window or app_settings.FAIR_SHARE_WINDOW
+        self.unit = unit or app_settings.FAIR_SHARE_UNIT
+        self.prefix = prefix
+
+    def record(self, tenant: str, count: int = 1) -> float:
+        """Add ``count`` submissions for ``tenant`` and return its usage over the last window"""
+        now = time.time()
+        slot = int(now // self.window)
+        current_key = f"{self.prefix}:{tenant}:{slot}"
+        pipe = self.redis.pipeline()
+        pipe.incrby(current_key, count)
+        pipe.expire(current_key, 2 * self.window)
+        pipe.get(f"{self.prefix}:{tenant}:{slot - 1}")
+        current, _, previous = pipe.execute()
+        # Weight the previous slot by how much of it still lies inside the window
+        overlap = 1 - (now % self.window) / self.window
+        return int(current) + int(previous or 0) * overlap
+
+    def priority(self, tenant: str, tier: str, count: int = 1) -> int:
+        low, high = PRIORITY_TIERS[tier]
+        try:
+            usage = self.record(tenant, count)
+        except Exception as e:
+            logger.warning(f"Fair-share usage update failed for tenant {tenant}: {str(e)}")
+            return high
+        penalty = int(math.log2(1 + usage / self.unit))
+        return max(low, high - penalty)
+
+    def publish_options(self, tenant: str, tier: str, count: int = 1) -> Dict[str, Any]:
+        """
+        Options for ``apply_async`` placing ``count`` tasks of ``tenant`` in ``tier``.
+
+        The tenant and tier travel as message headers so workers can label
+        their queue-wait metrics.
+        """
+        return {
+            "priority": self.priority(tenant, tier, count),
+            "headers": {"tenant": tenant, "tier": tier},
+        }
@@ -0,0 +1,52 @@
+import json
+import zlib
+import msgpack
+from typing import Any
+from kombu.serialization import register
+from src.configs.app import app_settings
+
+# Name of the result serializer registered with kombu
+COMPACT_SERIALIZER = "compact"
+COMPACT_CONTENT_TYPE = "application/x-compact-msgpack"
+# 0xc1 is never used by msgpack, so it can't start an uncompressed payload
+_COMPRESSED = b"\xc1"
+
+
+def dumps(value: Any) -> bytes:
+    """
+    msgpack-encode a result meta, zlib-compressing it when it reaches
+    RESULT_COMPRESS_MIN_BYTES (0 disables compression).
+    """
+    packed = msgpack.packb(value, use_bin_type=True)
+    threshold = app_settings.RESULT_COMPRESS_MIN_BYTES
+    if threshold and len(packed) >= threshold:
+        compressed = zlib.compress(packed, app_settings.RESULT_COMPRESS_LEVEL)
+        # Short or already dense payloads may not shrink
+        if len(compressed) + 1 < len(packed):
+            return _COMPRESSED + compressed
+    return packed
+
+
+def loads(payload: bytes) -> Any:
+    """Decode ``dumps`` output, and JSON results stored before the serializer was switched"""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    if payload[:1] == _COMPRESSED:
+        payload = zlib.decompress(payload[1:])
+    elif payload[:1] == b"{":
+        # A msgpack map never starts with "{" (0x7b is a positive integer)
+        return json.loads(payload)
+    return msgpack.unpackb(payload, raw=False)
+
+
+def register_compact_serializer() -> None:
+    """Register the compact result serializer with kombu"""
+    register(COMPACT_SERIALIZER, dumps, loads, content_type=COMPACT_CONTENT_TYPE, content_encoding="binary")
+
+
+def result_serializer() -> str:
+    """The result serializer configured by RESULT_SERIALIZER"""
+    if app_settings.RESULT_SERIALIZER == "msgpack":
+        register_compact_serializer()
+        return COMPACT_SERIALIZER
+    return "json"
@@ -1,11 +1,38 @@
-from celery import Celery
+from celery import Celery, current_task, states
+from kombu import Exchange, Queue
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_init,
+    worker_process_init,
+)
 import logging
-from typing import List, Dict, Any, Optional
+import functools
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from src.modules.model_factory import LLMClient
 from src.modules.text_processing_services import TextProcessingService
+from src.modules import client_registry
+from src.modules.result_cache import ResultCache
+from src.modules.near_duplicates import NearDuplicateIndex
+from src.modules.usage import UsageLedger, track_usage
+from src.modules.blob_store import ClaimCheck
+from src.modules.metrics import (
+    NEAR_DUP_LOOKUPS,
+    TASK_ERRORS,
+    TASK_LATENCY,
+    TASK_QUEUE_WAIT,
+    TASK_RETRIES,
+    start_metrics_server,
+)
+from src.app.worker import event_loop, redis
+from src.app.worker.scheduling import MAX_PRIORITY
+from src.app.worker.serialization import result_serializer
 from src.schemas.model import Status
 from src.configs.app import settings, app_settings
-from src.schemas.ioSchema import summarizeResult, categoryResults,  extract_keywordsResults, processResults
+from src.schemas.ioSchema import summarizeResult, categoryResults,  extract_keywordsResults, processResults, taskResults
 
 import time
 
@@ -31,13 +58,207 @@ app.conf.task_routes = {
     "app.worker.extract_keywords": {"queue": "extract_keywords"},
     "app.worker.process": {"queue": "process"},
     "app.worker.test": {"queue": "test"},
+    "app.worker.offline_flush": {"queue": "offline"},
+    "app.worker.offline_poll": {"queue": "offline"},
 }
+# Provider batch jobs for offline backfills (src/app/worker/offline.py)
+app.conf.imports = ("src.app.worker.offline",)
+# RabbitMQ priority queues: interactive requests are delivered before queued bulk work
+app.conf.task_queues = [
+    Queue(name, Exchange(name), routing_key=name, queue_arguments={"x-max-priority": MAX_PRIORITY})
+    for name in ("summarize", "category", "extract_keywords", "process", "test", "offline")
+]
+app.conf.task_default_priority = MAX_PRIORITY // 2
+# Priorities only apply to messages still in the broker, so workers reserve one task at a time
+app.conf.worker_prefetch_multiplier = settings.WORKER_PREFETCH_MULTIPLIER
+app.conf.task_acks_late = True
+# Results: msgpack (compressed when large) instead of JSON, dropped after RESULT_EXPIRES
+app.conf.result_serializer = result_serializer()
+app.conf.result_accept_content = list(dict.fromkeys([app.conf.result_serializer, "json"]))
+app.conf.result_expires = app_settings.RESULT_EXPIRES
 
 # Function to get a shared LLMClient instance to avoid re-initialization
-def get_llm_client():
-    provider = app_settings.LLM_PROVIDER
-    logger.info(f"Creating LLMClient with provider: {provider}")
-    return LLMClient()  # No need to pass provider, it's read from app_settings
+def get_llm_client() -> LLMClient:
+    return client_registry.get_llm_client()
+
+def get_text_service() -> TextProcessingService:
+    return client_registry.get_text_service()
+
+# Queries a service operation makes one after another at most: chunk map, reduce and a fill-in
+SEQUENTIAL_QUERIES = 3
+
+def run_service(service: TextProcessingService, operation: str, *args: Any) -> Any:
+    """
+    Call ``service.<operation>``, or its async variant on this process's event
+    loop when WORKER_EXECUTION is "async". With the threads pool, the LLM calls
+    of every task thread then share one loop instead of one blocked process each.
+
+    The async call is cancelled once it runs past SEQUENTIAL_QUERIES times the
+    longest a query can take, so a stuck coroutine can't hold the task thread forever.
+    """
+    if app_settings.WORKER_EXECUTION == "async":
+        timeout = SEQUENTIAL_QUERIES * service.llm_client.query_timeout()
+        try:
+            return event_loop.run(getattr(service, f"a{operation}")(*args), timeout=timeout)
+        except TimeoutError:
+            raise TimeoutError(f"{operation} did not finish within {timeout:.0f}s")
+    return getattr(service, operation)(*args)
+
+def task_payload(status: Status, message: str, **fields: Any) -> Dict[str, Any]:
+    """
+    Build a task's stored result: the operation's ``processResults`` fields
+    plus a flat status and message. None fields are left out.
+    """
+    return taskResults(status=status, message=message, **fields).to_payload()
+
+def result_payload(result: Any, fields: Tuple[str, ...], success_message: str) -> Dict[str, Any]:
+    """Task payload of a service result, reporting the result's own status"""
+    succeeded = result.status == Status.SUCCESS
+    message = success_message if succeeded else f"Error: the model returned no valid {', '.join(fields)}"
+    return task_payload(result.status, message, **{field: getattr(result, field) for field in fields})
+
+def normalize_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Bring a payload stored by an older release (nested status) to the current schema"""
+    if isinstance(payload.get("status"), dict):
+        return taskResults.model_validate(payload).to_payload()
+    return payload
+
+claim_check = ClaimCheck(redis)
+
+def load_text(text: Optional[str], text_ref: Optional[str]) -> str:
+    """The task's article: inline, or fetched from the blob store when sent by reference"""
+    if text_ref:
+        return claim_check.check_out(text_ref)
+    return text or ""
+
+result_cache = ResultCache(redis)
+
+def get_cached_result(service: TextProcessingService, operation: str, text: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Return the cache key for this request and the cached task payload, if any"""
+    if not app_settings.RESULT_CACHE_ENABLED:
+        return None, None
+    key = result_cache.make_key(
+        operation, text, service.llm_client.provider, service.llm_client.model_name, service.prompts.version
+    )
+    cached = result_cache.get(key, operation)
+    return key, normalize_payload(cached) if cached is not None else None
+
+def store_cached_result(key: Optional[str], payload: Dict[str, Any]) -> None:
+    if key:
+        result_cache.set(key, payload)
+
+@functools.lru_cache(maxsize=None)
+def get_near_duplicates() -> NearDuplicateIndex:
+    """The process's near-duplicate index, built on first use so its NEAR_DUP_* settings only matter when enabled"""
+    return NearDuplicateIndex(redis)
+
+def _result_variant(service: TextProcessingService, operation: str) -> str:
+    return f"{operation}|{service.llm_client.provider}|{service.llm_client.model_name}|{service.prompts.version}"
+
+def find_near_duplicate(service: TextProcessingService, operation: str, text: str) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+    """
+    Look for an already processed near-identical article.
+
+    Returns the article's MinHash signature (to index it after processing)
+    and, on a match, the stored result of the source task with a
+    ``duplicate_of`` reference to it.
+    """
+    if not app_settings.NEAR_DUP_ENABLED:
+        return None, None
+    near_duplicates = get_near_duplicates()
+    signature = near_duplicates.signature(text)
+    match = near_duplicates.lookup(signature, _result_variant(service, operation))
+    payload = None
+    if match is not None:
+        source_task_id, score = match
+        try:
+            meta = app.backend.get_task_meta(source_task_id)
+            # Results expire from the backend independently of the index
+            if meta.get("status") == states.SUCCESS and isinstance(meta.get("result"), dict):
+                payload = dict(normalize_payload(meta["result"]), duplicate_of={"task_id": source_task_id, "similarity": round(score, 3)})
+        except Exception as e:
+            logger.warning(f"Error reading near-duplicate source result: {str(e)}")
+    NEAR_DUP_LOOKUPS.labels(operation, "hit" if payload is not None else "miss").inc()
+    return signature, payload
+
+def register_near_duplicate(signature: Optional[Any], service: TextProcessingService, operation: str) -> None:
+    """Index the current task's article so later near-identical copies reuse its result"""
+    if signature is not None and current_task.request.id:
+        get_near_duplicates().add(signature, _result_variant(service, operation), current_task.request.id)
+
+usage_ledger = UsageLedger(redis)
+
+def with_usage(operation: str) -> Callable:
+    """
+    Collect the token usage of a task's LLM calls, attach it to the returned
+    payload as ``usage`` and add it to the tenant's totals in the usage ledger.
+
+    Payloads served from the result cache or a near-duplicate carry the usage
+    of this request (no model calls), not that of the request that produced them.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track_usage() as usage:
+                payload = fn(*args, **kwargs)
+            if isinstance(payload, dict):
+                payload["usage"] = usage.to_dict()
+                request = getattr(current_task, "request", None)
+                usage_ledger.record(getattr(request, "tenant", None) or "anonymous", operation, usage)
+            return payload
+        return wrapper
+    return decorator
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build this worker process's LLMClient once so connections stay warm across tasks"""
+    client_registry.reset()
+    try:
+        service = get_text_service()
+        logger.info(f"Worker process ready with provider: {service.llm_client.provider}, "
+                    f"model: {service.llm_client.model_name}")
+    except Exception as e:
+        # Tasks retry the lazy initialization and report the error themselves
+        logger.error(f"Error initializing LLM client in worker process: {str(e)}")
+
+# Metrics
+_task_started_at: Dict[str, float] = {}
+
+@worker_init.connect
+def init_worker_metrics(**kwargs):
+    if app_settings.METRICS_PORT:
+        start_metrics_server(app_settings.METRICS_PORT)
+
+@before_task_publish.connect
+def stamp_publish_time(headers=None, **kwargs):
+    if headers is not None:
+        headers["enqueued_at"] = time.time()
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _task_started_at[task_id] = now
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    if enqueued_at:
+        tier = getattr(task.request, "tier", None) or "unknown"
+        TASK_QUEUE_WAIT.labels(task.name, tier).observe(max(0.0, now - enqueued_at))
+
+@task_postrun.connect
+def record_task_end(task_id=None, task=None, retval=None, **kwargs):
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None:
+        TASK_LATENCY.labels(task.name).observe(time.time() - started_at)
+    # Tasks report most errors in their payload rather than raising
+    if isinstance(retval, dict) and retval.get("status") == Status.ERROR:
+        TASK_ERRORS.labels(task.name).inc()
+
+@task_failure.connect
+def record_task_failure(sender=None, **kwargs):
+    TASK_ERRORS.labels(sender.name).inc()
+
+@task_retry.connect
+def record_task_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(sender.name).inc()
 
 # Simple test task to verify Celery is working
 @app.task(name="app.worker.test", bind=True)
@@ -64,98 +285,99 @@ def test_task(self, message: str = "Hello, Celery!") -> Dict[str, Any]:
         "message": message,
         "hostname": hostname,
         "timestamp": time.time(),
-        "status": {
-            "Status ": True,
-            "Status Message": "Test task completed successfully"
-        }
+        "status": Status.SUCCESS,
     }
 
 # Task definitions
 @app.task(name="app.worker.summarize")
-def summarize(text: str) -> summarizeResult:
+@with_usage("summarize")
+def summarize(text: Optional[str] = None, text_ref: Optional[str] = None) -> summarizeResult:
     """
     Celery task to generate a summary of the article.
     
     Args:
         text (str): The article text to summarize
+        text_ref (str): Blob store reference of the text, sent instead of ``text`` in claim-check mode
         
     Returns:
         str: str of the result
     """
     try:
         logger.info("Starting summarize task")
+        text = load_text(text, text_ref)
         logger.info(f"Input text length: {len(text)}")
 
-        llm_client = get_llm_client()
-        logger.info(f"LLM Provider: {llm_client.provider}, Model: {llm_client.model_name}")
+        service = get_text_service()
+        logger.info(f"LLM Provider: {service.llm_client.provider}, Model: {service.llm_client.model_name}")
+        
+        cache_key, cached = get_cached_result(service, "summarize", text)
+        if cached is not None:
+            logger.info("Summary served from result cache")
+            return cached
+        signature, duplicate = find_near_duplicate(service, "summarize", text)
+        if duplicate is not None:
+            logger.info(f"Summary reused from near-duplicate task {duplicate['duplicate_of']['task_id']}")
+            return duplicate
         
-        service = TextProcessingService(llm_client)
-        result = service.summarize(text)
+        result = run_service(service, "summarize", text)
         
       
         logger.info(f"Summary generated successfully. Length: {len(result.summary)}")
-        return {
-            "summary": result.summary,
-            "status": {
-                "Status": Status.SUCCESS,
-                "Status Message": "Successfully generated summary"
-            }
-        }
+        payload = result_payload(result, ("summary",), "Successfully generated summary")
+        if result.status == Status.SUCCESS:
+            store_cached_result(cache_key, payload)
+            register_near_duplicate(signature, service, "summarize")
+        return payload
     except Exception as e:
         logger.error(f"Error in summarize task: {str(e)}")
-        return {
-            "summary": "",
-            "status": {
-                "Status ": Status.ERROR,
-                "Status Message": f"Error: {str(e)}"
-            }
-        }
+        return task_payload(Status.ERROR, f"Error: {str(e)}")
 
 @app.task(name="app.worker.categorize")
-def categorize(text: str) -> categoryResults:
+@with_usage("categorize")
+def categorize(text: Optional[str] = None, text_ref: Optional[str] = None) -> categoryResults:
     """
     Celery task to categorize the article.
     
     Args:
         text (str): The article text to categorize
+        text_ref (str): Blob store reference of the text, sent instead of ``text`` in claim-check mode
         
     Returns:
         Dict: Dictionary representation of the result
     """
     try:
         logger.info("Starting categorize task")
+        text = load_text(text, text_ref)
         
-        llm_client = get_llm_client()
-        service = TextProcessingService(llm_client)
-        result = service.categorize(text)
+        service = get_text_service()
+        cache_key, cached = get_cached_result(service, "categorize", text)
+        if cached is not None:
+            logger.info("Category served from result cache")
+            return cached
+        
+        result = run_service(service, "categorize", text)
         
     
         logger.info(f"Category generated: {result.category}")
-        return {
-            "category": result.category,
-            "status": {
-                "Status ": Status.SUCCESS,
-                "Status Message": "Successfully categorized text"
-            }
-        }
+        payload = result_payload(result, ("category",), "Successfully categorized text")
+        if result.status == Status.SUCCESS:
+            store_cached_result(cache_key, payload)
+        return payload
     except Exception as e:
         logger.error(f"Error in categorize task: {str(e)}")
-        
-        return {
-            "category": "",
-            "status": {
-                "Status": Status.ERROR,
-                "Status Message": f"Error: {str(e)}"
-            }
-        }
+        return task_payload(Status.ERROR, f"Error: {str(e)}")
 
 @app.task(name="app.worker.extract_keywords")
-def extract_keywords(text: str) -> extract_keywordsResults:
+@with_usage("extract_keywords")
+def extract_keywords(text: Optional[str] = None, keyword_engine: Optional[str] = None,
+                     text_ref: Optional[str] = None) -> extract_keywordsResults:
     """
     Celery task to extract keywords from the article.
     
     Args:
         text (str): The article text to extract keywords from
+        keyword_engine (str): "llm", "local" or "hybrid"; defaults to KEYWORD_ENGINE
+        text_ref (str): Blob store reference of the text, sent instead of ``text`` in claim-check mode
         
         
     Returns:
@@ -163,83 +385,82 @@ def extract_keywords(text: str) -> extract_keywordsResults:
     """
     try:
         logger.info("Starting extract_keywords task")
+        text = load_text(text, text_ref)
         
-        llm_client = get_llm_client()
-        service = TextProcessingService(llm_client)
-        result = service.extract_keywords(text,)
+        service = get_text_service()
+        keyword_engine = keyword_engine or app_settings.KEYWORD_ENGINE
+        # Local extraction takes about as long as a cache round trip, so it is not cached
+        cache_key, cached = None, None
+        if keyword_engine != "local":
+            cache_key, cached = get_cached_result(service, f"extract_keywords:{keyword_engine}", text)
+        if cached is not None:
+            logger.info("Keywords served from result cache")
+            return cached
+        
+        result = run_service(service, "extract_keywords", text, keyword_engine)
         logger.info(f"Keywords extracted: {result.keywords}")
-        return {
-            "keywords": result.keywords,
-            "status": {
-                "Status": Status.SUCCESS,
-                "Status Message": "Successfully extracted keywords"
-            }
-        }
+        payload = result_payload(result, ("keywords",), "Successfully extracted keywords")
+        if result.status == Status.SUCCESS:
+            store_cached_result(cache_key, payload)
+        return payload
     except Exception as e:
         logger.error(f"Error in extract_keywords task: {str(e)}")
-        return {
-            "keywords": [],
-            "status": {
-                "Status ": Status.ERROR,
-                "Status Message": f"Error: {str(e)}"
-            }
-        }
+        return task_payload(Status.ERROR, f"Error: {str(e)}")
 
 @app.task(name="app.worker.process")
-def process(text: str) -> processResults:
+@with_usage("process")
+def process(text: Optional[str] = None, keyword_engine: Optional[str] = None,
+            text_ref: Optional[str] = None) -> processResults:
     """
     Celery task to process the article comprehensively.
     
     Args:
         text (str): The article text to process
+        keyword_engine (str): "llm", "local" or "hybrid"; defaults to KEYWORD_ENGINE
+        text_ref (str): Blob store reference of the text, sent instead of ``text`` in claim-check mode
     Returns:
         Dict: Dictionary representation of the result
     """
     try:
         logger.info("Starting process task")
+        text = load_text(text, text_ref)
+        
+        service = get_text_service()
+        keyword_engine = keyword_engine or app_settings.KEYWORD_ENGINE
+        operation = f"process:{app_settings.PROCESS_MODE}:{keyword_engine}"
+        cache_key, cached = get_cached_result(service, operation, text)
+        if cached is not None:
+            logger.info("Process result served from result cache")
+            return cached
+        signature, duplicate = find_near_duplicate(service, operation, text)
+        if duplicate is not None:
+            logger.info(f"Process result reused from near-duplicate task {duplicate['duplicate_of']['task_id']}")
+            return duplicate
         
-        llm_client = get_llm_client()
-        service = TextProcessingService(llm_client)
-        result = service.process(text)
+        result = run_service(service, "process", text, None, keyword_engine)
         
+        fields = ("summary", "category", "keywords")
         # Validate the result
-        if result.status == Status.SUCCESS:
-            # Make sure we have actual content
-            if not result.summary or not result.category or not result.keywords:
-                logger.warning("Process completed but with incomplete data")
-                return {
-                    "summary": result.summary,
-                    "category": result.category,
-                    "keywords": result.keywords,
-                    "status": {
-                        "Status ": Status.ERROR,
-                        "Status Message": f"Error: {str(e)}"
-                    }
-                }
-            
-            logger.info(f"Process completed successfully - Summary length: {len(result.summary)}, " +
-                       f"Category: {result.category}, Keywords count: {len(result.keywords)}")
-            
-            return {
-                "summary": result.summary,
-                "category": result.category,
-                "keywords": result.keywords,
-                "status": {
-                    "Status": Status.SUCCESS,
-                    "Status Message": "Successfully processed text"
-                }
-            }
+        if result.status != Status.SUCCESS:
+            logger.warning("Process completed with errors")
+            return result_payload(result, fields, "")
+        # Make sure we have actual content
+        if not result.summary or not result.category or not result.keywords:
+            logger.warning("Process completed but with incomplete data")
+            missing = ", ".join(field for field in fields if not getattr(result, field))
+            return task_payload(Status.ERROR, f"Error: incomplete result, missing {missing}",
+                                **{field: getattr(result, field) or None for field in fields})
+        
+        logger.info(f"Process completed successfully - Summary length: {len(result.summary)}, " +
+                   f"Category: {result.category}, Keywords count: {len(result.keywords)}")
+        
+        payload = result_payload(result, fields, "Successfully processed text")
+        store_cached_result(cache_key, payload)
+        register_near_duplicate(signature, service, operation)
+        return payload
     except Exception as e:
         logger.error(f"Error in process task: {str(e)}")
-        return {
-            "summary": "",
-            "category": "",
-            "keywords": [],
-            "status": {
-                "Status ": Status.ERROR,
-                "Status Message": f"Error: {str(e)}"
-            }
-        }
+        return task_payload(Status.ERROR, f"Error: {str(e)}")
 
 if __name__ == "__main__":
     app.start()
@@ -1,29 +1,34 @@
 from typing import Dict, Any
 import json
 
+# Bump whenever a prompt below changes so cached results are not reused across prompt versions
+PROMPT_VERSION = "2"
+
+# Every per-article prompt starts with the article, so the calls for one article share
+# a prefix that providers can cache; only the instructions after it differ
+ARTICLE_PREFIX = "Article: {text}\n\n"
+
 # Revised prompts using a hybrid approach - guided thinking with clear output focus
-SUMMARIZE_PROMPT = (
-    "Create a concise summary of the following news article in EXACTLY 3 sentences. "
+SUMMARIZE_INSTRUCTIONS = (
+    "Create a concise summary of the news article above in EXACTLY 3 sentences. "
     "Focus on the main points, key facts, and central message. "
     "Think step-by-step before writing your summary: identify the main topic, key information, and most important conclusions. "
     "Ensure your final summary is clear, informative, and captures the essence of the article.\n\n"
-    "Article: {text}\n\n"
     "3-Sentence Summary:"
 )
 
-CATEGORIZE_PROMPT = (
-    "Analyze the following news article and categorize it into EXACTLY ONE of these categories: "
+CATEGORIZE_INSTRUCTIONS = (
+    "Analyze the news article above and categorize it into EXACTLY ONE of these categories: "
     "Technology, Sports, Health, Politics, Finance, Business.\n\n"
     "Before deciding, consider: the primary subject matter, key entities discussed, main events or concepts, "
     "and which category best represents the overall focus of the article.\n\n"
     "Choose the single most appropriate category that best represents the primary focus of the article. "
     "Return only the category name without additional explanation or commentary.\n\n"
-    "Article: {text}\n\n"
     "Category:"
 )
 
-EXTRACT_KEYWORDS_PROMPT = (
-    "Extract 5-10 relevant keywords or key phrases from the following news article. "
+EXTRACT_KEYWORDS_INSTRUCTIONS = (
+    "Extract 5-10 relevant keywords or key phrases from the news article above. "
     "Focus on terms that best represent the main topics, entities, and themes of the content. "
     "To identify the most effective keywords: consider the central topic, recurring terminology, "
     "important entities (people, organizations, locations), and technical terms specific to the subject matter.\n\n"
@@ -33,33 +38,44 @@ EXTRACT_KEYWORDS_PROMPT = (
     "- Do NOT use bullet points, asterisks, or markdown formatting\n"
     "- Do NOT number the keywords\n"
     "- Do NOT add explanations or descriptions\n\n"
-    "Article: {text}\n\n"
     "Keywords:"
 )
 
-# PROCESS_PROMPT = (
-#     "Perform a comprehensive analysis of the following news article to extract structured information.\n\n"
-    
-#     "Analyze the article carefully to:\n"
-#     "1. Summarize the main content in EXACTLY 3 sentences, focusing on the key information and central message.\n"
-#     "2. Categorize the article into EXACTLY ONE category from: Technology, Sports, Health, Politics, Finance, Business.\n"
-#     "3. Extract 5-10 relevant keywords that best represent the distinctive content and themes.\n\n"
-    
-#     "Before responding, think about the article's primary subject, key entities, important events, core message, and distinctive terminology.\n\n"
-    
-#     "Article: {text}\n\n"
-    
-#     "Provide your analysis as JSON with these fields: 'summary', 'category', and 'keywords'.\n\n"
-    
-#     "Expected output format:\n"
-#     "```json\n"
-#     "{\n"
-#     "  \"summary\": \"First sentence of summary. Second sentence of summary. Third sentence of summary.\",\n"
-#     "  \"category\": \"SelectedCategory\",\n"
-#     "  \"keywords\": \"keyword1, keyword2, keyword3, keyword4, keyword5\"\n"
-#     "}\n"
-#     "```"
-# )
+# Hybrid keyword mode: the LLM only picks from locally extracted candidates, given the article opening
+KEYWORD_RERANK_PROMPT = (
+    "Choose the 5-10 keywords that best represent the news article below, "
+    "using ONLY phrases from the candidate list.\n\n"
+    "Article opening: {lead}\n\n"
+    "Candidate keywords: {candidates}\n\n"
+    "Return the chosen keywords separated by commas, most important first, without any other text.\n\n"
+    "Keywords:"
+)
+
+# Single-call prompt used by the combined process mode. Literal braces are doubled for str.format
+PROCESS_INSTRUCTIONS = (
+    "Perform a comprehensive analysis of the news article above to extract structured information.\n\n"
+    "Analyze the article carefully to:\n"
+    "1. Summarize the main content in EXACTLY 3 sentences, focusing on the key information and central message.\n"
+    "2. Categorize the article into EXACTLY ONE category from: Technology, Sports, Health, Politics, Finance, Business.\n"
+    "3. Extract 5-10 relevant keywords that best represent the distinctive content and themes.\n\n"
+    "Before responding, think about the article's primary subject, key entities, important events, core message, and distinctive terminology.\n\n"
+    "Provide your analysis as a single JSON object with these fields: 'summary', 'category', and 'keywords'. "
+    "Return only the JSON object.\n\n"
+    "Expected output format:\n"
+    "```json\n"
+    "{{\n"
+    "  \"summary\": \"First sentence of summary. Second sentence of summary. Third sentence of summary.\",\n"
+    "  \"category\": \"SelectedCategory\",\n"
+    "  \"keywords\": [\"keyword1\", \"keyword2\", \"keyword3\", \"keyword4\", \"keyword5\"]\n"
+    "}}\n"
+    "```"
+)
+
+# Complete single-message templates, for callers that send the prompt as one string
+SUMMARIZE_PROMPT = ARTICLE_PREFIX + SUMMARIZE_INSTRUCTIONS
+CATEGORIZE_PROMPT = ARTICLE_PREFIX + CATEGORIZE_INSTRUCTIONS
+EXTRACT_KEYWORDS_PROMPT = ARTICLE_PREFIX + EXTRACT_KEYWORDS_INSTRUCTIONS
+PROCESS_PROMPT = ARTICLE_PREFIX + PROCESS_INSTRUCTIONS
 
 SYSTEM_PROMPT = (
     "You are a precise and analytical text processing assistant. "
@@ -79,5 +95,16 @@ class PromptsBank:
         self.summarize_prompt = SUMMARIZE_PROMPT
         self.category_prompt = CATEGORIZE_PROMPT
         self.extract_keywords_prompt = EXTRACT_KEYWORDS_PROMPT
-        # self.process_prompt = PROCESS_PROMPT
+        self.process_prompt = PROCESS_PROMPT
+        self.keyword_rerank_prompt = KEYWORD_RERANK_PROMPT
+        # Instructions sent after the shared article prefix (formatted to undo doubled braces)
+        self.summarize_instructions = SUMMARIZE_INSTRUCTIONS.format()
+        self.category_instructions = CATEGORIZE_INSTRUCTIONS.format()
+        self.extract_keywords_instructions = EXTRACT_KEYWORDS_INSTRUCTIONS.format()
+        self.process_instructions = PROCESS_INSTRUCTIONS.format()
         self.system_prompt = SYSTEM_PROMPT
+        self.version = PROMPT_VERSION
+
+    def article(self, text: str) -> str:
+        """Shared leading part of every prompt for ``text``, sent before the operation's instructions"""
+        return ARTICLE_PREFIX.format(text=text)
@@ -17,14 +17,41 @@ class AppSettings(BaseSettings):
     COMMON_DATA_DIR: str = ""
     OUTPUT_DIR: str = ""
     LOG_LEVEL: str = "INFO"
+    METRICS_PORT: int = 0  # Worker /metrics port; 0 disables the worker metrics server
     PROCESS_PARALLEL_TASKS: bool = False
+    PROCESS_MAX_WORKERS: int = 3
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_TTL: int = 86400  # seconds
+    RESULT_CACHE_MAX_ENTRIES: int = 100000
+    RESULT_EXPIRES: int = 86400  # seconds task results stay in the result backend
+    RESULT_SERIALIZER: str = "msgpack"  # Options: "msgpack" (compact, optionally compressed), "json"
+    RESULT_COMPRESS_MIN_BYTES: int = 1024  # msgpack results at least this large are zlib-compressed; 0 disables
+    RESULT_COMPRESS_LEVEL: int = 6  # zlib level, 1 (fastest) to 9 (smallest)
+    BATCH_MAX_SIZE: int = 1000
+    CLAIM_CHECK_MODE: str = "off"  # Options: "off" (texts inside task messages), "redis", "disk" (under COMMON_DATA_DIR/blobs)
+    CLAIM_CHECK_MIN_BYTES: int = 2048  # smaller texts stay inline in the task message
+    CLAIM_CHECK_TTL: int = 86400  # seconds a stored text waits for its tasks; keep above the longest queue wait
+    TASK_EVENTS_TIMEOUT: int = 300  # seconds an SSE stream waits for a final state
+    PROCESS_MODE: str = "multi"  # Options: "multi" (one LLM call per field), "single" (one combined call)
+    WORKER_PREFETCH_MULTIPLIER: int = 1  # messages reserved per worker process; 1 lets queue priorities take effect
+    WORKER_EXECUTION: str = "sync"  # Options: "sync" (blocking service calls), "async" (service calls share a per-process event loop)
+    FAIR_SHARE_WINDOW: int = 60  # seconds of per-tenant usage considered for priorities
+    FAIR_SHARE_UNIT: int = 50  # tasks per window before a tenant drops one priority level
+    
+    # Offline batches: articles collected into provider batch jobs (OpenAI/Anthropic batch APIs, LangChain batch otherwise)
+    OFFLINE_COLLECT_WINDOW: int = 60  # seconds articles are collected before a job is submitted
+    OFFLINE_BATCH_MAX_REQUESTS: int = 10000  # requests per provider job
+    OFFLINE_POLL_INTERVAL: int = 60  # seconds between job status checks
+    OFFLINE_MAX_WAIT: int = 90000  # seconds before an unfinished job's articles are run as regular tasks
+    OFFLINE_BATCH_CONCURRENCY: int = 4  # concurrent calls of providers without a batch endpoint
 
     ## LLMs
-    LLM_PROVIDER:Optional[str] = None  # Options: "ollama", "openai", "anthropic", "cohere", "gemini"
+    LLM_PROVIDER:Optional[str] = None  # Options: "ollama", "openai", "anthropic", "cohere", "gemini", "fake"
     
     # Ollama
     OLLAMA_HOST: Optional[str] = None
     OLLAMA_MODEL: Optional[str] = None
+    OLLAMA_KEEP_ALIVE: str = "30m"  # how long Ollama keeps the model and its prompt KV cache loaded after a call
     
     # OpenAI
     OPENAI_API_KEY: Optional[SecretStr] = None
@@ -42,10 +69,84 @@ class AppSettings(BaseSettings):
     COHERE_API_KEY: Optional[SecretStr] = None
     COHERE_MODEL: Optional[str] = None
     
+    # Input preprocessing: markup, boilerplate and whitespace cleanup, then a per-operation token budget
+    PREPROCESS_ENABLED: bool = True
+    SUMMARIZE_TOKEN_BUDGET: int = 0  # estimated article tokens kept; 0 keeps the whole article (long ones are chunked)
+    CATEGORIZE_TOKEN_BUDGET: int = 0  # e.g. 512: the lead paragraphs usually decide the category, but the prompt loses the shared cached prefix
+    EXTRACT_KEYWORDS_TOKEN_BUDGET: int = 0
+    PROCESS_TOKEN_BUDGET: int = 0  # single-call process; multi mode applies the per-field budgets
+
+    # Long-article chunking: maximum estimated tokens of article text per LLM call
+    CHUNKING_ENABLED: bool = True
+    CHUNK_MAX_WORKERS: int = 4
+    OLLAMA_CHUNK_TOKENS: int = 3000
+    OPENAI_CHUNK_TOKENS: int = 12000
+    ANTHROPIC_CHUNK_TOKENS: int = 50000
+    GEMINI_CHUNK_TOKENS: int = 50000
+    COHERE_CHUNK_TOKENS: int = 3000
+    FAKE_CHUNK_TOKENS: int = 3000
+    
+    # Local category pre-classifier (skips the LLM when confident)
+    CATEGORY_CLASSIFIER_PATH: str = ""  # .npz model from scripts/category_classifier.py; empty disables it
+    CATEGORY_CLASSIFIER_THRESHOLD: float = 0.9
+    CATEGORY_SAMPLES_PATH: str = ""  # JSONL file collecting LLM-labelled articles for training; empty disables it
+    
+    # Near-duplicate detection: reuse results of near-identical articles (MinHash/LSH index in Redis)
+    NEAR_DUP_ENABLED: bool = False
+    NEAR_DUP_THRESHOLD: float = 0.8  # minimum estimated Jaccard similarity of word 5-shingles
+    NEAR_DUP_NUM_PERM: int = 128
+    NEAR_DUP_BANDS: int = 16  # NEAR_DUP_NUM_PERM / NEAR_DUP_BANDS rows per band
+    
+    # Keyword extraction engine
+    KEYWORD_ENGINE: str = "llm"  # Options: "llm", "local" (statistical, no model call), "hybrid" (LLM reranks local candidates)
+    KEYWORD_DF_PATH: str = ""  # JSON document-frequency table from scripts/keyword_df.py; empty uses term frequency only
+    KEYWORD_CANDIDATES: int = 20  # local candidates offered to the LLM in hybrid mode
+    
+    # Fake (deterministic local stub for benchmarks and offline tests)
+    FAKE_MODEL: str = "fake-news"
+    FAKE_LLM_LATENCY_MS: float = 200.0  # median latency before the first token
+    FAKE_LLM_LATENCY_SIGMA: float = 0.3  # lognormal spread of the latency
+    FAKE_LLM_TOKENS_PER_SECOND: float = 0.0  # output generation rate; 0 returns the output at once
+    FAKE_LLM_FAILURE_RATE: float = 0.0  # probability that a call raises
+    FAKE_LLM_SEED: int = 0
+    FAKE_LLM_CAPACITY: int = 0  # concurrent calls per process before answering 429; 0 is unlimited
+    FAKE_BATCH_DELAY: float = 5.0  # seconds before a fake batch job reports completion
+    
+    # Hedged requests: duplicate calls slower than usual and take the first answer
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0  # hedge once a call is slower than this percentile of recent calls
+    LLM_HEDGE_MIN_DELAY: float = 0.5  # seconds; never hedge earlier than this
+    LLM_HEDGE_BUDGET: float = 0.05  # maximum extra requests as a fraction of all calls
+    LLM_HEDGE_TARGET: str = "same"  # Options: "same" (same provider), "fallback" (next provider in LLM_FALLBACKS)
+    
+    # Prompt caching: the article leads every prompt so calls about the same article share a prefix
+    PROMPT_CACHE_ENABLED: bool = True  # mark the prefix for Anthropic's prompt cache (other providers cache automatically)
+    PROMPT_CACHE_MIN_TOKENS: int = 1024  # shorter prefixes are sent unmarked, as providers don't cache them
+
+    # Client-side rate limiting per provider/model, shared by all workers through Redis
+    LLM_RATE_LIMIT_ENABLED: bool = False
+    LLM_REQUESTS_PER_MINUTE: int = 0  # 0 disables the request bucket
+    LLM_TOKENS_PER_MINUTE: int = 0  # input + output tokens; 0 disables the token bucket
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_MAX_CONCURRENCY: int = 16  # ceiling of the adaptive (AIMD) concurrency limit
+    LLM_LATENCY_TARGET: float = 0.0  # seconds; calls slower than this shrink the limit. 0 uses the observed baseline
+    LLM_LATENCY_TOLERANCE: float = 2.0  # with no target, calls slower than baseline x tolerance shrink the limit
+    
+    # Token usage accounting (attached to task results, totals served by /usage)
+    LLM_TOKEN_PRICES: str = ""  # comma-separated "provider:model=input/output" USD per million tokens; "provider=..." for all models
+    USAGE_RETENTION_DAYS: int = 90  # days of per-tenant usage totals kept in Redis
+
     # General LLM settings
     LLM_REQUEST_TIMEOUT: int = 60
-    TASK_RETRY_COUNT: int = 3
-    TASK_RETRY_BACKOFF: int = 5
+    TASK_RETRY_COUNT: int = 3  # retry rounds over the provider chain after a failed LLM call
+    TASK_RETRY_BACKOFF: float = 1.0  # seconds; bound of the first jittered retry delay, doubling per retry
+    LLM_RETRY_MAX_BACKOFF: float = 10.0  # seconds
+    
+    # Provider failover and circuit breakers
+    LLM_FALLBACKS: str = ""  # comma-separated "provider" or "provider:model" tried in order after LLM_PROVIDER
+    LLM_BREAKER_FAILURES: int = 5  # consecutive failures that open a provider's circuit
+    LLM_BREAKER_COOLDOWN: float = 30.0  # seconds an open circuit skips the provider before a trial call
+    LLM_BREAKER_SLOW_CALL: float = 0.0  # seconds; slower calls count as failures. 0 disables
     
     def get_celery_broker_url(self) -> str:
         """Return the Celery broker URL"""
@@ -55,20 +156,38 @@ class AppSettings(BaseSettings):
         """Return the Celery result backend URL"""
         return self.REDIS_URL
     
-    def get_model_name(self) -> str:
-        """Return the appropriate model name based on the provider"""
-        if self.LLM_PROVIDER == "ollama":
+    def get_model_name(self, provider: Optional[str] = None) -> str:
+        """Return the appropriate model name for the given (default: selected) provider"""
+        provider = provider or self.LLM_PROVIDER
+        if provider == "ollama":
             return self.OLLAMA_MODEL
-        elif self.LLM_PROVIDER == "openai":
+        elif provider == "openai":
             return self.OPENAI_MODEL
-        elif self.LLM_PROVIDER == "anthropic":
+        elif provider == "anthropic":
             return self.ANTHROPIC_MODEL
-        elif self.LLM_PROVIDER == "cohere":
+        elif provider == "cohere":
             return self.COHERE_MODEL
-        elif self.LLM_PROVIDER == "gemini":
+        elif provider == "gemini":
             return self.GEMINI_MODEL
+        elif provider == "fake":
+            return self.FAKE_MODEL
         return self.OLLAMA_MODEL  # Default
     
+    def get_chunk_tokens(self, provider: Optional[str] = None) -> int:
+        """Return the per-call article token budget for the given (default: selected) provider"""
+        provider = provider or self.LLM_PROVIDER
+        if provider == "openai":
+            return self.OPENAI_CHUNK_TOKENS
+        elif provider == "anthropic":
+            return self.ANTHROPIC_CHUNK_TOKENS
+        elif provider == "cohere":
+            return self.COHERE_CHUNK_TOKENS
+        elif provider == "gemini":
+            return self.GEMINI_CHUNK_TOKENS
+        elif provider == "fake":
+            return self.FAKE_CHUNK_TOKENS
+        return self.OLLAMA_CHUNK_TOKENS  # Default
+    
     def validate_api_keys(self) -> Dict[str, Any]:
         """Validate that appropriate API keys are set for the selected provider"""
         if self.LLM_PROVIDER == "openai" and not self.OPENAI_API_KEY:
@@ -11,30 +11,29 @@ from src.configs.app import settings
 API_BASE_URL = "http://text_service:8000"  # Changed from localhost to service name
 
 def check_task_status(task_id: str, max_wait: int = 60) -> Dict[str, Any]:
-    """Check the status of a task and wait for completion if necessary"""
-    status_url = f"{API_BASE_URL}/tasks/{task_id}"
+    """Wait for a task to finish by following its server-sent event stream"""
+    events_url = f"{API_BASE_URL}/tasks/{task_id}/events"
     
-    # Poll for result with timeout
     start_time = time.time()
-    while True:
-        try:
-            response = requests.get(status_url)
-            if response.status_code == 200:
-                result = response.json()
-                
-                # If task is complete, return the result
-                if result["status"] in ["SUCCESS", "FAILURE"]:
-                    return result
-        except requests.exceptions.RequestException as e:
-            print(f"Error checking task status: {e}")
-            time.sleep(1)
+    try:
+        # The read timeout only needs to outlast the server's keepalive interval
+        with requests.get(events_url, stream=True, timeout=(5, 30)) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:") and event == "result":
+                    return json.loads(line[len("data:"):])
                 
-        # Check timeout
-        if time.time() - start_time > max_wait:
-            return {"status": "TIMEOUT", "result": "Task processing timed out"}
+                # Check timeout
+                if time.time() - start_time > max_wait:
+                    break
+    except requests.exceptions.RequestException as e:
+        print(f"Error checking task status: {e}")
+        return {"status": "ERROR", "result": f"Error checking task status: {e}"}
             
-        # Wait before polling again
-        time.sleep(1)
+    return {"status": "TIMEOUT", "result": "Task processing timed out"}
 
 def submit_test_task(message: str = "Hello from Gradio!") -> str:
     """Submit a test task to verify service functionality"""
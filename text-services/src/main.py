@@ -1,22 +1,38 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Body
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Body, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional, Union
-from celery.result import AsyncResult
 
 import uvicorn
-from src.app.worker.task import summarize, categorize, extract_keywords, process, test_task
+from src.app.worker.task import summarize, categorize, extract_keywords, process, test_task, result_cache, usage_ledger, claim_check
+from src.app.worker.batch import submit_batch, get_batch_status
+from src.app.worker.offline import submit_offline_batch
+from src.app.worker import redis
+from src.app.worker.results import TaskResultStore
+from src.app.worker.scheduling import FairShareScheduler
+from src.modules import client_registry
+from src.modules.metrics import render_latest
+from src.modules.usage import GROUP_DIMENSIONS, UsageTracker, track_usage
 import logging
 from src.schemas.task import (
     TextRequest,
+    KeywordRequest,
     TaskResponse,
-    TaskResult
+    TaskResult,
+    BatchRequest,
+    BatchResponse,
+    BatchStatus
 )
 from src.configs.app import settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+task_results = TaskResultStore()
+scheduler = FairShareScheduler(redis)
+
 app = FastAPI(
     title="Text Processing API",
     version="1.0.0"
@@ -33,6 +49,10 @@ app.add_middleware(
 
 
 
+def get_tenant(x_tenant_id: Optional[str] = Header(None, description="Tenant or API key, for fair scheduling and usage accounting")) -> str:
+    return x_tenant_id or "anonymous"
+
+
 # Routes
 @app.get("/")
 async def root():
@@ -49,69 +69,209 @@ async def run_test(message: Optional[str] = "Hello from API!"):
     }
 
 @app.post("/summarize", response_model=TaskResponse)
-async def create_summary_task(request: TextRequest):
+def create_summary_task(request: TextRequest, tenant: str = Depends(get_tenant)):
     """
     Create a task to summarize text with optional structured output
     
     - **text**: The text to summarize
+    - **priority**: interactive (default) or bulk; bulk tasks queue behind interactive ones
     """
     try:
         task = summarize.apply_async(kwargs={
-            "text": request.text,
-        })
+            **claim_check.check_in([request.text])[0],
+        }, **scheduler.publish_options(tenant, request.priority))
         return TaskResponse(task_id=task.id)
     except Exception as e:
         logger.error(f"Error creating summary task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/summarize/stream")
+async def stream_summary(request: TextRequest, tenant: str = Depends(get_tenant)):
+    """
+    Summarize text directly and stream the summary as it is generated
+    
+    - **text**: The text to summarize
+    - Runs in the API process instead of a worker; output stops after three sentences
+    - Token usage is added to the tenant's totals once the stream ends
+    """
+    usage = UsageTracker()
+    try:
+        service = client_registry.get_text_service()
+        fragments = service.asummarize_stream(request.text)
+        # Wait for the first fragment so bad input or an unreachable model is an HTTP error
+        with track_usage(usage):
+            first = await anext(fragments, "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting summary stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def body():
+        # The rest of the stream is read by the response's task, outside the handler's context
+        with track_usage(usage):
+            try:
+                yield first
+                async for fragment in fragments:
+                    yield fragment
+            except Exception as e:
+                logger.error(f"Error in summary stream: {e}")
+            finally:
+                # Also reached when the client disconnects mid-stream
+                await fragments.aclose()
+                await run_in_threadpool(usage_ledger.record, tenant, "summarize_stream", usage)
+
+    return StreamingResponse(body(), media_type="text/plain; charset=utf-8")
+
 @app.post("/categorize", response_model=TaskResponse)
-async def create_category_task(request: TextRequest):
+def create_category_task(request: TextRequest, tenant: str = Depends(get_tenant)):
     """
     Create a task to categorize text with optional structured output
     
     - **text**: The text to categorize
+    - **priority**: interactive (default) or bulk; bulk tasks queue behind interactive ones
     """
     try:
         task = categorize.apply_async(kwargs={
-            "text": request.text,
-        })
+            **claim_check.check_in([request.text])[0],
+        }, **scheduler.publish_options(tenant, request.priority))
         return TaskResponse(task_id=task.id)
     except Exception as e:
         logger.error(f"Error creating category task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/extract-keywords", response_model=TaskResponse)
-async def create_keywords_task(request: TextRequest):
+def create_keywords_task(request: KeywordRequest, tenant: str = Depends(get_tenant)):
     """
     Create a task to extract keywords with optional structured output
     
     - **text**: The text to extract keywords from
+    - **priority**: interactive (default) or bulk; bulk tasks queue behind interactive ones
+    - **keyword_engine**: llm, local or hybrid (defaults to KEYWORD_ENGINE)
     """
     try:
         task = extract_keywords.apply_async(kwargs={
-            "text": request.text,
-        })
+            **claim_check.check_in([request.text])[0],
+            "keyword_engine": request.keyword_engine,
+        }, **scheduler.publish_options(tenant, request.priority))
         return TaskResponse(task_id=task.id)
     except Exception as e:
         logger.error(f"Error creating keywords task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/process", response_model=TaskResponse)
-async def create_process_task(request: TextRequest):
+def create_process_task(request: KeywordRequest, tenant: str = Depends(get_tenant)):
     """
     Create a task to process text comprehensively with optional structured output
     
     - **text**: The text to process
+    - **priority**: interactive (default) or bulk; bulk tasks queue behind interactive ones
+    - **keyword_engine**: llm, local or hybrid (defaults to KEYWORD_ENGINE)
     """
     try:
         task = process.apply_async(kwargs={
-            "text": request.text,
-        })
+            **claim_check.check_in([request.text])[0],
+            "keyword_engine": request.keyword_engine,
+        }, **scheduler.publish_options(tenant, request.priority))
         return TaskResponse(task_id=task.id)
     except Exception as e:
         logger.error(f"Error creating process task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/process/batch", response_model=BatchResponse)
+def create_batch_tasks(request: BatchRequest, tenant: str = Depends(get_tenant)):
+    """
+    Create one task per article in a single request
+    
+    - **articles**: The texts to process
+    - **operation**: summarize, categorize, extract_keywords or process (default)
+    - **keyword_engine**: llm, local or hybrid for extract_keywords and process
+    - **priority**: bulk (default) or interactive
+    - **execution**: online (default) or offline, through the provider's batch interface
+    """
+    if len(request.articles) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.articles)} articles (max {settings.BATCH_MAX_SIZE})"
+        )
+    try:
+        texts = [article.text for article in request.articles]
+        submit = submit_offline_batch if request.execution == "offline" else submit_batch
+        group_result = submit(
+            request.operation, texts, request.keyword_engine,
+            scheduler.publish_options(tenant, request.priority, count=len(texts)),
+        )
+        return BatchResponse(
+            batch_id=group_result.id,
+            task_ids=[result.id for result in group_result.results]
+        )
+    except Exception as e:
+        logger.error(f"Error creating batch tasks: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/batches/{batch_id}", response_model=BatchStatus)
+def get_batch_result(batch_id: str):
+    """
+    Get aggregate progress of a batch by its ID
+    
+    - Counts tasks per state so clients do not need to poll every task
+    """
+    try:
+        batch_status = get_batch_status(batch_id)
+    except Exception as e:
+        logger.error(f"Error getting batch status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if batch_status is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return batch_status
+
+@app.get("/tasks", response_model=Dict[str, TaskResult])
+async def get_task_results(ids: List[str] = Query(..., description="Task IDs, repeated or comma-separated")):
+    """
+    Get the results of many tasks in one request
+    
+    - Results are fetched with a single pipelined MGET and keyed by task ID
+    """
+    task_ids = [task_id.strip() for value in ids for task_id in value.split(",") if task_id.strip()]
+    if len(task_ids) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many task IDs: {len(task_ids)} (max {settings.BATCH_MAX_SIZE})"
+        )
+    try:
+        return await task_results.get_many(task_ids)
+    except Exception as e:
+        logger.error(f"Error getting task results: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """
+    Stream a task's state transitions and final result as server-sent events
+    
+    - One `state` event per transition (PENDING, STARTED, ...), then a final
+      `result` event with status SUCCESS, FAILURE or TIMEOUT
+    - Driven by the result backend's Redis pub/sub, not by polling
+    """
+    async def event_source():
+        try:
+            async for update in task_results.stream(task_id, timeout=settings.TASK_EVENTS_TIMEOUT):
+                if update is None:
+                    yield ": keepalive\n\n"
+                    continue
+                event = "result" if update.status in ("SUCCESS", "FAILURE", "TIMEOUT") else "state"
+                yield f"event: {event}\ndata: {update.model_dump_json()}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming task events: {e}")
+            error = TaskResult(status="ERROR", error=str(e))
+            yield f"event: result\ndata: {error.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/tasks/{task_id}", response_model=TaskResult)
 async def get_task_result(task_id: str):
     """
@@ -121,24 +281,7 @@ async def get_task_result(task_id: str):
     - Includes task status and error information if applicable
     """
     try:
-        task_result = AsyncResult(task_id)
-        
-        if task_result.ready():
-            if task_result.successful():
-                result = task_result.get()
-                return TaskResult(
-                    status="SUCCESS",
-                    result=result
-                )
-            else:
-                error = str(task_result.get(propagate=False))
-                return TaskResult(
-                    status="FAILURE",
-                    error=error
-                )
-        else:
-            return TaskResult(status="PENDING")
-            
+        return await task_results.get(task_id)
     except Exception as e:
         logger.error(f"Error getting task result: {e}")
         return TaskResult(
@@ -146,6 +289,43 @@ async def get_task_result(task_id: str):
             error=str(e)
         )
 
+@app.get("/cache/stats", response_model=Dict[str, Any])
+def get_cache_stats():
+    """Hit/miss counters and size of the LLM result cache"""
+    try:
+        return result_cache.stats()
+    except Exception as e:
+        logger.error(f"Error getting cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/usage", response_model=Dict[str, Any])
+def get_usage(
+    days: int = Query(1, ge=1, le=366, description="UTC days to include, counting today"),
+    tenant: Optional[str] = Query(None, description="Only this tenant"),
+    group_by: str = Query("tenant,operation", description="Comma-separated: tenant, operation, provider, model"),
+):
+    """
+    Token usage and estimated cost of processed requests
+    
+    - Summed per group from the daily totals the workers record in Redis
+    - Rows grouped by tenant and/or operation also report requests and tokens per request
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = set(dimensions) - set(GROUP_DIMENSIONS)
+    if unknown or not dimensions:
+        raise HTTPException(status_code=400, detail=f"group_by must name some of: {', '.join(GROUP_DIMENSIONS)}")
+    try:
+        return usage_ledger.report(days=days, tenant=tenant, group_by=dimensions)
+    except Exception as e:
+        logger.error(f"Error getting usage: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics for this API process"""
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
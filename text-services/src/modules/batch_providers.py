@@ -0,0 +1,295 @@
+import io
+import json
+import time
+import uuid
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from redis import Redis
+from langchain_core.messages.base import BaseMessage
+from src.configs.app import app_settings
+from src.modules.model_factory import LLMClient
+from src.modules.usage import submit_in_context, track_usage
+
+logger = logging.getLogger(__name__)
+
+# OpenAI and Anthropic batches complete within a day
+COMPLETION_WINDOW = "24h"
+# Results of batches run through LangChain are kept this long for the poller
+_RESULT_TTL = 2 * 86400
+
+# A completion and its token usage in LangChain's ``usage_metadata`` shape,
+# with an "estimated" flag when the provider reported no counts. Answers of
+# calls made through LLMClient.query carry them as "calls" instead: one
+# [provider, model, calls, input, output, cached] row per backend, already in
+# the token metrics
+BatchAnswer = Tuple[str, Dict[str, Any]]
+# One request of a job: custom ID, instructions, and the article prefix they follow (None for a bare prompt)
+BatchPrompt = Tuple[str, str, Optional[str]]
+
+
+class BatchProvider(ABC):
+    """
+    Offline execution of many prompts as one provider job.
+
+    ``submit`` returns a job ID right away, ``poll`` reports whether the job
+    has finished, and ``results`` maps each request's ``custom_id`` to the
+    completion text and its token usage, or None for requests the provider
+    failed. Requests missing from the results failed too. ``operation``
+    labels the metrics of calls made when the job is submitted.
+
+    Prompts are built like online calls: the article prefix first, then the
+    instructions, with the prefix marked for the provider's prompt cache.
+    """
+
+    name = "base"
+
+    def __init__(self, client: LLMClient):
+        self.client = client
+        self.model_name = client.model_name
+
+    def _messages(self, instructions: str, prefix: Optional[str]) -> List[BaseMessage]:
+        return self.client._provider_messages(self.client.backends[0], self.client._build_messages(instructions, prefix))
+
+    @abstractmethod
+    def submit(self, requests: List[BatchPrompt], operation: str = "query") -> str:
+        ...
+
+    @abstractmethod
+    def poll(self, job_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def results(self, job_id: str) -> Dict[str, Optional[BatchAnswer]]:
+        ...
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """OpenAI Batch API: a JSONL file of chat completion requests, billed at the batch discount"""
+
+    name = "openai"
+
+    def __init__(self, client: LLMClient):
+        super().__init__(client)
+        from openai import OpenAI
+        self.api = OpenAI(api_key=app_settings.OPENAI_API_KEY.get_secret_value(),
+                          timeout=app_settings.LLM_REQUEST_TIMEOUT)
+
+    @staticmethod
+    def _content(message: BaseMessage):
+        if isinstance(message.content, str):
+            return message.content
+        return [{"type": "text", "text": block["text"]} for block in message.content]
+
+    def submit(self, requests: List[BatchPrompt], operation: str = "query") -> str:
+        lines = []
+        for custom_id, instructions, prefix in requests:
+            messages = [{"role": "system" if m.type == "system" else "user", "content": self._content(m)}
+                        for m in self._messages(instructions, prefix)]
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": self.model_name, "messages": messages, "temperature": 0.7},
+            }))
+        upload = self.api.files.create(file=("batch.jsonl", io.BytesIO("\n".join(lines).encode())), purpose="batch")
+        batch = self.api.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions",
+                                        completion_window=COMPLETION_WINDOW)
+        return batch.id
+
+    def poll(self, job_id: str) -> bool:
+        return self.api.batches.retrieve(job_id).status in ("completed", "failed", "expired", "cancelled")
+
+    @staticmethod
+    def _usage(body: Dict[str, Any]) -> Dict[str, Any]:
+        usage = body.get("usage") or {}
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        return {
+            "input_tokens": usage.get("prompt_tokens") or 0,
+            "output_tokens": usage.get("completion_tokens") or 0,
+            "input_token_details": {"cache_read": cached},
+        }
+
+    def results(self, job_id: str) -> Dict[str, Optional[BatchAnswer]]:
+        batch = self.api.batches.retrieve(job_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.api.files.content(file_id).text.splitlines():
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    body = response["body"]
+                    results[record["custom_id"]] = (body["choices"][0]["message"]["content"], self._usage(body))
+                else:
+                    results[record["custom_id"]] = None
+        return results
+
+
+class AnthropicBatchProvider(BatchProvider):
+    """Anthropic Message Batches API"""
+
+    name = "anthropic"
+
+    def __init__(self, client: LLMClient):
+        super().__init__(client)
+        from anthropic import Anthropic
+        self.api = Anthropic(api_key=app_settings.ANTHROPIC_API_KEY.get_secret_value(),
+                             timeout=app_settings.LLM_REQUEST_TIMEOUT)
+
+    def submit(self, requests: List[BatchPrompt], operation: str = "query") -> str:
+        system = {"system": self.client.system_prompt} if self.client.system_prompt else {}
+        batch = self.api.messages.batches.create(requests=[
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": self.model_name,
+                    "max_tokens": 4096,
+                    "temperature": 0.7,
+                    # Text blocks keep the cache_control breakpoint on the article
+                    "messages": [{"role": "user", "content": self._messages(instructions, prefix)[-1].content}],
+                    **system,
+                },
+            }
+            for custom_id, instructions, prefix in requests
+        ])
+        return batch.id
+
+    def poll(self, job_id: str) -> bool:
+        return self.api.messages.batches.retrieve(job_id).processing_status == "ended"
+
+    @staticmethod
+    def _usage(message) -> Dict[str, Any]:
+        usage = message.usage
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+        # Anthropic counts cached prefix tokens apart from the other input tokens
+        return {
+            "input_tokens": usage.input_tokens + cache_read + cache_creation,
+            "output_tokens": usage.output_tokens,
+            "input_token_details": {"cache_read": cache_read, "cache_creation": cache_creation},
+        }
+
+    def results(self, job_id: str) -> Dict[str, Optional[BatchAnswer]]:
+        results = {}
+        for entry in self.api.messages.batches.results(job_id):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                text = "".join(block.text for block in message.content if block.type == "text")
+                results[entry.custom_id] = (text, self._usage(message))
+            else:
+                results[entry.custom_id] = None
+        return results
+
+
+class LangChainBatchProvider(BatchProvider):
+    """
+    Providers without a batch endpoint (Ollama, Gemini): the prompts run
+    through ``LLMClient.query`` when submitted, OFFLINE_BATCH_CONCURRENCY at
+    a time, so the rate limiter, circuit breakers, retries and failover apply
+    as for online calls. The answers are kept in Redis until the poller
+    collects them.
+    """
+
+    name = "langchain"
+
+    def __init__(self, client: LLMClient, redis: Redis):
+        super().__init__(client)
+        self.redis = redis
+
+    def _key(self, job_id: str) -> str:
+        return f"offline:results:{job_id}"
+
+    def _answer(self, instructions: str, prefix: Optional[str], operation: str) -> BatchAnswer:
+        with track_usage() as usage:
+            text = self.client.query(instructions, operation=operation, prefix=prefix)
+        calls = [[provider, model, entry["calls"], entry["input_tokens"], entry["output_tokens"], entry["cached_tokens"]]
+                 for (_, provider, model), entry in usage.entries.items()]
+        return text, {"calls": calls, "estimated": usage.estimated}
+
+    def _run(self, requests: List[BatchPrompt], operation: str) -> Dict[str, Optional[BatchAnswer]]:
+        with ThreadPoolExecutor(max_workers=app_settings.OFFLINE_BATCH_CONCURRENCY,
+                                thread_name_prefix="offline-batch") as executor:
+            futures = {custom_id: submit_in_context(executor, self._answer, instructions, prefix, operation)
+                       for custom_id, instructions, prefix in requests}
+        results = {}
+        for custom_id, future in futures.items():
+            try:
+                results[custom_id] = future.result()
+            except Exception as e:
+                logger.warning(f"Batched request {custom_id} failed: {str(e)}")
+                results[custom_id] = None
+        return results
+
+    def _ready_at(self) -> float:
+        return 0.0
+
+    def submit(self, requests: List[BatchPrompt], operation: str = "query") -> str:
+        job_id = uuid.uuid4().hex
+        job = {"ready_at": self._ready_at(), "results": self._run(requests, operation)}
+        self.redis.set(self._key(job_id), json.dumps(job), ex=_RESULT_TTL)
+        return job_id
+
+    def _load(self, job_id: str) -> Optional[dict]:
+        raw = self.redis.get(self._key(job_id))
+        return json.loads(raw) if raw else None
+
+    def poll(self, job_id: str) -> bool:
+        job = self._load(job_id)
+        return job is None or time.time() >= job["ready_at"]
+
+    def results(self, job_id: str) -> Dict[str, Optional[BatchAnswer]]:
+        job = self._load(job_id)
+        self.redis.delete(self._key(job_id))
+        if not job:
+            return {}
+        # JSON turned the answers into lists
+        return {custom_id: tuple(answer) if answer else None for custom_id, answer in job["results"].items()}
+
+
+class FakeBatchProvider(LangChainBatchProvider):
+    """
+    Local stand-in for a hosted batch API: answers with the fake model and
+    holds the results back for FAKE_BATCH_DELAY seconds, so the polling path
+    runs as it would against a real provider.
+
+    Like a hosted job, the model is called directly rather than through the
+    client's rate limiter, and usage is counted when the results are read.
+    """
+
+    name = "fake"
+
+    def _run(self, requests: List[BatchPrompt], operation: str) -> Dict[str, Optional[BatchAnswer]]:
+        # Batch jobs have no per-request latency; injected failures still apply
+        model = self.client.llm.model_copy(update={"latency_ms": 0.0, "tokens_per_second": 0.0, "capacity": 0})
+        batches = [self._messages(instructions, prefix) for _, instructions, prefix in requests]
+        responses = model.batch(
+            batches,
+            config={"max_concurrency": app_settings.OFFLINE_BATCH_CONCURRENCY},
+            return_exceptions=True,
+        )
+        results = {}
+        for (custom_id, _, _), messages, response in zip(requests, batches, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"Batched request {custom_id} failed: {str(response)}")
+                results[custom_id] = None
+            else:
+                usage, estimated = self.client._usage(messages, response)
+                results[custom_id] = (str(response.content), {**usage, "estimated": estimated})
+        return results
+
+    def _ready_at(self) -> float:
+        return time.time() + app_settings.FAKE_BATCH_DELAY
+
+
+def get_batch_provider(client: LLMClient, redis: Redis) -> BatchProvider:
+    """Return the batch interface of the client's primary provider"""
+    if client.provider == "openai":
+        return OpenAIBatchProvider(client)
+    if client.provider == "anthropic":
+        return AnthropicBatchProvider(client)
+    if client.provider == "fake":
+        return FakeBatchProvider(client, redis)
+    return LangChainBatchProvider(client, redis)
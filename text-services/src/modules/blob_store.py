@@ -0,0 +1,176 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from redis import Redis
+from src.configs.app import app_settings
+from src.modules.metrics import CLAIM_CHECK_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class BlobNotFound(Exception):
+    """A claim-check reference whose text is no longer in the blob store"""
+
+
+def blob_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RedisBlobStore:
+    """
+    Article texts in Redis, one key per SHA-256 of the text.
+
+    Storing a text that is already present only refreshes its expiry, so
+    resubmitted articles are kept once.
+    """
+
+    scheme = "redis"
+
+    def __init__(self, redis: Redis, ttl: int, prefix: str = "blob"):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def put_many(self, texts: List[str]) -> List[str]:
+        digests = [blob_digest(text) for text in texts]
+        pipe = self.redis.pipeline(transaction=False)
+        for digest, text in zip(digests, texts):
+            pipe.set(f"{self.prefix}:{digest}", text.encode("utf-8"), ex=self.ttl)
+        pipe.execute()
+        return digests
+
+    def get(self, digest: str) -> Optional[str]:
+        raw = self.redis.get(f"{self.prefix}:{digest}")
+        return raw.decode("utf-8") if raw is not None else None
+
+
+class DiskBlobStore:
+    """
+    Article texts as files under ``root``, named by the SHA-256 of the text.
+
+    ``root`` must be shared by the API and the workers (COMMON_DATA_DIR).
+    Files are written atomically; storing an existing text refreshes its
+    modification time. Files older than ``ttl`` are pruned in the background,
+    at most every tenth of ``ttl``.
+    """
+
+    scheme = "disk"
+
+    def __init__(self, root: str, ttl: int):
+        self.root = Path(root)
+        self.ttl = ttl
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.root / digest[:2] / digest
+
+    def put_many(self, texts: List[str]) -> List[str]:
+        digests = []
+        for text in texts:
+            digest = blob_digest(text)
+            path = self._path(digest)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as tmp:
+                    tmp.write(text.encode("utf-8"))
+                os.replace(tmp.name, path)
+            digests.append(digest)
+        self._maybe_prune()
+        return digests
+
+    def get(self, digest: str) -> Optional[str]:
+        try:
+            return self._path(digest).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def prune(self) -> int:
+        """Delete blobs not stored again within ``ttl`` seconds and return how many were removed"""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path in self.root.glob("??/*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info(f"Pruned {removed} expired blobs from {self.root}")
+        return removed
+
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._pruned_at < self.ttl / 10:
+                return
+            self._pruned_at = now
+        threading.Thread(target=self.prune, name="blob-prune", daemon=True).start()
+
+
+class ClaimCheck:
+    """
+    Sends article texts to workers by reference instead of inside task messages.
+
+    With CLAIM_CHECK_MODE "redis" or "disk", texts of at least
+    CLAIM_CHECK_MIN_BYTES are written once to a content-addressed blob store
+    and the task gets a ``text_ref`` such as ``redis:<sha256>``; smaller texts
+    and mode "off" keep the inline ``text`` argument. Workers resolve the
+    reference when the task runs, with the store named in the reference, so
+    tasks queued before a mode change still find their text.
+    """
+
+    def __init__(self, redis: Redis, mode: Optional[str] = None, min_bytes: Optional[int] = None,
+                 ttl: Optional[int] = None, root: Optional[str] = None):
+        self.mode = mode or app_settings.CLAIM_CHECK_MODE
+        self.min_bytes = app_settings.CLAIM_CHECK_MIN_BYTES if min_bytes is None else min_bytes
+        ttl = ttl or app_settings.CLAIM_CHECK_TTL
+        root = root or os.path.join(app_settings.COMMON_DATA_DIR or tempfile.gettempdir(), "blobs")
+        self.stores = {"redis": RedisBlobStore(redis, ttl), "disk": DiskBlobStore(root, ttl)}
+
+    def check_in(self, texts: List[str]) -> List[Dict[str, str]]:
+        """
+        Task kwargs carrying each text, inline or by reference.
+
+        Args:
+            texts (List[str]): Article texts, in request order
+
+        Returns:
+            List[Dict[str, str]]: ``{"text": ...}`` or ``{"text_ref": ...}`` per text
+        """
+        store = self.stores.get(self.mode)
+        if store is None:
+            return [{"text": text} for text in texts]
+        large = [i for i, text in enumerate(texts) if len(text.encode("utf-8")) >= self.min_bytes]
+        kwargs = [{"text": text} for text in texts]
+        if large:
+            digests = store.put_many([texts[i] for i in large])
+            for i, digest in zip(large, digests):
+                kwargs[i] = {"text_ref": f"{store.scheme}:{digest}"}
+                CLAIM_CHECK_BYTES.labels(store.scheme).inc(len(texts[i].encode("utf-8")))
+        return kwargs
+
+    def check_out(self, text_ref: str) -> str:
+        """
+        Fetch the text of a reference made by ``check_in``.
+
+        Raises:
+            BlobNotFound: The text expired or the reference is malformed
+        """
+        scheme, _, digest = text_ref.partition(":")
+        store = self.stores.get(scheme)
+        text = store.get(digest) if store is not None else None
+        if text is None:
+            raise BlobNotFound(
+                f"Article text {text_ref} is not in the blob store; it expired after CLAIM_CHECK_TTL or was never stored"
+            )
+        return text
@@ -0,0 +1,76 @@
+import re
+from typing import List
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough provider-independent token count (about 4 characters per token for English)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+def _pack(pieces: List[str], max_tokens: int, separator: str) -> List[str]:
+    chunks, current = [], ""
+    for piece in pieces:
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if current and estimate_tokens(candidate) > max_tokens:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_oversized(piece: str, max_tokens: int) -> List[str]:
+    # Last resort for a single sentence longer than the budget: cut on whitespace
+    max_chars = max_tokens * 4
+    words, chunks, current = [], [], ""
+    for word in piece.split():
+        words.extend(word[i:i + max_chars] for i in range(0, len(word), max_chars))
+    for word in words:
+        if current and len(current) + 1 + len(word) > max_chars:
+            chunks.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` estimated tokens.
+
+    Paragraph boundaries are preferred, then sentence boundaries; only a single
+    sentence longer than the budget is cut mid-sentence.
+
+    Args:
+        text (str): Text to split
+        max_tokens (int): Token budget per chunk
+
+    Returns:
+        List[str]: The chunks in order; ``[text]`` when it already fits
+    """
+    text = text.strip()
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    pieces = []
+    for paragraph in (p.strip() for p in _PARAGRAPH_BREAK.split(text)):
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        sentences = []
+        for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                sentences.append(sentence)
+            else:
+                sentences.extend(_split_oversized(sentence, max_tokens))
+        pieces.extend(_pack(sentences, max_tokens, " "))
+    return _pack(pieces, max_tokens, "\n\n")
@@ -0,0 +1,70 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from src.configs.app import app_settings
+from src.modules.model_factory import LLMClient
+from src.modules.text_processing_services import TextProcessingService
+
+logger = logging.getLogger(__name__)
+
+# Per-process registry. Celery prefork children each get their own copy once
+# reset() is called from worker_process_init, so HTTP connection pools are never
+# shared across a fork.
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str, Optional[str]], LLMClient] = {}
+_services: Dict[Tuple[str, str, Optional[str]], TextProcessingService] = {}
+
+
+def _registry_key(system_prompt: Optional[str] = None) -> Tuple[str, str, Optional[str]]:
+    return (app_settings.LLM_PROVIDER, app_settings.get_model_name(), system_prompt)
+
+
+def get_llm_client(system_prompt: Optional[str] = None) -> LLMClient:
+    """
+    Return the LLMClient shared by this process for the configured provider/model.
+
+    Args:
+        system_prompt (str): Optional system prompt the client is bound to
+
+    Returns:
+        LLMClient: A cached client, created on first use
+    """
+    key = _registry_key(system_prompt)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                logger.info(f"Creating LLMClient for provider: {key[0]}, model: {key[1]}")
+                client = LLMClient(system_prompt=system_prompt)
+                _clients[key] = client
+    return client
+
+
+def get_text_service(system_prompt: Optional[str] = None) -> TextProcessingService:
+    """
+    Return the TextProcessingService shared by this process, bound to the cached LLMClient.
+
+    Args:
+        system_prompt (str): Optional system prompt for the underlying client
+
+    Returns:
+        TextProcessingService: A cached service, created on first use
+    """
+    key = _registry_key(system_prompt)
+    service = _services.get(key)
+    if service is None:
+        llm_client = get_llm_client(system_prompt)
+        with _lock:
+            service = _services.get(key)
+            if service is None:
+                service = TextProcessingService(llm_client)
+                _services[key] = service
+    return service
+
+
+def reset() -> None:
+    """Drop every cached client and service (e.g. after a fork)"""
+    with _lock:
+        _clients.clear()
+        _services.clear()
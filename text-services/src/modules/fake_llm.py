@@ -0,0 +1,214 @@
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+import contextlib
+from typing import Any, AsyncIterator, Iterator, List, Optional
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from src.schemas.model import Category
+
+# Category cues for the stub answers; the first category with the most hits wins
+_CATEGORY_CUES = {
+    Category.TECHNOLOGY: ("technology", "software", "ai", "artificial", "computer", "chip", "digital", "data"),
+    Category.SPORTS: ("match", "league", "team", "season", "coach", "goal", "championship", "player"),
+    Category.HEALTH: ("health", "hospital", "patients", "disease", "vaccine", "medical", "doctors"),
+    Category.POLITICS: ("election", "government", "minister", "parliament", "senate", "policy", "vote"),
+    Category.FINANCE: ("market", "stocks", "shares", "bank", "investors", "inflation", "interest"),
+    Category.BUSINESS: ("company", "ceo", "revenue", "merger", "startup", "retail", "earnings"),
+}
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+_STOPWORDS = frozenset(
+    "the a an and or of to in on for with by from at as is are was were be been has have had it its this that "
+    "these those their they he she his her we our you your not but will would could should may said says also "
+    "than then there which who whom what when where while after before into over about more most".split()
+)
+
+
+def _article(prompt: str) -> str:
+    match = re.search(r"Article:\s*(.*?)\n\n", prompt, re.DOTALL)
+    return match.group(1) if match else prompt
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _blocks(message: BaseMessage) -> List[str]:
+    if isinstance(message.content, str):
+        return [message.content]
+    return [block.get("text", "") if isinstance(block, dict) else str(block) for block in message.content]
+
+
+# Distinct prompt prefixes the fake provider remembers as cached
+_PREFIX_CACHE_SIZE = 4096
+
+
+class FakeRateLimitError(Exception):
+    """Throttling error of the fake provider, shaped like the SDKs' 429 errors"""
+    status_code = 429
+
+
+class FakeNewsChatModel(BaseChatModel):
+    """
+    Deterministic local stand-in for a hosted chat model.
+
+    Answers the prompts in PromptsBank with plausible output derived from the
+    article (leading sentences, a cue-word category, frequent terms) and
+    simulates provider behaviour: a lognormal first-token latency, a per-token
+    generation rate and random failures, all drawn from a seeded RNG. With a
+    ``capacity``, calls beyond that many concurrent ones are rejected with a
+    429 like a throttling hosted API. A prompt sent as several text blocks
+    reports its first block as a prompt cache write the first time it is
+    seen and as a cache read afterwards.
+    """
+
+    latency_ms: float = 200.0
+    latency_sigma: float = 0.3
+    tokens_per_second: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+    capacity: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _in_flight: int = PrivateAttr(default=0)
+    _prefixes: dict = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-news"
+
+    @contextlib.contextmanager
+    def _admit(self) -> Iterator[None]:
+        with self._rng_lock:
+            if self.capacity and self._in_flight >= self.capacity:
+                raise FakeRateLimitError("429 Too Many Requests: fake provider rate limit exceeded")
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._rng_lock:
+                self._in_flight -= 1
+
+    def _draw(self) -> tuple:
+        with self._rng_lock:
+            latency = self._rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+            failed = self._rng.random() < self.failure_rate
+        return latency, failed
+
+    def _answer(self, prompt: str) -> str:
+        article = _article(prompt)
+        if "Expected output format" in prompt:
+            return "```json\n" + json.dumps({
+                "summary": self._summary(article),
+                "category": self._category(article),
+                "keywords": self._keywords(article),
+            }) + "\n```"
+        if "Candidate keywords:" in prompt:
+            match = re.search(r"Candidate keywords:\s*(.*?)\n\n", prompt, re.DOTALL)
+            return ", ".join(match.group(1).split(", ")[:8]) if match else ""
+        if prompt.rstrip().endswith("Category:"):
+            return self._category(article)
+        if prompt.rstrip().endswith("Keywords:"):
+            return ", ".join(self._keywords(article))
+        return self._summary(article)
+
+    def _summary(self, article: str) -> str:
+        sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", article.strip()) if s.strip()]
+        return " ".join(sentences[:3])
+
+    def _category(self, article: str) -> str:
+        words = [w.lower() for w in _WORD.findall(article)]
+        scores = {category: sum(words.count(cue) for cue in cues) for category, cues in _CATEGORY_CUES.items()}
+        return max(scores, key=scores.get).value
+
+    def _keywords(self, article: str) -> List[str]:
+        counts = {}
+        for word in _WORD.findall(article):
+            if word.lower() not in _STOPWORDS and len(word) > 3:
+                counts[word] = counts.get(word, 0) + 1
+        return [w for w, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:8]]
+
+    def _cache_usage(self, blocks: List[str]) -> dict:
+        if len(blocks) < 2:
+            return {}
+        prefix, tokens = hash(blocks[0]), _estimate_tokens(blocks[0])
+        with self._rng_lock:
+            cached = self._prefixes.pop(prefix, None) is not None
+            self._prefixes[prefix] = True
+            if len(self._prefixes) > _PREFIX_CACHE_SIZE:
+                del self._prefixes[next(iter(self._prefixes))]
+        return {"cache_read": tokens} if cached else {"cache_creation": tokens}
+
+    def _prepare(self, messages: List[BaseMessage]):
+        blocks = _blocks(messages[-1])
+        prompt = "".join(blocks)
+        latency, failed = self._draw()
+        text = self._answer(prompt)
+        usage = {
+            "input_tokens": sum(_estimate_tokens("".join(_blocks(m))) for m in messages),
+            "output_tokens": _estimate_tokens(text),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        details = self._cache_usage(blocks)
+        if details:
+            usage["input_token_details"] = details
+        return text, latency, failed, usage
+
+    def _generation_time(self, usage: dict) -> float:
+        return usage["output_tokens"] / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text, latency, failed, usage = self._prepare(messages)
+        with self._admit():
+            time.sleep(latency)
+            if failed:
+                raise RuntimeError("Injected failure from fake LLM provider")
+            time.sleep(self._generation_time(usage))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        text, latency, failed, usage = self._prepare(messages)
+        with self._admit():
+            await asyncio.sleep(latency)
+            if failed:
+                raise RuntimeError("Injected failure from fake LLM provider")
+            await asyncio.sleep(self._generation_time(usage))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        text, latency, failed, usage = self._prepare(messages)
+        time.sleep(latency)
+        if failed:
+            raise RuntimeError("Injected failure from fake LLM provider")
+        pieces = re.findall(r"\S+\s*", text)
+        delay = self._generation_time(usage) / max(1, len(pieces))
+        for piece in pieces:
+            time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        # Like the hosted providers, usage arrives with a final empty chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        text, latency, failed, usage = self._prepare(messages)
+        await asyncio.sleep(latency)
+        if failed:
+            raise RuntimeError("Injected failure from fake LLM provider")
+        pieces = re.findall(r"\S+\s*", text)
+        delay = self._generation_time(usage) / max(1, len(pieces))
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
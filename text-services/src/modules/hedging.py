@@ -0,0 +1,107 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+import numpy as np
+from src.configs.app import app_settings
+from src.modules.usage import submit_in_context
+
+# Latencies kept per backend and operation, and how many are needed before hedging starts
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges at ``ratio`` of all calls.
+
+    Every call earns ``ratio`` of a token and every hedge spends one, so
+    hedging stops by itself when a backend is slow across the board
+    (where duplicates would only add load) instead of doubling traffic.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class Hedger:
+    """
+    Decides when an LLM call gets a duplicate request.
+
+    A call that has not returned after the ``percentile`` of recent
+    latencies for the same backend and operation (at least ``min_delay``)
+    is hedged, as long as the budget allows. Latencies are tracked per
+    process over the last LATENCY_WINDOW successful calls.
+
+    Hedged calls run on a pool of ``threads``; abandoned losers hold one
+    until their call returns.
+    """
+
+    def __init__(self, percentile: float = 95.0, min_delay: float = 0.5, budget: float = 0.05, threads: int = 32):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget = HedgeBudget(budget)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="llm-hedge")
+        self._slots = threading.BoundedSemaphore(threads)
+        self._latencies: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args: Any) -> Optional[Future]:
+        """
+        Run ``fn`` on a free pool thread, or return None when every thread is busy.
+
+        Calls never queue for a thread, so the hedge delay is timed from when
+        the request is sent; the caller runs the call itself instead.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = submit_in_context(self.executor, fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def record(self, key: Hashable, latency: float) -> None:
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = deque(maxlen=LATENCY_WINDOW)
+            window.append(latency)
+
+    def delay(self, key: Hashable) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None while there are too few samples"""
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None or len(window) < MIN_SAMPLES:
+                return None
+            samples = np.fromiter(window, dtype=np.float64, count=len(window))
+        return max(self.min_delay, float(np.percentile(samples, self.percentile)))
+
+
+def get_hedger() -> Optional[Hedger]:
+    """Return a hedger configured from the LLM_HEDGE_* settings, or None when hedging is disabled"""
+    if not app_settings.LLM_HEDGING_ENABLED:
+        return None
+    return Hedger(
+        percentile=app_settings.LLM_HEDGE_PERCENTILE,
+        min_delay=app_settings.LLM_HEDGE_MIN_DELAY,
+        budget=app_settings.LLM_HEDGE_BUDGET,
+        # A primary and a hedge for every call the rate limiter can let through
+        threads=2 * app_settings.LLM_MAX_CONCURRENCY,
+    )
@@ -0,0 +1,154 @@
+import re
+import json
+import logging
+import functools
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from src.configs.app import app_settings
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_BREAK = re.compile(r"[.,;:!?()\[\]{}\"“”\n–—]+|\s-\s")
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9'&-]*")
+STOPWORDS = frozenset(
+    "a about above across after again against all also am among an and any are around as at be because been "
+    "before being below between both but by can could did do does doing down during each few for from further had "
+    "has have having he her here hers herself him himself his how however i if in into is it its itself just last "
+    "like made make many may me more most much must my myself new no nor not now of off on once one only or other "
+    "our ours ourselves out over own per said same says she should since so some such than that the their theirs "
+    "them themselves then there these they this those through to too under until up upon us very was we were what "
+    "when where which while who whom why will with within without would year years yet you your yours yourself "
+    "yourselves according told including two three first second next week weeks month months today yesterday mr "
+    "mrs ms".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased content words, as counted in the document-frequency table"""
+    return [t.lower() for t in _TOKEN.findall(text) if _is_content(t)]
+
+
+def _is_content(token: str) -> bool:
+    # Short tokens only count when they look like acronyms (AI, EU, UK)
+    if token.lower() in STOPWORDS or token.isdigit():
+        return False
+    return len(token) > 2 or token.isupper()
+
+
+class LocalKeywordExtractor:
+    """
+    Statistical keyword extraction without a model call.
+
+    Candidates are RAKE-style phrases: runs of up to ``max_words`` content
+    words between stopwords and punctuation. Each word is weighted by
+    TF-IDF against a corpus document-frequency table (plain log term
+    frequency when no table is loaded) and by a YAKE-style boost for
+    appearing early in the article. A phrase scores the sum of its word
+    weights over the square root of its length, so two-word phrases compete
+    with single words without crowding them out.
+    """
+
+    def __init__(self, df: Optional[Dict[str, int]] = None, documents: int = 0, max_words: int = 2):
+        self.df = df or {}
+        self.documents = documents
+        self.max_words = max_words
+
+    @classmethod
+    def load(cls, path: str) -> "LocalKeywordExtractor":
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        return cls(df=table["df"], documents=table["documents"])
+
+    @staticmethod
+    def build_table(texts: Iterable[str], table: Optional[dict] = None) -> dict:
+        """Count document frequencies of ``texts``, optionally on top of an existing table"""
+        table = table or {"documents": 0, "df": {}}
+        df = table["df"]
+        for text in texts:
+            table["documents"] += 1
+            for word in set(tokenize(text)):
+                df[word] = df.get(word, 0) + 1
+        return table
+
+    def _candidates(self, text: str) -> List[List[str]]:
+        phrases = []
+        for segment in _SEGMENT_BREAK.split(text):
+            run = []
+            for token in _TOKEN.findall(segment) + [""]:
+                if token and _is_content(token):
+                    run.append(token)
+                    continue
+                for start in range(0, len(run), self.max_words):
+                    phrases.append(run[start:start + self.max_words])
+                run = []
+        return phrases
+
+    def score(self, text: str) -> List[Tuple[str, float]]:
+        """Return candidate phrases in their first-seen casing with scores, best first"""
+        phrases = self._candidates(text)
+        if not phrases:
+            return []
+
+        vocabulary: Dict[str, int] = {}
+        flat = np.fromiter(
+            (vocabulary.setdefault(w.lower(), len(vocabulary)) for phrase in phrases for w in phrase), dtype=np.int64
+        )
+        lengths = np.fromiter((len(phrase) for phrase in phrases), dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        # Word weights, one vectorized pass over the article's vocabulary
+        tf = 1 + np.log(np.bincount(flat, minlength=len(vocabulary)))
+        if self.documents:
+            df = np.fromiter((self.df.get(w, 0) for w in vocabulary), dtype=np.float64, count=len(vocabulary))
+            idf = np.log((self.documents + 1) / (df + 1)) + 1
+        else:
+            idf = np.ones(len(vocabulary))
+        first = np.full(len(vocabulary), len(flat), dtype=np.int64)
+        np.minimum.at(first, flat, np.arange(len(flat)))
+        position = 1 + 0.5 * (1 - first / len(flat))
+        weights = tf * idf * position
+
+        scores = np.add.reduceat(weights[flat], starts) / np.sqrt(lengths)
+
+        best: Dict[str, Tuple[str, float]] = {}
+        for phrase, phrase_score in zip(phrases, scores):
+            key = " ".join(phrase).lower()
+            if key not in best:
+                best[key] = (" ".join(phrase), float(phrase_score))
+        return sorted(best.values(), key=lambda item: -item[1])
+
+    def extract(self, text: str, top_k: int = 10) -> List[str]:
+        """Top ``top_k`` keywords, skipping phrases contained in a better-ranked one"""
+        keywords, taken = [], []
+        for phrase, _ in self.score(text):
+            words = phrase.lower().split()
+            if any(_contains(kept, words) for kept in taken):
+                continue
+            keywords.append(phrase)
+            taken.append(words)
+            if len(keywords) == top_k:
+                break
+        return keywords
+
+
+def _contains(words: List[str], part: List[str]) -> bool:
+    n = len(part)
+    return any(words[i:i + n] == part for i in range(len(words) - n + 1))
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path: str) -> LocalKeywordExtractor:
+    if not path:
+        return LocalKeywordExtractor()
+    try:
+        extractor = LocalKeywordExtractor.load(path)
+        logger.info(f"Loaded keyword document frequencies for {extractor.documents} documents from {path}")
+        return extractor
+    except Exception as e:
+        logger.error(f"Error loading keyword document frequencies from {path}: {str(e)}")
+        return LocalKeywordExtractor()
+
+
+def get_keyword_extractor() -> LocalKeywordExtractor:
+    """Return the process-wide extractor for KEYWORD_DF_PATH (term frequency only when unset)"""
+    return _load(app_settings.KEYWORD_DF_PATH)
@@ -0,0 +1,121 @@
+import re
+import json
+import zlib
+import threading
+import logging
+import functools
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from src.configs.app import app_settings
+from src.schemas.model import Category
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_samples_lock = threading.Lock()
+
+
+class HashedCategoryClassifier:
+    """
+    Multinomial logistic regression over hashed unigram and bigram features.
+
+    Features are hashed with CRC32 (stable across processes, unlike hash()),
+    log-scaled and L2-normalized, so the model is a fixed-size weight matrix
+    regardless of vocabulary. Trained offline from categories the LLM assigned.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, classes: Sequence[str] = tuple(c.value for c in Category)):
+        self.n_features = n_features
+        self.classes = list(classes)
+        self.weights = np.zeros((len(self.classes), n_features), dtype=np.float32)
+        self.bias = np.zeros(len(self.classes), dtype=np.float32)
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        tokens = _TOKEN.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if not grams:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        hashed = np.fromiter((zlib.crc32(g.encode("utf-8")) % self.n_features for g in grams), dtype=np.int64)
+        index, counts = np.unique(hashed, return_counts=True)
+        values = np.log1p(counts).astype(np.float32)
+        return index, values / np.linalg.norm(values)
+
+    def _proba(self, index: np.ndarray, values: np.ndarray) -> np.ndarray:
+        scores = self.weights[:, index] @ values + self.bias
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        return self._proba(*self._features(text))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Return the most likely category and its probability"""
+        proba = self.predict_proba(text)
+        best = int(proba.argmax())
+        return self.classes[best], float(proba[best])
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 10,
+            learning_rate: float = 2.0, seed: int = 0) -> "HashedCategoryClassifier":
+        """Train with plain SGD on the softmax cross-entropy"""
+        features = [self._features(text) for text in texts]
+        targets = np.array([self.classes.index(label) for label in labels])
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch)
+            for i in rng.permutation(len(features)):
+                index, values = features[i]
+                gradient = self._proba(index, values)
+                gradient[targets[i]] -= 1
+                self.weights[:, index] -= rate * np.outer(gradient, values)
+                self.bias -= rate * gradient
+        return self
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, classes=np.array(self.classes))
+
+    @classmethod
+    def load(cls, path: str) -> "HashedCategoryClassifier":
+        data = np.load(path)
+        model = cls(n_features=data["weights"].shape[1], classes=[str(c) for c in data["classes"]])
+        model.weights = data["weights"]
+        model.bias = data["bias"]
+        return model
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path: str) -> Optional[HashedCategoryClassifier]:
+    try:
+        model = HashedCategoryClassifier.load(path)
+        logger.info(f"Loaded category classifier from {path}")
+        return model
+    except Exception as e:
+        logger.error(f"Error loading category classifier from {path}: {str(e)}")
+        return None
+
+
+def match_category(label: str) -> Optional[Category]:
+    """Map a raw LLM answer such as "technology." to a Category, if it names one"""
+    label = label.strip().strip(".*\"'").lower()
+    for category in Category:
+        if label == category.value.lower():
+            return category
+    return None
+
+
+def record_sample(text: str, category: Category) -> None:
+    """Append an LLM-labelled article to CATEGORY_SAMPLES_PATH for offline training"""
+    if not app_settings.CATEGORY_SAMPLES_PATH:
+        return
+    try:
+        line = json.dumps({"text": text, "category": category.value})
+        with _samples_lock, open(app_settings.CATEGORY_SAMPLES_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except Exception as e:
+        logger.warning(f"Error recording category sample: {str(e)}")
+
+
+def get_category_classifier() -> Optional[HashedCategoryClassifier]:
+    """Return the process-wide classifier configured by CATEGORY_CLASSIFIER_PATH, if any"""
+    if not app_settings.CATEGORY_CLASSIFIER_PATH:
+        return None
+    return _load(app_settings.CATEGORY_CLASSIFIER_PATH)
@@ -0,0 +1,144 @@
+import os
+import time
+import logging
+import inspect
+import functools
+from typing import Callable, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+# LLM calls take seconds; parsing and cache lookups take microseconds to milliseconds
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "LLM call latency",
+    ["provider", "model", "operation"], buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens reported by the provider",
+    ["provider", "model", "operation", "direction"],
+)
+LLM_ERRORS = Counter(
+    "llm_errors_total", "Failed LLM calls",
+    ["provider", "model", "operation"],
+)
+SERVICE_LATENCY = Histogram(
+    "text_service_duration_seconds", "TextProcessingService method latency",
+    ["operation"], buckets=LLM_BUCKETS,
+)
+PARSE_LATENCY = Histogram(
+    "response_parse_duration_seconds", "Time spent parsing LLM responses",
+    ["operation"], buckets=FAST_BUCKETS,
+)
+TASK_QUEUE_WAIT = Histogram(
+    "task_queue_wait_seconds", "Time between publishing a task and a worker starting it",
+    ["task", "tier"], buckets=LLM_BUCKETS,
+)
+TASK_LATENCY = Histogram(
+    "task_duration_seconds", "End-to-end task execution time in the worker",
+    ["task"], buckets=LLM_BUCKETS,
+)
+CATEGORY_DECISIONS = Counter(
+    "category_classifier_decisions_total", "Categorizations answered by the local classifier vs. the LLM",
+    ["outcome"],
+)
+NEAR_DUP_LOOKUPS = Counter(
+    "near_duplicate_lookups_total", "Near-duplicate index lookups before calling the model",
+    ["operation", "outcome"],
+)
+LLM_FAILOVERS = Counter(
+    "llm_failovers_total", "LLM calls answered by a fallback provider",
+    ["provider", "model", "operation"],
+)
+LLM_CIRCUIT_OPENS = Counter(
+    "llm_circuit_opens_total", "Times a provider's circuit breaker opened",
+    ["provider", "model"],
+)
+LLM_HEDGES = Counter(
+    "llm_hedges_total", "Hedged LLM calls by outcome (won, lost, failed, throttled by the budget)",
+    ["provider", "model", "operation", "outcome"],
+)
+LLM_RATE_LIMIT_WAIT = Histogram(
+    "llm_rate_limit_wait_seconds", "Time an LLM call waited for the client-side rate limiter",
+    ["provider", "model"], buckets=LLM_BUCKETS,
+)
+LLM_THROTTLED = Counter(
+    "llm_throttled_total", "LLM calls rejected by the provider with a 429",
+    ["provider", "model"],
+)
+# The limit lives in Redis; every process reports the value it last saw
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "llm_concurrency_limit", "Adaptive concurrency limit shared by all workers",
+    ["provider", "model"], multiprocess_mode="mostrecent",
+)
+OFFLINE_REQUESTS = Counter(
+    "offline_batch_requests_total",
+    "Articles of offline batches by route (batch, local, online) and outcome (completed, failed)",
+    ["provider", "operation", "outcome"],
+)
+PREPROCESS_TOKENS_REMOVED = Counter(
+    "preprocess_tokens_removed_total", "Estimated article tokens removed before the LLM call (cleanup, budget)",
+    ["operation", "stage"],
+)
+CLAIM_CHECK_BYTES = Counter(
+    "claim_check_bytes_total", "Article bytes sent to workers through the blob store instead of the broker",
+    ["store"],
+)
+TASK_ERRORS = Counter("task_errors_total", "Tasks that failed or returned an ERROR payload", ["task"])
+TASK_RETRIES = Counter("task_retries_total", "Task retries", ["task"])
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable:
+    """Decorator observing the wall time of every call in ``histogram``"""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.labels(**labels).observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.labels(**labels).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _registry() -> CollectorRegistry:
+    # Prefork workers and multiple API processes share samples through PROMETHEUS_MULTIPROC_DIR
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Return the exposition payload and its content type"""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics on ``port`` from a background thread"""
+    start_http_server(port, registry=_registry())
+    logger.info(f"Metrics server listening on port {port}")
@@ -1,113 +1,656 @@
+import time
+import asyncio
 import logging
+import contextlib
 import requests
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 from langchain_community.chat_models import ChatOllama
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.configs.app import app_settings
+from src.modules.metrics import LLM_LATENCY, LLM_TOKENS, LLM_ERRORS, LLM_FAILOVERS, LLM_HEDGES
+from src.modules.hedging import get_hedger
+from src.modules.chunking import estimate_tokens
+from src.modules.rate_limiter import EXPECTED_OUTPUT_TOKENS, RateLimitTimeout, get_rate_limiter
+from src.modules.resilience import AllProvidersUnavailable, backoff_delay, get_circuit_breaker, is_client_error
+from src.modules.usage import record_usage, submit_in_context
 from langchain_core.messages.base import BaseMessage
+from src.modules.fake_llm import FakeNewsChatModel
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_PROVIDERS = ("ollama", "openai", "anthropic", "gemini", "fake")
+
+
+class LLMBackend:
+    """One provider/model calls can be sent to, with its rate limiter and circuit breaker"""
+
+    def __init__(self, provider: str, model_name: str, llm):
+        self.provider = provider
+        self.model_name = model_name
+        self.llm = llm
+        self.rate_limiter = get_rate_limiter(provider, model_name)
+        self.breaker = get_circuit_breaker(provider, model_name)
+
+
 class LLMClient:
     def __init__(self, system_prompt: Optional[str] = None):
         self.provider = app_settings.LLM_PROVIDER
         self.system_prompt = system_prompt
         self.model_name = self._get_model_name()
         self.llm = self._initialize_llm()
+        # The configured provider first, then LLM_FALLBACKS in order
+        self.backends = [LLMBackend(self.provider, self.model_name, self.llm)] + self._initialize_fallbacks()
+        self.rate_limiter = self.backends[0].rate_limiter
+        self.hedger = get_hedger()
         logger.info(f"Initialized LLM client with provider: {self.provider}, model: {self.model_name}")
         
     def _get_model_name(self) -> str:
-        if self.provider == "ollama":
-            return app_settings.OLLAMA_MODEL
-        elif self.provider == "openai":
-            return app_settings.OPENAI_MODEL
-        elif self.provider == "anthropic":
-            return app_settings.ANTHROPIC_MODEL
-        elif self.provider == "gemini":
-            return app_settings.GEMINI_MODEL
-        else:
+        if self.provider not in SUPPORTED_PROVIDERS:
             logger.warning(f"Unknown provider: {self.provider}, falling back to Ollama")
             self.provider = "ollama"
-            return app_settings.OLLAMA_MODEL
+        return app_settings.get_model_name(self.provider)
+
+    def _initialize_fallbacks(self) -> List[LLMBackend]:
+        backends = []
+        for entry in filter(None, (item.strip() for item in app_settings.LLM_FALLBACKS.split(","))):
+            provider, _, model_name = entry.partition(":")
+            model_name = model_name or app_settings.get_model_name(provider)
+            if provider not in SUPPORTED_PROVIDERS:
+                logger.error(f"Ignoring unknown fallback provider: {provider}")
+                continue
+            try:
+                backends.append(LLMBackend(provider, model_name, self._initialize_llm(provider, model_name)))
+                logger.info(f"Fallback provider: {provider}, model: {model_name}")
+            except Exception as e:
+                logger.error(f"Ignoring fallback provider {provider}: {str(e)}")
+        return backends
             
-    def _initialize_llm(self):
+    def _initialize_llm(self, provider: Optional[str] = None, model_name: Optional[str] = None):
+        provider = provider or self.provider
+        model_name = model_name or self.model_name
         try:
-            if self.provider == "ollama":
+            if provider == "ollama":
                 logger.info(f"Initializing Ollama with host: {app_settings.OLLAMA_HOST}")
                 return ChatOllama(
                     base_url=app_settings.OLLAMA_HOST,
-                    model=self.model_name,
+                    model=model_name,
                     temperature=0,
                     timeout=app_settings.LLM_REQUEST_TIMEOUT,
+                    # Keeps the model, and the KV cache of the last prompt prefix, loaded between calls
+                    keep_alive=app_settings.OLLAMA_KEEP_ALIVE,
                 )
                 
-            elif self.provider == "openai":
-                logger.info(f"Initializing OpenAI with model: {self.model_name}")
+            elif provider == "openai":
+                logger.info(f"Initializing OpenAI with model: {model_name}")
                 if not app_settings.OPENAI_API_KEY:
                     raise ValueError("OpenAI API key not provided")
                 return ChatOpenAI(
                     api_key=app_settings.OPENAI_API_KEY.get_secret_value(),
-                    model=self.model_name,
+                    model=model_name,
                     temperature=0.7,
                     request_timeout=app_settings.LLM_REQUEST_TIMEOUT,
+                    # Streams end with a chunk carrying the token usage
+                    stream_usage=True,
                 )
                 
-            elif self.provider == "anthropic":
-                logger.info(f"Initializing Anthropic with model: {self.model_name}")
+            elif provider == "anthropic":
+                logger.info(f"Initializing Anthropic with model: {model_name}")
                 if not app_settings.ANTHROPIC_API_KEY:
                     raise ValueError("Anthropic API key not provided")
                 return ChatAnthropic(
                     api_key=app_settings.ANTHROPIC_API_KEY.get_secret_value(),
-                    model_name=self.model_name,
+                    model_name=model_name,
                     temperature=0.7,
                     max_tokens=4096,
                     timeout=app_settings.LLM_REQUEST_TIMEOUT,
                 )
                 
-            elif self.provider == "gemini":
-                logger.info(f"Initializing Gemini with model: {self.model_name}")
+            elif provider == "gemini":
+                logger.info(f"Initializing Gemini with model: {model_name}")
                 if not app_settings.GEMINI_API_KEY:
                     raise ValueError("Gemini API key not provided")
                 return ChatGoogleGenerativeAI(
                     api_key=app_settings.GEMINI_API_KEY.get_secret_value(),
-                    model=self.model_name,
+                    model=model_name,
                     temperature=0.7,
                     convert_system_message_to_human=True,
                     timeout=app_settings.LLM_REQUEST_TIMEOUT,
                 )
+            elif provider == "fake":
+                logger.info(f"Initializing fake local provider with model: {model_name}")
+                return FakeNewsChatModel(
+                    latency_ms=app_settings.FAKE_LLM_LATENCY_MS,
+                    latency_sigma=app_settings.FAKE_LLM_LATENCY_SIGMA,
+                    tokens_per_second=app_settings.FAKE_LLM_TOKENS_PER_SECOND,
+                    failure_rate=app_settings.FAKE_LLM_FAILURE_RATE,
+                    seed=app_settings.FAKE_LLM_SEED,
+                    capacity=app_settings.FAKE_LLM_CAPACITY,
+                )
             else:
-                raise ValueError(f"Unsupported LLM provider: {self.provider}")
+                raise ValueError(f"Unsupported LLM provider: {provider}")
                 
         except Exception as e:
             logger.error(f"Error initializing LLM: {str(e)}")
             raise
 
-    def query(self, prompt: str) -> str:
-        try:
-            logger.info(f"Sending query to {self.provider} model: {self.model_name}")
-            messages = []
-            
-            if self.system_prompt:
-                messages.append(SystemMessage(content=self.system_prompt))
+    def _build_messages(self, prompt: str, prefix: Optional[str] = None) -> List[BaseMessage]:
+        messages = []
+        if self.system_prompt:
+            messages.append(SystemMessage(content=self.system_prompt))
+        if prefix:
+            # Separate blocks so providers that need an explicit cache breakpoint can mark the prefix
+            messages.append(HumanMessage(content=[{"type": "text", "text": prefix}, {"type": "text", "text": prompt}]))
+        else:
             messages.append(HumanMessage(content=prompt))
-            
-            response = self.llm.invoke(messages)
-            
-            if isinstance(response, BaseMessage):
-                content = str(response.content)
-                logger.info(f"Received response: {content[:100]}...")
-                return content
-                
+        return messages
+
+    def _provider_messages(self, backend: LLMBackend, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        Mark the shared prompt prefix as cacheable where the provider needs it.
+
+        OpenAI, Gemini and Ollama reuse matching prefixes on their own; Anthropic
+        only caches up to a ``cache_control`` breakpoint, and bills cache writes
+        at a premium, so prefixes shorter than PROMPT_CACHE_MIN_TOKENS are sent
+        unmarked.
+        """
+        if backend.provider != "anthropic" or not app_settings.PROMPT_CACHE_ENABLED:
+            return messages
+        content = messages[-1].content
+        if isinstance(content, str) or len(content) < 2:
+            return messages
+        if estimate_tokens(content[0]["text"]) < app_settings.PROMPT_CACHE_MIN_TOKENS:
+            return messages
+        blocks = [{**content[0], "cache_control": {"type": "ephemeral"}}] + content[1:]
+        return messages[:-1] + [HumanMessage(content=blocks)]
+
+    @staticmethod
+    def _chunk_text(chunk: BaseMessage) -> str:
+        # Some providers (e.g. Anthropic) stream content as a list of typed blocks
+        content = chunk.content
+        if isinstance(content, str):
+            return content
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+
+    def _usage(self, messages: List[BaseMessage], response: BaseMessage) -> Tuple[dict, bool]:
+        """The response's token usage, and whether it had to be estimated locally"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("input_tokens") or usage.get("output_tokens"):
+            return usage, False
+        # Ollama reports its counts in the response metadata rather than as usage metadata
+        metadata = getattr(response, "response_metadata", None) or {}
+        if metadata.get("prompt_eval_count") or metadata.get("eval_count"):
+            return {"input_tokens": metadata.get("prompt_eval_count") or 0,
+                    "output_tokens": metadata.get("eval_count") or 0}, False
+        return {"input_tokens": estimate_tokens("".join(self._chunk_text(m) for m in messages)),
+                "output_tokens": estimate_tokens(self._chunk_text(response))}, True
+
+    def _record_usage(self, backend: LLMBackend, messages: List[BaseMessage], response: BaseMessage,
+                      operation: str) -> None:
+        usage, estimated = self._usage(messages, response)
+        self._record_token_usage(backend, usage, operation, estimated)
+
+    def _record_token_usage(self, backend: LLMBackend, usage: dict, operation: str, estimated: bool = False) -> None:
+        """Count usage in LangChain's ``usage_metadata`` shape in the token metrics and the request's tracker"""
+        for direction, key in (("input", "input_tokens"), ("output", "output_tokens")):
+            if usage.get(key):
+                LLM_TOKENS.labels(backend.provider, backend.model_name, operation, direction).inc(usage[key])
+        # Part of the input tokens: prefix read from, or written to, the provider's prompt cache
+        details = usage.get("input_token_details") or {}
+        for direction in ("cache_read", "cache_creation"):
+            if details.get(direction):
+                LLM_TOKENS.labels(backend.provider, backend.model_name, operation, direction).inc(details[direction])
+        if details.get("cache_read") or details.get("cache_creation"):
+            logger.info(f"Prompt cache for {operation}: {details.get('cache_read', 0)} tokens read, "
+                        f"{details.get('cache_creation', 0)} written of {usage.get('input_tokens', 0)} input")
+        record_usage(backend.provider, backend.model_name, operation, usage.get("input_tokens") or 0,
+                     usage.get("output_tokens") or 0, details.get("cache_read") or 0, estimated)
+
+    def _invoke(self, backend: LLMBackend, messages: List[BaseMessage]):
+        # Waits for the shared provider limits when client-side rate limiting is enabled
+        messages = self._provider_messages(backend, messages)
+        if backend.rate_limiter is None:
+            return backend.llm.invoke(messages)
+        estimated = estimate_tokens("".join(self._chunk_text(m) for m in messages)) + EXPECTED_OUTPUT_TOKENS
+        with backend.rate_limiter.slot(estimated):
+            response = backend.llm.invoke(messages)
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            backend.rate_limiter.settle_tokens(estimated, usage["total_tokens"])
+        return response
+
+    def _accept(self, backend: LLMBackend, messages: List[BaseMessage], response, operation: str,
+                start: float) -> str:
+        if not isinstance(response, BaseMessage):
             raise ValueError(f"Unexpected response type from LLM: {type(response)}")
-            
+        latency = time.perf_counter() - start
+        backend.breaker.record_success(latency)
+        if self.hedger is not None:
+            self.hedger.record((backend.provider, backend.model_name, operation), latency)
+        self._record_usage(backend, messages, response, operation)
+        content = str(response.content)
+        logger.info(f"Received response: {content[:100]}...")
+        return content
+
+    def _reject(self, backend: LLMBackend, error: Exception, operation: str) -> None:
+        LLM_ERRORS.labels(backend.provider, backend.model_name, operation).inc()
+        if isinstance(error, RateLimitTimeout):
+            # Our own limit was exhausted; the provider itself may be healthy
+            backend.breaker.release()
+            return
+        if is_client_error(error):
+            # The request is at fault, not the backend
+            backend.breaker.release()
+            logger.error(f"Request rejected by {backend.provider}: {str(error)}")
+            return
+        backend.breaker.record_failure()
+        logger.error(f"Error in LLM query to {backend.provider}: {str(error)}")
+
+    def _query_backend(self, backend: LLMBackend, messages: List[BaseMessage], operation: str) -> str:
+        start = time.perf_counter()
+        try:
+            logger.info(f"Sending query to {backend.provider} model: {backend.model_name}")
+            return self._accept(backend, messages, self._invoke(backend, messages), operation, start)
+        except Exception as e:
+            self._reject(backend, e, operation)
+            raise
+        finally:
+            LLM_LATENCY.labels(backend.provider, backend.model_name, operation).observe(time.perf_counter() - start)
+
+    async def _ainvoke(self, backend: LLMBackend, messages: List[BaseMessage]):
+        messages = self._provider_messages(backend, messages)
+        if backend.rate_limiter is None:
+            return await backend.llm.ainvoke(messages)
+        estimated = estimate_tokens("".join(self._chunk_text(m) for m in messages)) + EXPECTED_OUTPUT_TOKENS
+        async with backend.rate_limiter.aslot(estimated):
+            response = await backend.llm.ainvoke(messages)
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            await asyncio.to_thread(backend.rate_limiter.settle_tokens, estimated, usage["total_tokens"])
+        return response
+
+    async def _aquery_backend(self, backend: LLMBackend, messages: List[BaseMessage], operation: str) -> str:
+        start = time.perf_counter()
+        try:
+            logger.info(f"Sending query to {backend.provider} model: {backend.model_name}")
+            return self._accept(backend, messages, await self._ainvoke(backend, messages), operation, start)
+        except asyncio.CancelledError:
+            # A cancelled call says nothing about the backend, but may hold its half-open trial
+            backend.breaker.release()
+            raise
+        except Exception as e:
+            self._reject(backend, e, operation)
+            raise
+        finally:
+            LLM_LATENCY.labels(backend.provider, backend.model_name, operation).observe(time.perf_counter() - start)
+
+    def _hedge_target(self, position: int) -> Optional[LLMBackend]:
+        candidates = self.backends[position:position + 1]
+        if app_settings.LLM_HEDGE_TARGET == "fallback":
+            # Prefer the next provider in the chain; the same one if none is available
+            candidates = self.backends[position + 1:] + candidates
+        return next((backend for backend in candidates if backend.breaker.allow()), None)
+
+    def _hedged_query(self, backend: LLMBackend, position: int, messages: List[BaseMessage], operation: str) -> str:
+        """
+        Call ``backend`` and, if it is slower than usual, race a duplicate request against it.
+
+        The first successful answer wins. The other call can't be interrupted
+        mid-request, so it is abandoned: its thread finishes in the background
+        and its outcome only feeds the breaker and latency statistics.
+        """
+        hedger = self.hedger
+        delay = hedger.delay((backend.provider, backend.model_name, operation)) if hedger else None
+        if delay is None:
+            return self._query_backend(backend, messages, operation)
+
+        hedger.budget.earn()
+        primary = hedger.submit(self._query_backend, backend, messages, operation)
+        if primary is None:
+            # Every hedge thread is busy: make the call unhedged rather than wait for one
+            LLM_HEDGES.labels(backend.provider, backend.model_name, operation, "throttled").inc()
+            return self._query_backend(backend, messages, operation)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        target = self._hedge_target(position) if hedger.budget.spend() else None
+        hedge = hedger.submit(self._query_backend, target, messages, operation) if target else None
+        if hedge is None:
+            LLM_HEDGES.labels(backend.provider, backend.model_name, operation, "throttled").inc()
+            return primary.result()
+        logger.info(f"Hedging {operation} call to {backend.provider} after {delay:.2f}s "
+                    f"with {target.provider} model: {target.model_name}")
+
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    outcome = "won" if future is hedge else "lost"
+                    LLM_HEDGES.labels(backend.provider, backend.model_name, operation, outcome).inc()
+                    return future.result()
+                error = future.exception()
+        LLM_HEDGES.labels(backend.provider, backend.model_name, operation, "failed").inc()
+        raise error
+
+    def _retry_delay(self, attempt: int) -> float:
+        delay = backoff_delay(attempt - 1, app_settings.TASK_RETRY_BACKOFF, app_settings.LLM_RETRY_MAX_BACKOFF)
+        logger.warning(f"Retrying LLM query in {delay:.1f}s (attempt {attempt + 1})")
+        return delay
+
+    def query_timeout(self) -> float:
+        """
+        Longest a ``query`` can take: every retry round over the fallback chain
+        timing out after LLM_REQUEST_TIMEOUT (twice over when hedged), each call
+        after its longest rate limiter wait, plus the longest backoffs.
+        """
+        hedged = 2 if self.hedger is not None else 1
+        rounds = app_settings.TASK_RETRY_COUNT + 1
+        per_round = sum(
+            app_settings.LLM_REQUEST_TIMEOUT * hedged + (backend.rate_limiter.max_wait if backend.rate_limiter else 0)
+            for backend in self.backends
+        )
+        return rounds * per_round + app_settings.TASK_RETRY_COUNT * app_settings.LLM_RETRY_MAX_BACKOFF
+
+    def _unavailable(self) -> AllProvidersUnavailable:
+        chain = ", ".join(f"{backend.provider}:{backend.model_name}" for backend in self.backends)
+        return AllProvidersUnavailable(f"No LLM provider available: {chain}")
+
+    def query(self, prompt: str, operation: str = "query", prefix: Optional[str] = None) -> str:
+        """
+        Send a prompt and return the completion text.
+
+        Each round tries the providers of the fallback chain in order, skipping
+        those with an open circuit. Failed rounds are retried up to
+        TASK_RETRY_COUNT times after a jittered exponential backoff. Client
+        errors (bad request, authentication, context length) are raised at
+        once, without retries, failover or a breaker failure.
+
+        Args:
+            prompt (str): The user prompt
+            operation (str): Label for metrics, e.g. "summarize"
+            prefix (str): Leading part of the prompt shared with other calls, sent first so it can be cached
+
+        Returns:
+            str: The model response
+
+        Raises:
+            AllProvidersUnavailable: When every provider's circuit is open
+            Exception: The provider's error for a request it rejected as invalid
+        """
+        messages = self._build_messages(prompt, prefix)
+        last_error: Optional[Exception] = None
+        for attempt in range(app_settings.TASK_RETRY_COUNT + 1):
+            if attempt:
+                time.sleep(self._retry_delay(attempt))
+            tried = False
+            for position, backend in enumerate(self.backends):
+                if not backend.breaker.allow():
+                    continue
+                tried = True
+                try:
+                    content = self._hedged_query(backend, position, messages, operation)
+                except Exception as e:
+                    if is_client_error(e):
+                        # Retrying or failing over would send the same bad request again
+                        raise
+                    last_error = e
+                    continue
+                if position:
+                    LLM_FAILOVERS.labels(backend.provider, backend.model_name, operation).inc()
+                return content
+            if not tried:
+                # Fail fast instead of waiting out the backoff while every circuit is open
+                break
+        if not tried:
+            raise self._unavailable() from last_error
+        raise last_error
+
+    async def _ahedged_query(self, backend: LLMBackend, position: int, messages: List[BaseMessage],
+                             operation: str) -> str:
+        """Async variant of _hedged_query; the losing call is cancelled"""
+        hedger = self.hedger
+        delay = hedger.delay((backend.provider, backend.model_name, operation)) if hedger else None
+        if delay is None:
+            return await self._aquery_backend(backend, messages, operation)
+
+        hedger.budget.earn()
+        pending = {asyncio.ensure_future(self._aquery_backend(backend, messages, operation))}
+        primary = next(iter(pending))
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            target = self._hedge_target(position) if hedger.budget.spend() else None
+            if target is None:
+                LLM_HEDGES.labels(backend.provider, backend.model_name, operation, "throttled").inc()
+                return await primary
+            logger.info(f"Hedging {operation} call to {backend.provider} after {delay:.2f}s "
+                        f"with {target.provider} model: {target.model_name}")
+            hedge = asyncio.ensure_future(self._aquery_backend(target, messages, operation))
+            pending, error = {primary, hedge}, None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        outcome = "won" if task is hedge else "lost"
+                        LLM_HEDGES.labels(backend.provider, backend.model_name, operation, outcome).inc()
+                        return task.result()
+                    error = task.exception()
+            LLM_HEDGES.labels(backend.provider, backend.model_name, operation, "failed").inc()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aquery(self, prompt: str, operation: str = "query", prefix: Optional[str] = None) -> str:
+        """
+        Async variant of query built on the LangChain ainvoke interface.
+
+        Many calls can be in flight on one event loop; retries sleep without
+        blocking it and the losing call of a hedge is cancelled.
+
+        Args:
+            prompt (str): The user prompt
+            operation (str): Label for metrics, e.g. "summarize"
+            prefix (str): Leading part of the prompt shared with other calls, sent first so it can be cached
+
+        Returns:
+            str: The model response
+
+        Raises:
+            AllProvidersUnavailable: When every provider's circuit is open
+            Exception: The provider's error for a request it rejected as invalid
+        """
+        messages = self._build_messages(prompt, prefix)
+        last_error: Optional[Exception] = None
+        for attempt in range(app_settings.TASK_RETRY_COUNT + 1):
+            if attempt:
+                await asyncio.sleep(self._retry_delay(attempt))
+            tried = False
+            for position, backend in enumerate(self.backends):
+                if not backend.breaker.allow():
+                    continue
+                tried = True
+                try:
+                    content = await self._ahedged_query(backend, position, messages, operation)
+                except Exception as e:
+                    if is_client_error(e):
+                        raise
+                    last_error = e
+                    continue
+                if position:
+                    LLM_FAILOVERS.labels(backend.provider, backend.model_name, operation).inc()
+                return content
+            if not tried:
+                break
+        if not tried:
+            raise self._unavailable() from last_error
+        raise last_error
+
+    def _stream_outcome(self, backend: LLMBackend, response: Optional[BaseMessage], start: float,
+                        first_at: Optional[float]) -> int:
+        """Record the breaker outcome of a stream that ended without an error and return its reported tokens"""
+        if first_at is None:
+            # Closed before the backend answered: nothing was learned about it
+            backend.breaker.release()
+            return 0
+        # Time to the first chunk is what callers wait on; the rest scales with the output length
+        backend.breaker.record_success(first_at - start)
+        usage = getattr(response, "usage_metadata", None) or {}
+        return usage.get("total_tokens") or 0
+
+    def _stream_backend(self, backend: LLMBackend, messages: List[BaseMessage], operation: str) -> Iterator[str]:
+        messages = self._provider_messages(backend, messages)
+        estimated = estimate_tokens("".join(self._chunk_text(m) for m in messages)) + EXPECTED_OUTPUT_TOKENS
+        slot = backend.rate_limiter.slot(estimated) if backend.rate_limiter else contextlib.nullcontext()
+        start, first_at, response, failed = time.perf_counter(), None, None, False
+        try:
+            logger.info(f"Streaming query to {backend.provider} model: {backend.model_name}")
+            with slot:
+                for chunk in backend.llm.stream(messages):
+                    first_at = first_at or time.perf_counter()
+                    # Merging the chunks merges their usage metadata too
+                    response = chunk if response is None else response + chunk
+                    text = self._chunk_text(chunk)
+                    if text:
+                        yield text
         except Exception as e:
-            logger.error(f"Error in LLM query: {str(e)}")
+            failed = True
+            self._reject(backend, e, operation)
             raise
+        finally:
+            # Also reached when the caller closes the stream early
+            LLM_LATENCY.labels(backend.provider, backend.model_name, operation).observe(time.perf_counter() - start)
+            if response is not None:
+                self._record_usage(backend, messages, response, operation)
+            if not failed:
+                reported = self._stream_outcome(backend, response, start, first_at)
+                if reported and backend.rate_limiter is not None:
+                    backend.rate_limiter.settle_tokens(estimated, reported)
+
+    def stream_query(self, prompt: str, operation: str = "query", prefix: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream the completion for a prompt as text fragments.
+
+        Calls go through the rate limiter and circuit breaker like ``query``.
+        A provider that fails before its first fragment is skipped for the next
+        one in the fallback chain; once fragments were yielded, errors are
+        raised, since the caller already has part of the answer. Token usage
+        is taken from the final chunk; a stream closed before it is recorded
+        with locally estimated counts.
+
+        Args:
+            prompt (str): The user prompt
+            operation (str): Label for metrics, e.g. "summarize"
+            prefix (str): Leading part of the prompt shared with other calls, sent first so it can be cached
+
+        Yields:
+            str: Partial text as it is generated
 
+        Raises:
+            AllProvidersUnavailable: When every provider's circuit is open
+        """
+        messages = self._build_messages(prompt, prefix)
+        last_error: Optional[Exception] = None
+        tried = False
+        for position, backend in enumerate(self.backends):
+            if not backend.breaker.allow():
+                continue
+            tried = True
+            streamed = False
+            try:
+                # Closing the stream early ends the provider call and records its outcome right away
+                with contextlib.closing(self._stream_backend(backend, messages, operation)) as fragments:
+                    for text in fragments:
+                        if not streamed and position:
+                            LLM_FAILOVERS.labels(backend.provider, backend.model_name, operation).inc()
+                        streamed = True
+                        yield text
+                return
+            except Exception as e:
+                if streamed or is_client_error(e):
+                    raise
+                last_error = e
+        if not tried:
+            raise self._unavailable() from last_error
+        raise last_error
+
+    async def _astream_backend(self, backend: LLMBackend, messages: List[BaseMessage],
+                               operation: str) -> AsyncIterator[str]:
+        messages = self._provider_messages(backend, messages)
+        estimated = estimate_tokens("".join(self._chunk_text(m) for m in messages)) + EXPECTED_OUTPUT_TOKENS
+        slot = backend.rate_limiter.aslot(estimated) if backend.rate_limiter else contextlib.nullcontext()
+        start, first_at, response, failed = time.perf_counter(), None, None, False
+        try:
+            logger.info(f"Streaming query to {backend.provider} model: {backend.model_name}")
+            async with slot:
+                async for chunk in backend.llm.astream(messages):
+                    first_at = first_at or time.perf_counter()
+                    response = chunk if response is None else response + chunk
+                    text = self._chunk_text(chunk)
+                    if text:
+                        yield text
+        except Exception as e:
+            failed = True
+            self._reject(backend, e, operation)
+            raise
+        finally:
+            # Also reached when the caller closes the stream early or is cancelled
+            LLM_LATENCY.labels(backend.provider, backend.model_name, operation).observe(time.perf_counter() - start)
+            if response is not None:
+                self._record_usage(backend, messages, response, operation)
+            if not failed:
+                reported = self._stream_outcome(backend, response, start, first_at)
+                if reported and backend.rate_limiter is not None:
+                    await asyncio.to_thread(backend.rate_limiter.settle_tokens, estimated, reported)
 
+    async def astream_query(self, prompt: str, operation: str = "query",
+                            prefix: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Async variant of stream_query built on the LangChain astream interface.
 
+        Args:
+            prompt (str): The user prompt
+            operation (str): Label for metrics, e.g. "summarize"
+            prefix (str): Leading part of the prompt shared with other calls, sent first so it can be cached
 
+        Yields:
+            str: Partial text as it is generated
 
+        Raises:
+            AllProvidersUnavailable: When every provider's circuit is open
+        """
+        messages = self._build_messages(prompt, prefix)
+        last_error: Optional[Exception] = None
+        tried = False
+        for position, backend in enumerate(self.backends):
+            if not backend.breaker.allow():
+                continue
+            tried = True
+            streamed = False
+            try:
+                async with contextlib.aclosing(self._astream_backend(backend, messages, operation)) as fragments:
+                    async for text in fragments:
+                        if not streamed and position:
+                            LLM_FAILOVERS.labels(backend.provider, backend.model_name, operation).inc()
+                        streamed = True
+                        yield text
+                return
+            except Exception as e:
+                if streamed or is_client_error(e):
+                    raise
+                last_error = e
+        if not tried:
+            raise self._unavailable() from last_error
+        raise last_error
@@ -0,0 +1,164 @@
+import re
+import time
+import zlib
+import hashlib
+import logging
+from typing import List, Optional, Tuple
+import numpy as np
+from redis import Redis
+from src.configs.app import app_settings
+from src.modules.result_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Odd multiplier for the polynomial combination of word hashes into shingle hashes
+_SHINGLE_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles.
+
+    Each of the ``num_perm`` hash functions is a multiply-shift hash
+    ``(a * x + b) >> 32`` over 64-bit shingle hashes, evaluated for all
+    shingles at once with NumPy, so a signature costs one matrix minimum.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self.a = (rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = _WORD.findall(normalize_text(text).lower())
+        hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+        if len(hashes) <= self.shingle_size:
+            return np.array([np.bitwise_xor.reduce(hashes) if len(hashes) else 0], dtype=np.uint64)
+        count = len(hashes) - self.shingle_size + 1
+        combined = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for offset in range(self.shingle_size):
+                combined = combined * _SHINGLE_BASE + hashes[offset:offset + count]
+        return np.unique(combined)
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        with np.errstate(over="ignore"):
+            hashed = (self.a[:, None] * shingles[None, :] + self.b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures (of any common integer width)"""
+    return float(np.mean(a == b))
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures in Redis.
+
+    A signature is cut into ``bands`` bands; articles sharing any band are
+    candidates, and a candidate is a match when the estimated Jaccard
+    similarity of the stored signatures reaches ``threshold``. Each article
+    is a hash holding its signature (truncated to 16 bits per value) and the
+    task IDs that processed it, per result variant (operation, provider,
+    model and prompt version). Band entries live in hashes sharded by band
+    value so they stay in Redis' compact listpack encoding.
+
+    Entries are written to a generation that changes every ``ttl`` seconds
+    and are looked up in the current and previous generation, so memory is
+    bounded by two TTL windows of articles without tracking entries one by
+    one. Redis errors are logged and treated as a miss.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        hasher: Optional[MinHasher] = None,
+        bands: Optional[int] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[int] = None,
+        shards: int = 8192,
+        prefix: str = "neardup",
+    ):
+        self.redis = redis
+        self.hasher = hasher or MinHasher(num_perm=app_settings.NEAR_DUP_NUM_PERM)
+        self.bands = bands or app_settings.NEAR_DUP_BANDS
+        if self.hasher.num_perm % self.bands:
+            raise ValueError(f"{self.hasher.num_perm} permutations can't be split into {self.bands} bands")
+        self.rows = self.hasher.num_perm // self.bands
+        self.threshold = threshold or app_settings.NEAR_DUP_THRESHOLD
+        self.ttl = ttl or app_settings.RESULT_CACHE_TTL
+        self.shards = shards
+        self.prefix = prefix
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(text)
+
+    def _band_entries(self, signature: np.ndarray, generation: int) -> List[Tuple[str, bytes]]:
+        entries = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(rows, digest_size=8).digest()
+            shard = int.from_bytes(digest, "big") % self.shards
+            entries.append((f"{self.prefix}:{generation}:lsh:{band}:{shard}", digest))
+        return entries
+
+    def _generation(self) -> int:
+        return int(time.time() // self.ttl)
+
+    def lookup(self, signature: np.ndarray, variant: str) -> Optional[Tuple[str, float]]:
+        """
+        Find an indexed article close to ``signature`` with a result for ``variant``.
+
+        Returns:
+            Tuple[str, float]: Task ID of the most similar match and the estimated
+                similarity, or None
+        """
+        generation = self._generation()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for gen in (generation, generation - 1):
+                for key, field in self._band_entries(signature, gen):
+                    pipe.hget(key, field)
+            candidates = list(dict.fromkeys(doc_id for doc_id in pipe.execute() if doc_id is not None))
+            if not candidates:
+                return None
+
+            pipe = self.redis.pipeline(transaction=False)
+            for doc_id in candidates:
+                pipe.hmget(f"{self.prefix}:doc:{doc_id.decode()}", "sig", variant)
+            records = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed: {str(e)}")
+            return None
+
+        truncated = signature.astype(np.uint16)
+        best = None
+        for stored, task_id in records:
+            if stored is None or task_id is None:
+                continue
+            score = similarity(truncated, np.frombuffer(stored, dtype=np.uint16))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (task_id.decode(), score)
+        return best
+
+    def add(self, signature: np.ndarray, variant: str, task_id: str) -> None:
+        """Index an article whose ``variant`` result is stored under ``task_id``"""
+        generation = self._generation()
+        expire_at = (generation + 2) * self.ttl
+        try:
+            doc_id = self.redis.incr(f"{self.prefix}:next_id")
+            doc_key = f"{self.prefix}:doc:{doc_id}"
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(doc_key, mapping={"sig": signature.astype(np.uint16).tobytes(), variant: task_id})
+            pipe.expire(doc_key, 2 * self.ttl)
+            for key, field in self._band_entries(signature, generation):
+                pipe.hset(key, field, doc_id)
+                pipe.expireat(key, expire_at)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Near-duplicate index update failed: {str(e)}")
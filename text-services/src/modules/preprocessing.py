@@ -0,0 +1,147 @@
+import re
+import html
+import logging
+from typing import Tuple
+from src.configs.app import app_settings
+from src.modules.chunking import estimate_tokens, split_text
+from src.modules.metrics import PREPROCESS_TOKENS_REMOVED
+
+logger = logging.getLogger(__name__)
+
+# Markup: elements whose content is never article text, tags that end a block, and every other tag
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_NON_CONTENT = re.compile(
+    r"<(script|style|noscript|nav|header|footer|aside|form|iframe|svg|figure)\b[^>]*>.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_LINE_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_BLOCK_END = re.compile(r"</(?:p|div|h[1-6]|li|tr|section|article|blockquote|pre|table|ul|ol)\s*>", re.IGNORECASE)
+_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+
+# Lines made up entirely of one of these are dropped. Each pattern must match
+# the whole line, so article sentences that merely mention a phrase are kept.
+# Teaser, credit and copyright lines allow only a few trailing words (a source
+# or owner name), never a free-text sentence.
+_FEW_WORDS = r"[^\s.!?]+(?:\s+[^\s.!?]+){0,3}"
+BOILERPLATE_PATTERNS = (
+    r"(?:sign up|subscribe)\b.{0,60}\b(?:newsletter|updates|alerts|inbox|digest)\b.{0,80}",
+    r"(?:get|receive) (?:our|the) .{0,40}newsletter.{0,80}",
+    r"follow us on\b.{0,60}",
+    r"(?:(?:share|tweet|pin|email|print|copy link|save|comments?|facebook|twitter|x|linkedin|whatsapp|reddit"
+    r"|pinterest|telegram|messenger|on|this|article|story|via)\b[\s|,/•·:]*){1,12}",
+    r"(?:advertisement|advertising|sponsored(?: content)?|ad|story continues below(?: advertisement)?)",
+    r"(?:read more|related(?: articles| stories| coverage| content)?|recommended(?: for you)?|most (?:read|popular)"
+    r"|you (?:may|might) also like|trending(?: now)?|see also|watch also)\s*[:.…»›>]*",
+    r"more from " + _FEW_WORDS + r"\s*[:.…»›>]*",
+    r"(?:copyright\s*)?(?:©|\(c\))\s*" + _FEW_WORDS + r"\.?(?:\s*all rights reserved\.?)?",
+    r"copyright\s+\d{4}(?:\s*[-–]\s*\d{4})?\s*" + _FEW_WORDS + r"\.?(?:\s*all rights reserved\.?)?",
+    r"all rights reserved\.?",
+    r"(?:we use cookies|this (?:web)?site uses cookies)\b.{0,200}",
+    r"(?:cookie (?:policy|settings|preferences)|accept (?:all )?cookies|manage cookies)",
+    r"(?:click|tap) here\b.{0,60}",
+    r"(?:skip to (?:main )?content|jump to navigation|back to top|menu|search|home|log ?in|sign in|register)",
+    r"\(?(?:(?:image|photo|picture|video) credits?|image|photo|picture)\s*:\s*" + _FEW_WORDS + r"\)?",
+    # Navigation bars: short items separated by pipes, bullets or arrows
+    r"(?:[\w&'’ -]{1,25}\s*[|•·›»]\s*){2,}[\w&'’ -]{0,25}",
+)
+_BOILERPLATE = re.compile("|".join(f"(?:{pattern})" for pattern in BOILERPLATE_PATTERNS), re.IGNORECASE)
+# Longer lines are article text even when they match a pattern
+BOILERPLATE_MAX_CHARS = 250
+
+_INLINE_SPACE = re.compile(r"[^\S\n]+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def strip_markup(text: str) -> str:
+    """Replace HTML with its text, keeping paragraph breaks where blocks ended"""
+    if "<" in text:
+        text = _COMMENT.sub(" ", text)
+        text = _NON_CONTENT.sub("\n\n", text)
+        text = _LINE_BREAK.sub("\n", text)
+        text = _BLOCK_END.sub("\n\n", text)
+        text = _TAG.sub(" ", text)
+    return html.unescape(text) if "&" in text else text
+
+
+def _is_boilerplate(line: str) -> bool:
+    return len(line) <= BOILERPLATE_MAX_CHARS and _BOILERPLATE.fullmatch(line) is not None
+
+
+def clean_text(text: str) -> str:
+    """
+    Remove what scraped articles carry besides the article itself.
+
+    Strips markup, drops boilerplate lines (newsletter prompts, share bars,
+    navigation, cookie notices) and repeats of earlier lines, and collapses
+    whitespace. Paragraph breaks are kept for chunking.
+
+    Args:
+        text (str): Raw article text, possibly HTML
+
+    Returns:
+        str: The cleaned text
+    """
+    paragraphs, current, seen = [], [], set()
+    for line in strip_markup(text).split("\n"):
+        line = _INLINE_SPACE.sub(" ", line).strip()
+        if not line:
+            if current:
+                paragraphs.append(" ".join(current))
+                current = []
+            continue
+        key = line.lower()
+        if key in seen or _is_boilerplate(line):
+            continue
+        seen.add(key)
+        current.append(line)
+    if current:
+        paragraphs.append(" ".join(current))
+    return "\n\n".join(paragraphs)
+
+
+def token_budget(operation: str) -> int:
+    """Estimated article tokens an operation's prompt may carry; 0 is unlimited"""
+    return {
+        "summarize": app_settings.SUMMARIZE_TOKEN_BUDGET,
+        "categorize": app_settings.CATEGORIZE_TOKEN_BUDGET,
+        "extract_keywords": app_settings.EXTRACT_KEYWORDS_TOKEN_BUDGET,
+        "process": app_settings.PROCESS_TOKEN_BUDGET,
+    }.get(operation, 0)
+
+
+def apply_token_budget(text: str, max_tokens: int) -> str:
+    """Keep the leading paragraphs of ``text`` that fit ``max_tokens``, cutting at a sentence boundary if needed"""
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+    return split_text(text, max_tokens)[0]
+
+
+def preprocess(text: str, operation: str) -> Tuple[str, int]:
+    """
+    Clean an article and trim it to the operation's token budget.
+
+    Args:
+        text (str): The validated article text
+        operation (str): The operation the text is sent to, e.g. "categorize"
+
+    Returns:
+        Tuple[str, int]: The text to send and the estimated tokens removed
+    """
+    original = estimate_tokens(text)
+    cleaned = clean_text(text)
+    if len(cleaned) < 10:
+        # Nothing recognisable as article text is left; send it as it came
+        logger.warning(f"Preprocessing left no article text for {operation}, keeping the original")
+        cleaned = text
+    trimmed = apply_token_budget(cleaned, token_budget(operation))
+
+    cleaned_tokens, trimmed_tokens = estimate_tokens(cleaned), estimate_tokens(trimmed)
+    if original > cleaned_tokens:
+        PREPROCESS_TOKENS_REMOVED.labels(operation, "cleanup").inc(original - cleaned_tokens)
+    if cleaned_tokens > trimmed_tokens:
+        PREPROCESS_TOKENS_REMOVED.labels(operation, "budget").inc(cleaned_tokens - trimmed_tokens)
+    removed = original - trimmed_tokens
+    if removed:
+        logger.info(f"Preprocessing for {operation} removed {removed} of {original} estimated tokens "
+                    f"({original - cleaned_tokens} cleanup, {cleaned_tokens - trimmed_tokens} budget)")
+    return trimmed, removed
@@ -0,0 +1,360 @@
+import time
+import uuid
+import asyncio
+import random
+import logging
+import contextlib
+from typing import AsyncIterator, Iterator, Optional
+from redis import Redis
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
+from src.configs.app import app_settings
+from src.modules.metrics import LLM_CONCURRENCY_LIMIT, LLM_RATE_LIMIT_WAIT, LLM_THROTTLED
+
+logger = logging.getLogger(__name__)
+
+# Output tokens reserved per call before the provider reports the real usage
+EXPECTED_OUTPUT_TOKENS = 256
+# Slack between polls for a free slot, so waiting workers don't wake in lockstep
+_POLL_INTERVAL = 0.05
+
+# Token bucket. KEYS[1] bucket hash; ARGV: capacity, refill per second, cost, force.
+# Takes ``cost`` and returns 0, or returns the seconds until it can be taken.
+# A forced take never waits and may leave the bucket in debt (used to settle
+# the difference between estimated and reported tokens; negative costs refund).
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local needed = math.min(cost, capacity)
+local wait = 0
+if ARGV[4] == '0' and tokens < needed then
+  wait = (needed - tokens) / rate
+else
+  tokens = math.min(capacity, tokens - cost)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+# Concurrency slot. KEYS[1] lease sorted set, KEYS[2] state hash; ARGV: lease id,
+# lease ttl, initial limit. Leases expire so a crashed worker can't hold a slot.
+_ACQUIRE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local limit = tonumber(redis.call('HGET', KEYS[2], 'limit')) or tonumber(ARGV[3])
+if redis.call('ZCARD', KEYS[1]) < math.floor(limit) then
+  redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+  redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])))
+  return 1
+end
+return 0
+"""
+
+# AIMD update on release. KEYS[1] lease sorted set, KEYS[2] state hash; ARGV: lease id,
+# latency, throttled, min, max, decrease factor, latency target, latency tolerance.
+# A success adds 1/limit (about one slot per round of calls); a 429 or a call
+# slower than the target multiplies the limit by the factor, at most once per
+# round trip (the call's latency or the baseline, whichever is longer) so a
+# burst of overloaded calls counts as one signal. Other failures (latency 0)
+# only free the slot.
+# Returns the new limit.
+_RELEASE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+redis.call('ZREM', KEYS[1], ARGV[1])
+local latency = tonumber(ARGV[2])
+local low, high = tonumber(ARGV[4]), tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[2], 'limit', 'baseline', 'decreased_at')
+local limit = tonumber(state[1]) or low
+local baseline = tonumber(state[2])
+local target = tonumber(ARGV[7])
+local overloaded = ARGV[3] == '1'
+if not overloaded and latency > 0 then
+  if target <= 0 and baseline then
+    target = baseline * tonumber(ARGV[8])
+  end
+  overloaded = target > 0 and latency > target
+  -- Slow moving average, so a sustained rise stands out against it
+  if not baseline then
+    baseline = latency
+  else
+    baseline = baseline + (latency - baseline) * 0.02
+  end
+end
+if overloaded then
+  if now - (tonumber(state[3]) or 0) >= math.max(latency, baseline or 0) then
+    limit = math.max(low, limit * tonumber(ARGV[6]))
+    redis.call('HSET', KEYS[2], 'decreased_at', tostring(now))
+  end
+elseif latency > 0 then
+  limit = math.min(high, limit + 1 / limit)
+end
+redis.call('HSET', KEYS[2], 'limit', tostring(limit))
+if baseline then
+  redis.call('HSET', KEYS[2], 'baseline', tostring(baseline))
+end
+return tostring(limit)
+"""
+
+
+class RateLimitTimeout(Exception):
+    """No request slot became available within the wait limit"""
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether a provider exception is a 429 / quota rejection (OpenAI, Anthropic, Gemini, Ollama)"""
+    for candidate in (error, getattr(error, "__cause__", None)):
+        if candidate is None:
+            continue
+        response = getattr(candidate, "response", None)
+        status = getattr(candidate, "status_code", None) or getattr(response, "status_code", None)
+        if status == 429:
+            return True
+        name = type(candidate).__name__
+        if name in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+            return True
+    return "429" in str(error) and "rate" in str(error).lower()
+
+
+class ProviderRateLimiter:
+    """
+    Client-side limits for one provider and model, shared through Redis by
+    every worker process and API instance.
+
+    Each call waits for a request from the requests-per-minute bucket, for its
+    estimated tokens from the tokens-per-minute bucket and for a concurrency
+    slot. The concurrency limit adapts with AIMD: it grows by one slot per
+    round of successful calls and is cut by ``decrease_factor`` when the
+    provider answers 429 or latency rises past the target (a multiple of the
+    observed baseline unless ``latency_target`` is set), so throughput settles
+    at what the provider actually sustains. If Redis is unavailable calls are
+    let through unlimited.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        provider: str,
+        model: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        decrease_factor: float = 0.7,
+        latency_target: float = 0.0,
+        latency_tolerance: float = 2.0,
+        max_wait: float = 60.0,
+        lease_ttl: int = 120,
+    ):
+        self.redis = redis
+        self.provider = provider
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.latency_tolerance = latency_tolerance
+        self.max_wait = max_wait
+        self.lease_ttl = lease_ttl
+        prefix = f"ratelimit:{provider}:{model}"
+        self.requests_key = f"{prefix}:requests"
+        self.tokens_key = f"{prefix}:tokens"
+        self.leases_key = f"{prefix}:leases"
+        self.state_key = f"{prefix}:state"
+        self._take_script = redis.register_script(_TAKE_SCRIPT)
+        self._acquire_script = redis.register_script(_ACQUIRE_SCRIPT)
+        self._release_script = redis.register_script(_RELEASE_SCRIPT)
+
+    def _bucket_steps(self, key: str, per_minute: int, cost: float, deadline: float) -> Iterator[float]:
+        while True:
+            wait = float(self._take_script(keys=[key], args=[per_minute, per_minute / 60, cost, 0]))
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"{self.provider} rate limit wait of {wait:.1f}s exceeds {self.max_wait}s")
+            yield wait + random.uniform(0, _POLL_INTERVAL)
+
+    def _acquire_steps(self, lease: str, estimated_tokens: int, deadline: float) -> Iterator[float]:
+        """
+        Take from the buckets and claim a concurrency slot for ``lease``.
+
+        Yields the seconds to sleep between attempts, so the sync and async
+        callers share the logic and only differ in how they wait.
+        """
+        if self.requests_per_minute:
+            yield from self._bucket_steps(self.requests_key, self.requests_per_minute, 1, deadline)
+        if self.tokens_per_minute:
+            yield from self._bucket_steps(self.tokens_key, self.tokens_per_minute, estimated_tokens, deadline)
+        while not self._acquire_script(keys=[self.leases_key, self.state_key],
+                                       args=[lease, self.lease_ttl, self.min_concurrency]):
+            if time.monotonic() > deadline:
+                raise RateLimitTimeout(f"No {self.provider} concurrency slot within {self.max_wait}s")
+            yield random.uniform(0.5, 1.5) * _POLL_INTERVAL
+
+    def settle_tokens(self, estimated: int, actual: int) -> None:
+        """Charge (or refund) the difference between the reserved and the reported tokens"""
+        if not self.tokens_per_minute or actual == estimated:
+            return
+        try:
+            self._take_script(keys=[self.tokens_key],
+                       args=[self.tokens_per_minute, self.tokens_per_minute / 60, actual - estimated, 1])
+        except Exception as e:
+            logger.warning(f"Rate limiter token settlement failed: {str(e)}")
+
+    def _acquire(self, estimated_tokens: int) -> Optional[str]:
+        """Wait for the buckets and a concurrency slot; returns the lease, or None when Redis is unavailable"""
+        start = time.monotonic()
+        lease = uuid.uuid4().hex
+        try:
+            for wait in self._acquire_steps(lease, estimated_tokens, start + self.max_wait):
+                time.sleep(wait)
+            return lease
+        except RateLimitTimeout:
+            raise
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, calling {self.provider} unlimited: {str(e)}")
+            return None
+        finally:
+            LLM_RATE_LIMIT_WAIT.labels(self.provider, self.model).observe(time.monotonic() - start)
+
+    async def _aacquire(self, estimated_tokens: int) -> Optional[str]:
+        """Async variant of _acquire: Redis round trips run in the loop's executor and waits don't block it"""
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        lease = uuid.uuid4().hex
+        steps = self._acquire_steps(lease, estimated_tokens, start + self.max_wait)
+        try:
+            while True:
+                step = loop.run_in_executor(None, next, steps, None)
+                try:
+                    wait = await asyncio.shield(step)
+                except asyncio.CancelledError:
+                    step.add_done_callback(lambda done: self._abandon(loop, lease, done))
+                    raise
+                if wait is None:
+                    return lease
+                await asyncio.sleep(wait)
+        except RateLimitTimeout:
+            raise
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, calling {self.provider} unlimited: {str(e)}")
+            return None
+        finally:
+            LLM_RATE_LIMIT_WAIT.labels(self.provider, self.model).observe(time.monotonic() - start)
+
+    def _abandon(self, loop: asyncio.AbstractEventLoop, lease: str, step: asyncio.Future) -> None:
+        # The round trip of a cancelled caller may still have claimed the slot
+        if not step.cancelled() and step.exception() is None and step.result() is None:
+            loop.run_in_executor(None, self._release_slot, lease, 0.0, False)
+
+    def _outcome(self, error: Optional[BaseException]) -> bool:
+        # Failures other than 429s say nothing about capacity; they only free the slot
+        throttled = error is not None and is_rate_limit_error(error)
+        if throttled:
+            LLM_THROTTLED.labels(self.provider, self.model).inc()
+        return throttled
+
+    @contextlib.contextmanager
+    def slot(self, estimated_tokens: int) -> Iterator[None]:
+        """
+        Hold a request slot for one LLM call.
+
+        Args:
+            estimated_tokens (int): Input plus expected output tokens, taken from the token bucket
+
+        Raises:
+            RateLimitTimeout: When no slot frees up within ``max_wait`` seconds
+        """
+        lease = self._acquire(estimated_tokens)
+        if lease is None:
+            yield
+            return
+        called_at = time.monotonic()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            throttled = self._outcome(error)
+            # 429s carry their latency for the decrease window; other failures release with 0
+            latency = time.monotonic() - called_at if error is None or throttled else 0.0
+            self._release_slot(lease, latency, throttled)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, estimated_tokens: int) -> AsyncIterator[None]:
+        """Async variant of slot for callers on an event loop"""
+        lease = await self._aacquire(estimated_tokens)
+        if lease is None:
+            yield
+            return
+        called_at = time.monotonic()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            # Includes cancellation, e.g. of the losing call of a hedge
+            error = e
+            raise
+        finally:
+            throttled = self._outcome(error)
+            latency = time.monotonic() - called_at if error is None or throttled else 0.0
+            await asyncio.to_thread(self._release_slot, lease, latency, throttled)
+
+    def _release_slot(self, lease: str, latency: float, throttled: bool) -> None:
+        try:
+            limit = float(self._release_script(
+                keys=[self.leases_key, self.state_key],
+                args=[lease, latency, int(throttled), self.min_concurrency, self.max_concurrency,
+                      self.decrease_factor, self.latency_target, self.latency_tolerance],
+            ))
+            LLM_CONCURRENCY_LIMIT.labels(self.provider, self.model).set(limit)
+        except Exception as e:
+            logger.warning(f"Rate limiter release failed: {str(e)}")
+
+    def state(self) -> dict:
+        """Current concurrency limit, in-flight calls and baseline latency"""
+        limit, baseline = self.redis.hmget(self.state_key, "limit", "baseline")
+        return {
+            "limit": float(limit) if limit else float(self.min_concurrency),
+            "in_flight": self.redis.zcard(self.leases_key),
+            "baseline_latency": float(baseline) if baseline else None,
+        }
+
+
+def get_rate_limiter(provider: str, model: str) -> Optional[ProviderRateLimiter]:
+    """Return a limiter for ``provider``/``model`` from the LLM_RATE_LIMIT_* settings, or None when disabled"""
+    if not app_settings.LLM_RATE_LIMIT_ENABLED:
+        return None
+    # Retry dropped connections: a lost release would hold a slot until its lease expires
+    redis = Redis.from_url(
+        app_settings.REDIS_URL,
+        retry=Retry(ExponentialBackoff(cap=1.0), 3),
+        retry_on_error=[ConnectionError, TimeoutError],
+    )
+    return ProviderRateLimiter(
+        redis,
+        provider,
+        model,
+        requests_per_minute=app_settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=app_settings.LLM_TOKENS_PER_MINUTE,
+        min_concurrency=app_settings.LLM_MIN_CONCURRENCY,
+        max_concurrency=app_settings.LLM_MAX_CONCURRENCY,
+        latency_target=app_settings.LLM_LATENCY_TARGET,
+        latency_tolerance=app_settings.LLM_LATENCY_TOLERANCE,
+        max_wait=app_settings.LLM_REQUEST_TIMEOUT,
+        lease_ttl=2 * app_settings.LLM_REQUEST_TIMEOUT,
+    )
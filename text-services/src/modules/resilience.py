@@ -0,0 +1,151 @@
+import time
+import random
+import logging
+import threading
+from typing import Dict, Tuple
+from src.configs.app import app_settings
+from src.modules.metrics import LLM_CIRCUIT_OPENS
+
+logger = logging.getLogger(__name__)
+
+
+class AllProvidersUnavailable(Exception):
+    """Every provider in the fallback chain has an open circuit"""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Full-jitter exponential backoff: a uniform delay up to ``base * 2**attempt``.
+
+    The randomization keeps workers that failed together from retrying in lockstep.
+
+    Args:
+        attempt (int): Zero-based retry number
+        base (float): Delay bound of the first retry in seconds
+        cap (float): Upper bound of the delay in seconds
+
+    Returns:
+        float: Seconds to sleep
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# HTTP statuses that say nothing about the request itself: timeout, conflict, rate limit
+_RETRYABLE_CLIENT_STATUSES = (408, 409, 429)
+# Provider SDK exceptions for requests that will fail the same way on every retry
+_CLIENT_ERROR_NAMES = (
+    "BadRequestError", "AuthenticationError", "PermissionDeniedError", "NotFoundError",
+    "UnprocessableEntityError", "InvalidArgument", "PermissionDenied", "Unauthenticated",
+)
+
+
+def is_client_error(error: Exception) -> bool:
+    """
+    Whether a provider exception is caused by the request rather than the backend.
+
+    Bad requests (e.g. a prompt over the context length), invalid credentials
+    and unknown models fail the same way on every retry and don't mean the
+    provider is unhealthy. Timeouts, connection errors, 429 and 5xx answers,
+    and anything unrecognized, are not client errors.
+    """
+    for candidate in (error, getattr(error, "__cause__", None)):
+        if candidate is None:
+            continue
+        response = getattr(candidate, "response", None)
+        status = getattr(candidate, "status_code", None) or getattr(response, "status_code", None)
+        if isinstance(status, int) and 400 <= status < 500:
+            return status not in _RETRYABLE_CLIENT_STATUSES
+        if type(candidate).__name__ in _CLIENT_ERROR_NAMES:
+            return True
+    return "context length" in str(error).lower() or "context_length_exceeded" in str(error)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one provider/model in this process.
+
+    While closed, calls go through; ``failure_threshold`` consecutive failures
+    open it, and so do successful calls slower than ``slow_call`` seconds, so
+    a backend that answers but takes most of LLM_REQUEST_TIMEOUT is treated
+    like a failing one. An open circuit refuses calls for ``cooldown`` seconds
+    and then lets a single trial call through (half-open): success closes it,
+    failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0, slow_call: float = 0.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.slow_call = slow_call
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now; claims the trial call of a half-open circuit"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the trial call already in flight
+            return False
+
+    def record_success(self, latency: float = 0.0) -> None:
+        if self.slow_call and latency > self.slow_call:
+            logger.warning(f"Slow call to {self.name}: {latency:.1f}s")
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit for {self.name} opened for {self.cooldown}s "
+                                   f"after {self._failures} failures")
+                    LLM_CIRCUIT_OPENS.labels(*self.name.split(":", 1)).inc()
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a claimed trial call whose outcome says nothing about the backend"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str, model: str) -> CircuitBreaker:
+    """Return the breaker shared by every LLMClient of this process for ``provider``/``model``"""
+    key = (provider, model)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                f"{provider}:{model}",
+                failure_threshold=app_settings.LLM_BREAKER_FAILURES,
+                cooldown=app_settings.LLM_BREAKER_COOLDOWN,
+                slow_call=app_settings.LLM_BREAKER_SLOW_CALL,
+            )
+            _breakers[key] = breaker
+        return breaker
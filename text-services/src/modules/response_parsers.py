@@ -0,0 +1,66 @@
+import re
+import json
+import logging
+from typing import Any, Dict, Optional
+from pydantic import ValidationError
+from src.schemas.ioSchema import processLLMOutput
+
+logger = logging.getLogger(__name__)
+
+_FENCED_BLOCK = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+def _first_json_object(candidate: str) -> Optional[Dict[str, Any]]:
+    # raw_decode stops at the end of the first complete value, so trailing text is ignored
+    for match in re.finditer(r"\{", candidate):
+        try:
+            value, _ = _decoder.raw_decode(candidate, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def extract_json_object(response: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract the first JSON object from an LLM response.
+
+    Fenced ```json blocks are tried first, then the raw response, so leading
+    prose and trailing commentary around the object are tolerated.
+
+    Args:
+        response (str): Raw model output
+
+    Returns:
+        Dict: The decoded object, or None when no object could be found
+    """
+    if not response:
+        return None
+    for block in _FENCED_BLOCK.findall(response):
+        value = _first_json_object(block)
+        if value is not None:
+            return value
+    return _first_json_object(response)
+
+
+def parse_process_response(response: str) -> processLLMOutput:
+    """
+    Parse a single-call process response into validated fields.
+
+    Args:
+        response (str): Raw model output for PROCESS_PROMPT
+
+    Returns:
+        processLLMOutput: Parsed fields; any missing or invalid field is None
+    """
+    data = extract_json_object(response)
+    if data is None:
+        logger.warning("No JSON object found in process response")
+        return processLLMOutput()
+    try:
+        return processLLMOutput.model_validate(data)
+    except ValidationError as e:
+        logger.warning(f"Invalid process response: {str(e)}")
+        return processLLMOutput()
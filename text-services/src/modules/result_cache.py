@@ -0,0 +1,91 @@
+import json
+import time
+import hashlib
+import logging
+import unicodedata
+from typing import Any, Dict, Optional
+from redis import Redis
+from src.configs.app import app_settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for content addressing: NFC unicode, collapsed whitespace"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+class ResultCache:
+    """
+    Content-addressed cache of task results in Redis.
+
+    Entries are keyed by a hash of the normalized text, the operation, the
+    provider, the model and the prompt version. Each entry expires after
+    ``ttl`` seconds, and an insertion-ordered index keeps at most
+    ``max_entries`` entries by evicting the oldest. Redis errors are logged and
+    treated as a miss so the cache can never fail a task.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        prefix: str = "cache:result",
+    ):
+        self.redis = redis
+        self.ttl = ttl or app_settings.RESULT_CACHE_TTL
+        self.max_entries = max_entries or app_settings.RESULT_CACHE_MAX_ENTRIES
+        self.prefix = prefix
+        self.index_key = f"{prefix}:index"
+        self.stats_key = f"{prefix}:stats"
+
+    def make_key(self, operation: str, text: str, provider: str, model: str, prompt_version: str) -> str:
+        digest = hashlib.sha256(
+            json.dumps([prompt_version, operation, provider, model, normalize_text(text)]).encode("utf-8")
+        ).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def get(self, key: str, operation: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.redis.get(key)
+            self.redis.hincrby(self.stats_key, f"{operation}:{'hits' if raw is not None else 'misses'}", 1)
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(key, json.dumps(payload), ex=self.ttl)
+            pipe.zadd(self.index_key, {key: now})
+            # Drop index entries whose values have already expired
+            pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl)
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.max_entries
+            if overflow > 0:
+                evicted = [member for member, _ in self.redis.zpopmin(self.index_key, overflow)]
+                if evicted:
+                    self.redis.delete(*evicted)
+        except Exception as e:
+            logger.warning(f"Result cache store failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters per operation and the current number of entries"""
+        raw = self.redis.hgetall(self.stats_key)
+        counters: Dict[str, Dict[str, int]] = {}
+        for field, value in raw.items():
+            operation, _, kind = field.decode().rpartition(":")
+            counters.setdefault(operation, {"hits": 0, "misses": 0})[kind] = int(value)
+        return {
+            "entries": self.redis.zcard(self.index_key),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "operations": counters,
+        }
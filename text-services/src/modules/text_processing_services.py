@@ -1,5 +1,10 @@
 import re
+import asyncio
+import contextlib
 import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
 from src.schemas.model import Status
 from src.schemas.ioSchema import (
     summarizeResult,
@@ -8,14 +13,63 @@ from src.schemas.ioSchema import (
     processResults
 )
 from src.configs._prompts import PromptsBank
+from src.configs.app import app_settings
 from src.modules.model_factory import LLMClient
+from src.modules.response_parsers import parse_process_response
+from src.modules.chunking import split_text
+from src.modules.preprocessing import preprocess
+from src.modules.usage import record_preprocessing, submit_in_context
+from src.modules.local_classifier import get_category_classifier, match_category, record_sample
+from src.modules.keyword_extractor import get_keyword_extractor
+from src.modules.metrics import SERVICE_LATENCY, PARSE_LATENCY, CATEGORY_DECISIONS, timed
 
 logger = logging.getLogger(__name__)
 
+SUB_TASKS = ("summarize", "categorize", "extract_keywords")
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+MAX_SUMMARY_SENTENCES = 3
+# Partial summaries are re-chunked at most this many times before the final call
+MAX_REDUCE_DEPTH = 3
+MAX_KEYWORDS = 10
+# Characters of the article opening sent with hybrid keyword reranking
+RERANK_LEAD_CHARS = 500
+
+
+class SentenceLimiter:
+    """
+    Incremental version of the summary truncation: fed streamed fragments, it
+    returns the text that is safe to emit and stops after the third sentence.
+    Trailing whitespace is held back so the emitted text matches the stripped
+    non-streaming summary.
+    """
+
+    def __init__(self, max_sentences: int = MAX_SUMMARY_SENTENCES):
+        self.max_sentences = max_sentences
+        self.buffer = ""
+        self.emitted = 0
+        self.done = False
+
+    def feed(self, fragment: str) -> str:
+        if self.done:
+            return ""
+        self.buffer += fragment
+        text = self.buffer.lstrip()
+        boundaries = [m.start() for m in SENTENCE_BOUNDARY.finditer(text)]
+        if len(boundaries) >= self.max_sentences:
+            text = text[:boundaries[self.max_sentences - 1]]
+            self.done = True
+        # Sentences are joined with single spaces, as in the truncated non-streaming summary
+        text = SENTENCE_BOUNDARY.sub(' ', text.rstrip())
+        output = text[self.emitted:]
+        self.emitted = len(text)
+        return output
+
 class TextProcessingService:
     def __init__(self, llm_client: LLMClient = None):
         self.llm_client = llm_client or LLMClient()
         self.prompts = PromptsBank()
+        self._executor = None
+        self._chunk_executor = None
         logger.info(f"TextProcessingService initialized with {self.llm_client.provider} provider")
 
     def _validate_text(self, text: str) -> str:
@@ -23,24 +77,327 @@ class TextProcessingService:
             raise ValueError("Text is too short to process")
         return text.strip()
 
+    def _prepare(self, text: str, operation: str) -> Tuple[str, int]:
+        """Validate the text, then clean it and apply the operation's token budget; also returns the tokens removed"""
+        text = self._validate_text(text)
+        if not app_settings.PREPROCESS_ENABLED:
+            return text, 0
+        return preprocess(text, operation)
+
+    def _preprocess(self, text: str, operation: str) -> str:
+        # The removed tokens are reported with the request's usage
+        text, removed = self._prepare(text, operation)
+        record_preprocessing(removed)
+        return text
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so sequential deployments never spawn threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=app_settings.PROCESS_MAX_WORKERS,
+                thread_name_prefix="process",
+            )
+        return self._executor
+
+    def _split(self, text: str) -> List[str]:
+        if not app_settings.CHUNKING_ENABLED:
+            return [text]
+        return split_text(text, app_settings.get_chunk_tokens(self.llm_client.provider))
+
+    def _map_chunks(self, fn: Callable[[str], object], chunks: List[str]) -> list:
+        """
+        Apply fn to every chunk concurrently, preserving order.
+
+        Uses its own pool so chunk calls issued from inside a process sub-task
+        can never wait on a slot of the pool that is running them.
+        """
+        if self._chunk_executor is None:
+            self._chunk_executor = ThreadPoolExecutor(
+                max_workers=app_settings.CHUNK_MAX_WORKERS,
+                thread_name_prefix="chunk",
+            )
+        futures = [submit_in_context(self._chunk_executor, fn, chunk) for chunk in chunks]
+        return [future.result() for future in futures]
+
+    async def _amap_chunks(self, fn: Callable[[str], Awaitable], chunks: List[str]) -> list:
+        """Async variant of _map_chunks; at most CHUNK_MAX_WORKERS chunk calls are in flight"""
+        semaphore = asyncio.Semaphore(app_settings.CHUNK_MAX_WORKERS)
+
+        async def bounded(chunk: str):
+            async with semaphore:
+                return await fn(chunk)
+
+        return await asyncio.gather(*(bounded(chunk) for chunk in chunks))
+
+    def _ask(self, instructions: str, text: str, operation: str) -> str:
+        # The article leads the prompt, so every call about the same text shares a cacheable prefix
+        return self.llm_client.query(instructions, operation=operation, prefix=self.prompts.article(text))
+
+    async def _aask(self, instructions: str, text: str, operation: str) -> str:
+        return await self.llm_client.aquery(instructions, operation=operation, prefix=self.prompts.article(text))
+
+    def _summarize_chunk(self, chunk: str) -> str:
+        return self._ask(self.prompts.summarize_instructions, chunk, "summarize")
+
+    async def _asummarize_chunk(self, chunk: str) -> str:
+        return await self._aask(self.prompts.summarize_instructions, chunk, "summarize")
+
+    def _condense_for_summary(self, text: str, depth: int = 0) -> str:
+        """
+        Map step of map-reduce summarization.
+
+        Oversized text is split into chunks that are summarized concurrently;
+        the joined partial summaries replace the text, repeating until it fits
+        in one call.
+        """
+        chunks = self._split(text)
+        if len(chunks) <= 1 or depth >= MAX_REDUCE_DEPTH:
+            return text
+        logger.info(f"Summarizing {len(chunks)} chunks (depth {depth})")
+        partials = self._map_chunks(self._summarize_chunk, chunks)
+        return self._condense_for_summary("\n\n".join(p.strip() for p in partials), depth + 1)
+
+    async def _acondense_for_summary(self, text: str, depth: int = 0) -> str:
+        chunks = self._split(text)
+        if len(chunks) <= 1 or depth >= MAX_REDUCE_DEPTH:
+            return text
+        logger.info(f"Summarizing {len(chunks)} chunks (depth {depth})")
+        partials = await self._amap_chunks(self._asummarize_chunk, chunks)
+        return await self._acondense_for_summary("\n\n".join(p.strip() for p in partials), depth + 1)
+
+    def _keywords_for_chunk(self, chunk: str) -> List[str]:
+        response = self._ask(self.prompts.extract_keywords_instructions, chunk, "extract_keywords")
+        return self._clean_keywords(response.strip().split(','))
+
+    async def _akeywords_for_chunk(self, chunk: str) -> List[str]:
+        response = await self._aask(self.prompts.extract_keywords_instructions, chunk, "extract_keywords")
+        return self._clean_keywords(response.strip().split(','))
+
+    def _merge_keywords(self, keyword_lists: List[List[str]]) -> List[str]:
+        # Reduce step: rank by the number of chunks naming a keyword, then by first appearance
+        counts, first_seen, display = {}, {}, {}
+        for keywords in keyword_lists:
+            for keyword in dict.fromkeys(k.lower() for k in keywords):
+                counts[keyword] = counts.get(keyword, 0) + 1
+                first_seen.setdefault(keyword, len(first_seen))
+            for k in keywords:
+                display.setdefault(k.lower(), k)
+        ranked = sorted(counts, key=lambda k: (-counts[k], first_seen[k]))
+        return [display[k] for k in ranked][:MAX_KEYWORDS]
+
+    def _parse_keywords(self, response: str) -> Tuple[List[str], str]:
+        # Clean up the response and split by commas
+        response = response.strip()
+        with PARSE_LATENCY.labels("extract_keywords").time():
+            keywords = self._clean_keywords(response.split(','))
+        return keywords, response
+
+    def _llm_keywords(self, text: str) -> Tuple[List[str], str]:
+        """Keywords from the extract-keywords prompt, map-reduced over chunks for long articles"""
+        chunks = self._split(text)
+        if len(chunks) > 1:
+            logger.info(f"Extracting keywords from {len(chunks)} chunks")
+            return self._merge_keywords(self._map_chunks(self._keywords_for_chunk, chunks)), ""
+
+        response = self._ask(self.prompts.extract_keywords_instructions, text, "extract_keywords")
+        return self._parse_keywords(response)
+
+    async def _allm_keywords(self, text: str) -> Tuple[List[str], str]:
+        chunks = self._split(text)
+        if len(chunks) > 1:
+            logger.info(f"Extracting keywords from {len(chunks)} chunks")
+            return self._merge_keywords(await self._amap_chunks(self._akeywords_for_chunk, chunks)), ""
+
+        response = await self._aask(self.prompts.extract_keywords_instructions, text, "extract_keywords")
+        return self._parse_keywords(response)
+
+    def _rerank_prompt(self, text: str) -> Tuple[List[str], Optional[str]]:
+        candidates = get_keyword_extractor().extract(text, top_k=app_settings.KEYWORD_CANDIDATES)
+        if len(candidates) <= 1:
+            return candidates, None
+        lead = " ".join(SENTENCE_BOUNDARY.split(text)[:2])[:RERANK_LEAD_CHARS]
+        return candidates, self.prompts.keyword_rerank_prompt.format(lead=lead, candidates=", ".join(candidates))
+
+    def _apply_rerank(self, candidates: List[str], response: str) -> List[str]:
+        with PARSE_LATENCY.labels("rerank_keywords").time():
+            # _clean_keywords strips hyphens, so candidates are matched in their cleaned form
+            allowed = {self._clean_keywords([c])[0].lower(): c for c in candidates}
+            chosen = [allowed.get(k.lower()) for k in self._clean_keywords(response.split(','))]
+            chosen = list(dict.fromkeys(k for k in chosen if k))
+        return chosen[:MAX_KEYWORDS] or candidates[:MAX_KEYWORDS]
+
+    def _rerank_keywords(self, text: str) -> List[str]:
+        """
+        Hybrid keywords: local candidates, reordered and filtered by a short LLM prompt.
+
+        The prompt carries the article opening instead of the whole article,
+        and only answers naming a candidate are kept, so the LLM can't add
+        keywords the extractor didn't find. Falls back to the local ranking
+        if the LLM fails or picks nothing usable.
+        """
+        candidates, prompt = self._rerank_prompt(text)
+        if prompt is None:
+            return candidates
+        try:
+            response = self.llm_client.query(prompt, operation="rerank_keywords")
+        except Exception as e:
+            logger.warning(f"Keyword rerank failed, using local ranking: {str(e)}")
+            return candidates[:MAX_KEYWORDS]
+        return self._apply_rerank(candidates, response)
+
+    async def _arerank_keywords(self, text: str) -> List[str]:
+        candidates, prompt = self._rerank_prompt(text)
+        if prompt is None:
+            return candidates
+        try:
+            response = await self.llm_client.aquery(prompt, operation="rerank_keywords")
+        except Exception as e:
+            logger.warning(f"Keyword rerank failed, using local ranking: {str(e)}")
+            return candidates[:MAX_KEYWORDS]
+        return self._apply_rerank(candidates, response)
+
+    def _run_operation(self, operation: str, text: str, keyword_engine: Optional[str] = None) -> BaseModel:
+        if operation == "extract_keywords":
+            return self.extract_keywords(text, keyword_engine)
+        return getattr(self, operation)(text)
+
+    async def _arun_operation(self, operation: str, text: str, keyword_engine: Optional[str] = None) -> BaseModel:
+        if operation == "extract_keywords":
+            return await self.aextract_keywords(text, keyword_engine)
+        return await getattr(self, f"a{operation}")(text)
+
+    def _run_sub_tasks(self, text: str, operations: Sequence[str] = SUB_TASKS,
+                       keyword_engine: Optional[str] = None) -> Dict[str, BaseModel]:
+        """
+        Run the given per-field methods (summarize, categorize, extract_keywords) for the same text.
+
+        When PROCESS_PARALLEL_TASKS is enabled the LLM calls are issued
+        concurrently, so the wall time is close to the slowest call instead of
+        the sum of all of them.
+        """
+        if not app_settings.PROCESS_PARALLEL_TASKS or len(operations) < 2:
+            return {operation: self._run_operation(operation, text, keyword_engine) for operation in operations}
+
+        executor = self._get_executor()
+        futures = {
+            operation: submit_in_context(executor, self._run_operation, operation, text, keyword_engine)
+            for operation in operations
+        }
+        # Each sub-method catches its own errors and returns an ERROR result
+        return {operation: future.result() for operation, future in futures.items()}
+
+    async def _arun_sub_tasks(self, text: str, operations: Sequence[str] = SUB_TASKS,
+                              keyword_engine: Optional[str] = None) -> Dict[str, BaseModel]:
+        if not app_settings.PROCESS_PARALLEL_TASKS or len(operations) < 2:
+            return {operation: await self._arun_operation(operation, text, keyword_engine)
+                    for operation in operations}
+        results = await asyncio.gather(*(self._arun_operation(op, text, keyword_engine) for op in operations))
+        return dict(zip(operations, results))
+
+    def _single_call_results(self, parsed, keyword_engine: Optional[str]) -> Tuple[Dict[str, BaseModel], List[str]]:
+        """Per-field results from a parsed combined answer, and the fields that still need their own call"""
+        results = {}
+        if parsed is not None and parsed.summary:
+            results["summarize"] = summarizeResult(summary=self._clean_summary(parsed.summary), status=Status.SUCCESS)
+        if parsed is not None and parsed.category:
+            results["categorize"] = categoryResults(category=parsed.category.value, status=Status.SUCCESS)
+        llm_keywords = (keyword_engine or app_settings.KEYWORD_ENGINE) == "llm"
+        if parsed is not None and parsed.keywords and llm_keywords:
+            keywords = self._clean_keywords(parsed.keywords)
+            if keywords:
+                results["extract_keywords"] = extract_keywordsResults(keywords=keywords, status=Status.SUCCESS)
+
+        missing = [operation for operation in SUB_TASKS if operation not in results]
+        if missing and (missing != ["extract_keywords"] or llm_keywords):
+            logger.warning(f"Single-call process missing fields, falling back for: {', '.join(missing)}")
+        return results, missing
+
+    def _run_single_call(self, text: str, keyword_engine: Optional[str] = None,
+                         source: Optional[str] = None) -> Dict[str, BaseModel]:
+        """
+        Ask for summary, category and keywords in one LLM call.
+
+        Fields that are missing or fail validation are filled by the matching
+        per-field method, so the output matches the multi-call mode. Keywords
+        from the combined answer are only used with the "llm" keyword engine.
+        ``source`` is the article before the process budget; the per-field
+        methods get it to apply their own budgets (defaults to ``text``).
+        """
+        parsed = None
+        try:
+            response = self._ask(self.prompts.process_instructions, text, "process")
+            with PARSE_LATENCY.labels("process").time():
+                parsed = parse_process_response(response)
+        except Exception as e:
+            logger.error(f"Error in single-call process: {str(e)}")
+
+        results, missing = self._single_call_results(parsed, keyword_engine)
+        if missing:
+            results.update(self._run_sub_tasks(source or text, missing, keyword_engine))
+        return results
+
+    async def _arun_single_call(self, text: str, keyword_engine: Optional[str] = None,
+                                source: Optional[str] = None) -> Dict[str, BaseModel]:
+        parsed = None
+        try:
+            response = await self._aask(self.prompts.process_instructions, text, "process")
+            with PARSE_LATENCY.labels("process").time():
+                parsed = parse_process_response(response)
+        except Exception as e:
+            logger.error(f"Error in single-call process: {str(e)}")
+
+        results, missing = self._single_call_results(parsed, keyword_engine)
+        if missing:
+            results.update(await self._arun_sub_tasks(source or text, missing, keyword_engine))
+        return results
+
+    def _clean_summary(self, response: str) -> str:
+        summary = response.strip()
+        sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(summary) if s.strip()]
+        if len(sentences) > MAX_SUMMARY_SENTENCES:
+            summary = ' '.join(sentences[:MAX_SUMMARY_SENTENCES])
+        return summary
+
+    def _clean_keywords(self, keywords: Sequence[str]) -> List[str]:
+        # Remove any markdown bullet points, asterisks, or numbers
+        keywords = [k.replace('*', '').replace('#', '').replace('-', '').strip() for k in keywords]
+        # Remove any empty strings and limit to 10 keywords
+        return [k for k in keywords if k][:MAX_KEYWORDS]
+
+    def _summary_result(self, response: str) -> summarizeResult:
+        with PARSE_LATENCY.labels("summarize").time():
+            summary = self._clean_summary(response)
+
+        logger.info(f"Generated summary: {summary}")
+        return summarizeResult(
+            summary=summary,
+            status=Status.SUCCESS
+        )
+
+    @timed(SERVICE_LATENCY, operation="summarize")
     def summarize(self, text: str) -> summarizeResult:
         try:
-            text = self._validate_text(text)
+            text = self._preprocess(text, "summarize")
             logger.info("Preparing prompt for summarization")
             
-            prompt = self.prompts.summarize_prompt.format(text=text)
-            response = self.llm_client.query(prompt)
-            
-            summary = response.strip()
-            sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', summary) if s.strip()]
-            if len(sentences) > 3:
-                summary = ' '.join(sentences[:3])
-            
-            logger.info(f"Generated summary: {summary}")
+            condensed = self._condense_for_summary(text)
+            response = self._ask(self.prompts.summarize_instructions, condensed, "summarize")
+            return self._summary_result(response)
+        except Exception as e:
+            logger.error(f"Error in summarize: {str(e)}")
             return summarizeResult(
-                summary=summary,
-                status=Status.SUCCESS
+                summary="",
+                status=Status.ERROR
             )
+
+    @timed(SERVICE_LATENCY, operation="summarize")
+    async def asummarize(self, text: str) -> summarizeResult:
+        """Async variant of summarize"""
+        try:
+            text = self._preprocess(text, "summarize")
+            condensed = await self._acondense_for_summary(text)
+            response = await self._aask(self.prompts.summarize_instructions, condensed, "summarize")
+            return self._summary_result(response)
         except Exception as e:
             logger.error(f"Error in summarize: {str(e)}")
             return summarizeResult(
@@ -48,17 +405,92 @@ class TextProcessingService:
                 status=Status.ERROR
             )
 
+    def summarize_stream(self, text: str) -> Iterator[str]:
+        """
+        Stream a summary, truncated to three sentences as it is generated.
+
+        Raises ValueError before any output if the text is too short. Closing
+        the generator early also stops reading from the model.
+        """
+        text = self._preprocess(text, "summarize")
+        prefix = self.prompts.article(self._condense_for_summary(text))
+        limiter = SentenceLimiter()
+        # Same article prefix and instructions as summarize, so the stream shares its prompt cache
+        stream = self.llm_client.stream_query(self.prompts.summarize_instructions, operation="summarize", prefix=prefix)
+        # Closing the model stream right away records its usage in this context
+        with contextlib.closing(stream) as fragments:
+            for fragment in fragments:
+                output = limiter.feed(fragment)
+                if output:
+                    yield output
+                if limiter.done:
+                    break
+
+    async def asummarize_stream(self, text: str) -> AsyncIterator[str]:
+        """Async variant of summarize_stream"""
+        text = self._preprocess(text, "summarize")
+        prefix = self.prompts.article(await self._acondense_for_summary(text))
+        limiter = SentenceLimiter()
+        stream = self.llm_client.astream_query(self.prompts.summarize_instructions, operation="summarize", prefix=prefix)
+        async with contextlib.aclosing(stream) as fragments:
+            async for fragment in fragments:
+                output = limiter.feed(fragment)
+                if output:
+                    yield output
+                if limiter.done:
+                    break
+
+    def _local_category(self, text: str) -> Optional[categoryResults]:
+        # Obvious articles are answered by the local classifier without an LLM call
+        classifier = get_category_classifier()
+        if classifier is None:
+            return None
+        label, confidence = classifier.predict(text)
+        if confidence >= app_settings.CATEGORY_CLASSIFIER_THRESHOLD:
+            CATEGORY_DECISIONS.labels("local").inc()
+            logger.info(f"Category {label} from local classifier (confidence {confidence:.2f})")
+            return categoryResults(category=label, status=Status.SUCCESS)
+        CATEGORY_DECISIONS.labels("llm").inc()
+        return None
+
+    def _category_result(self, text: str, response: str) -> categoryResults:
+        category = response.strip()
+        matched = match_category(category)
+        if matched is not None:
+            record_sample(text, matched)
+        return categoryResults(
+            category=category,
+            status=Status.SUCCESS
+        )
+
+    @timed(SERVICE_LATENCY, operation="categorize")
     def categorize(self, text: str) -> categoryResults:
         try:
-            text = self._validate_text(text)
-            prompt = self.prompts.category_prompt.format(text=text)
-            response = self.llm_client.query(prompt)
+            text = self._preprocess(text, "categorize")
+            local = self._local_category(text)
+            if local is not None:
+                return local
             
-            category = response.strip()
+            response = self._ask(self.prompts.category_instructions, text, "categorize")
+            return self._category_result(text, response)
+        except Exception as e:
+            logger.error(f"Error in categorize: {str(e)}")
             return categoryResults(
-                category=category,
-                status=Status.SUCCESS
+                category="",
+                status=Status.ERROR
             )
+
+    @timed(SERVICE_LATENCY, operation="categorize")
+    async def acategorize(self, text: str) -> categoryResults:
+        """Async variant of categorize"""
+        try:
+            text = self._preprocess(text, "categorize")
+            local = self._local_category(text)
+            if local is not None:
+                return local
+
+            response = await self._aask(self.prompts.category_instructions, text, "categorize")
+            return self._category_result(text, response)
         except Exception as e:
             logger.error(f"Error in categorize: {str(e)}")
             return categoryResults(
@@ -66,37 +498,65 @@ class TextProcessingService:
                 status=Status.ERROR
             )
 
-    def extract_keywords(self, text: str) -> extract_keywordsResults:
-        try:
-            text = self._validate_text(text)
-            prompt = self.prompts.extract_keywords_prompt.format(text=text)
-            response = self.llm_client.query(prompt)
-            
-            # Clean up the response and split by commas
-            response = response.strip()
-            
-            # Handle potential formatting issues
-            # Remove any markdown bullet points, asterisks, or numbers
-            response = response.replace('*', '').replace('#', '').replace('-', '')
-            
-            # Split by commas and clean each keyword
-            keywords = [keyword.strip() for keyword in response.split(',') if keyword.strip()]
-            
-            # Remove any empty strings and limit to 10 keywords
-            keywords = [k for k in keywords if k][:10]
+    def _keywords_result(self, keywords: List[str], engine: str, response: str) -> extract_keywordsResults:
+        if not keywords:
+            logger.warning(f"No keywords extracted by the {engine} engine")
+            logger.debug(f"Original response: {response}")
+            return extract_keywordsResults(
+                keywords=[],
+                status=Status.ERROR
+            )
             
-            if not keywords:
-                logger.warning("No keywords extracted from LLM response")
-                logger.debug(f"Original response: {response}")
-                return extract_keywordsResults(
-                    keywords=[],
-                    status=Status.ERROR
-                )
-                
+        return extract_keywordsResults(
+            keywords=keywords,
+            status=Status.SUCCESS
+        )
+
+    @timed(SERVICE_LATENCY, operation="extract_keywords")
+    def extract_keywords(self, text: str, keyword_engine: Optional[str] = None) -> extract_keywordsResults:
+        """
+        Extract keywords from the article.
+
+        Args:
+            text (str): The article text
+            keyword_engine (str): "llm", "local" (statistical, no model call) or "hybrid"
+                (LLM reranks local candidates); defaults to KEYWORD_ENGINE
+
+        Returns:
+            extract_keywordsResults: Up to 10 keywords
+        """
+        try:
+            text = self._preprocess(text, "extract_keywords")
+            engine = keyword_engine or app_settings.KEYWORD_ENGINE
+            response = ""
+            if engine == "local":
+                keywords = get_keyword_extractor().extract(text, top_k=MAX_KEYWORDS)
+            elif engine == "hybrid":
+                keywords = self._rerank_keywords(text)
+            else:
+                keywords, response = self._llm_keywords(text)
+            return self._keywords_result(keywords, engine, response)
+        except Exception as e:
+            logger.error(f"Error in extract_keywords: {str(e)}")
             return extract_keywordsResults(
-                keywords=keywords,
-                status=Status.SUCCESS
+                keywords=[],
+                status=Status.ERROR
             )
+
+    @timed(SERVICE_LATENCY, operation="extract_keywords")
+    async def aextract_keywords(self, text: str, keyword_engine: Optional[str] = None) -> extract_keywordsResults:
+        """Async variant of extract_keywords"""
+        try:
+            text = self._preprocess(text, "extract_keywords")
+            engine = keyword_engine or app_settings.KEYWORD_ENGINE
+            response = ""
+            if engine == "local":
+                keywords = get_keyword_extractor().extract(text, top_k=MAX_KEYWORDS)
+            elif engine == "hybrid":
+                keywords = await self._arerank_keywords(text)
+            else:
+                keywords, response = await self._allm_keywords(text)
+            return self._keywords_result(keywords, engine, response)
         except Exception as e:
             logger.error(f"Error in extract_keywords: {str(e)}")
             return extract_keywordsResults(
@@ -104,41 +564,94 @@ class TextProcessingService:
                 status=Status.ERROR
             )
 
-    def process(self, text: str) -> processResults:
+    def _prepare_process(self, text: str, mode: Optional[str]) -> Tuple[str, str, int]:
+        """
+        The validated article, the text of a single-call prompt and the tokens it removed.
+
+        PROCESS_TOKEN_BUDGET only applies to the single combined call; in multi
+        mode the per-field methods get the article and apply their own budgets.
+        """
+        text = self._validate_text(text)
+        if (mode or app_settings.PROCESS_MODE) != "single":
+            return text, text, 0
+        return (text, *self._prepare(text, "process"))
+
+    def _use_single_call(self, text: str, mode: Optional[str]) -> bool:
+        # The combined prompt carries the whole article, so long articles take the chunked per-field path
+        return (mode or app_settings.PROCESS_MODE) == "single" and len(self._split(text)) == 1
+
+    def _process_result(self, results: Dict[str, BaseModel]) -> processResults:
+        summary_result = results["summarize"]
+        category_result = results["categorize"]
+        keywords_result = results["extract_keywords"]
+        
+        # Check if any of the individual calls failed
+        if (summary_result.status == Status.ERROR or 
+            category_result.status == Status.ERROR or 
+            keywords_result.status == Status.ERROR):
+            logger.warning("One or more sub-tasks failed during process")
+            
+            # Determine overall status (ERROR if any critical component failed)
+            if summary_result.status == Status.ERROR:
+                raise ValueError("Failed to generate summary")
+        
+        # Combine results from all three methods
+        return processResults(
+            summary=summary_result.summary,
+            category=category_result.category,
+            keywords=keywords_result.keywords[:MAX_KEYWORDS],
+            status=Status.SUCCESS
+        )
+
+    @timed(SERVICE_LATENCY, operation="process")
+    def process(self, text: str, mode: Optional[str] = None, keyword_engine: Optional[str] = None) -> processResults:
         """
         Process text by calling summarize, categorize, and extract_keywords methods.
         
         Args:
             text (str): The text to process
+            mode (str): "multi" for one LLM call per field or "single" for one combined
+                call; defaults to PROCESS_MODE
+            keyword_engine (str): Keyword engine passed to extract_keywords; defaults to KEYWORD_ENGINE
             
         Returns:
             processResults: A combined result with summary, category, and keywords
         """
         try:
-            text = self._validate_text(text)
-            
-            # Call individual methods instead of trying to do everything in one LLM call
-            summary_result = self.summarize(text)
-            category_result = self.categorize(text)
-            keywords_result = self.extract_keywords(text)
-            
-            # Check if any of the individual calls failed
-            if (summary_result.status == Status.ERROR or 
-                category_result.status == Status.ERROR or 
-                keywords_result.status == Status.ERROR):
-                logger.warning("One or more sub-tasks failed during process")
-                
-                # Determine overall status (ERROR if any critical component failed)
-                if summary_result.status == Status.ERROR:
-                    raise ValueError("Failed to generate summary")
-            
-            # Combine results from all three methods
+            text, prepared, removed = self._prepare_process(text, mode)
+            if self._use_single_call(prepared, mode):
+                record_preprocessing(removed)
+                results = self._run_single_call(prepared, keyword_engine, source=text)
+            else:
+                # Call individual methods instead of trying to do everything in one LLM call
+                results = self._run_sub_tasks(text, keyword_engine=keyword_engine)
+            return self._process_result(results)
+        except Exception as e:
+            logger.error(f"Error in process: {str(e)}")
             return processResults(
-                summary=summary_result.summary,
-                category=category_result.category,
-                keywords=keywords_result.keywords[:10],
-                status=Status.SUCCESS
-            )
+                summary="",
+                category="",
+                keywords=[],
+                status=Status.ERROR
+        )
+
+    @timed(SERVICE_LATENCY, operation="process")
+    async def aprocess(self, text: str, mode: Optional[str] = None,
+                       keyword_engine: Optional[str] = None) -> processResults:
+        """
+        Async variant of process.
+
+        The LLM calls of one article, and of as many articles as the caller
+        runs concurrently, share a single event loop instead of a thread each.
+        """
+        try:
+            text, prepared, removed = self._prepare_process(text, mode)
+            if self._use_single_call(prepared, mode):
+                record_preprocessing(removed)
+                results = await self._arun_single_call(prepared, keyword_engine, source=text)
+            else:
+                results = await self._arun_sub_tasks(text, keyword_engine=keyword_engine)
+            return self._process_result(results)
         except Exception as e:
             logger.error(f"Error in process: {str(e)}")
             return processResults(
@@ -0,0 +1,247 @@
+import time
+import logging
+import threading
+import contextlib
+import contextvars
+import functools
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from redis import Redis
+from src.configs.app import app_settings
+
+logger = logging.getLogger(__name__)
+
+# Token counts kept per (operation, provider, model)
+USAGE_FIELDS = ("calls", "input_tokens", "output_tokens", "cached_tokens")
+GROUP_DIMENSIONS = ("tenant", "operation", "provider", "model")
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_prices(spec: str) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    prices = {}
+    for entry in filter(None, (item.strip() for item in spec.split(","))):
+        try:
+            name, _, rates = entry.partition("=")
+            provider, _, model = name.strip().partition(":")
+            input_rate, _, output_rate = rates.partition("/")
+            prices[(provider, model)] = (float(input_rate), float(output_rate or input_rate))
+        except ValueError:
+            logger.error(f"Ignoring malformed LLM_TOKEN_PRICES entry: {entry}")
+    return prices
+
+
+def token_cost(provider: str, model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """USD cost from LLM_TOKEN_PRICES, or None when no price is configured for the model"""
+    prices = _parse_prices(app_settings.LLM_TOKEN_PRICES)
+    rates = prices.get((provider, model)) or prices.get((provider, ""))
+    if rates is None:
+        return None
+    return (input_tokens * rates[0] + output_tokens * rates[1]) / 1_000_000
+
+
+def _with_cost(row: Dict[str, Any], provider: str, model: str) -> Dict[str, Any]:
+    cost = token_cost(provider, model, row["input_tokens"], row["output_tokens"])
+    row["cost_usd"] = round(cost, 6) if cost is not None else None
+    return row
+
+
+class UsageTracker:
+    """
+    Token usage of the LLM calls made while handling one request.
+
+    Calls record into the tracker of their context (see ``track_usage``), so
+    sub-tasks, chunk calls and hedges running in other threads or on the
+    event loop add to the request that started them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        self.estimated = False
+        # Estimated article tokens preprocessing kept out of the prompts
+        self.tokens_removed = 0
+
+    def add(self, provider: str, model: str, operation: str, input_tokens: int, output_tokens: int,
+            cached_tokens: int = 0, estimated: bool = False, calls: int = 1) -> None:
+        with self._lock:
+            entry = self.entries.setdefault((operation, provider, model), dict.fromkeys(USAGE_FIELDS, 0))
+            entry["calls"] += calls
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            entry["cached_tokens"] += cached_tokens
+            self.estimated = self.estimated or estimated
+
+    def add_removed(self, tokens: int) -> None:
+        with self._lock:
+            self.tokens_removed += tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Totals and a per-call-operation breakdown, as attached to task results"""
+        with self._lock:
+            entries = [(key, dict(entry)) for key, entry in self.entries.items()]
+        breakdown = [
+            _with_cost({"operation": operation, "provider": provider, "model": model, **entry}, provider, model)
+            for (operation, provider, model), entry in entries
+        ]
+        totals = {field: sum(row[field] for row in breakdown) for field in USAGE_FIELDS}
+        costs = [row["cost_usd"] for row in breakdown]
+        return {
+            **totals,
+            "total_tokens": totals["input_tokens"] + totals["output_tokens"],
+            "cost_usd": round(sum(costs), 6) if None not in costs else None,
+            # True when a provider reported no usage and the counts are local estimates
+            "estimated": self.estimated,
+            "preprocess_tokens_removed": self.tokens_removed,
+            "breakdown": breakdown,
+        }
+
+
+_current: contextvars.ContextVar[Optional[UsageTracker]] = contextvars.ContextVar("llm_usage", default=None)
+
+
+@contextlib.contextmanager
+def track_usage(tracker: Optional[UsageTracker] = None) -> Iterator[UsageTracker]:
+    """
+    Collect the usage of every LLM call made in this context until the block exits.
+
+    Passing the same ``tracker`` to several blocks adds their calls together,
+    e.g. for a stream whose fragments are read from different tasks.
+    """
+    tracker = tracker or UsageTracker()
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+
+def record_usage(provider: str, model: str, operation: str, input_tokens: int, output_tokens: int,
+                 cached_tokens: int = 0, estimated: bool = False) -> None:
+    """Add one call's usage to the tracker of the current context, if any"""
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.add(provider, model, operation, input_tokens, output_tokens, cached_tokens, estimated)
+
+
+def record_preprocessing(tokens_removed: int) -> None:
+    """Add the tokens preprocessing removed from one prompt's article to the current context's tracker"""
+    tracker = _current.get()
+    if tracker is not None and tokens_removed:
+        tracker.add_removed(tokens_removed)
+
+
+def submit_in_context(executor: Executor, fn: Callable, *args: Any) -> Future:
+    """
+    ``executor.submit`` that runs ``fn`` in a copy of the caller's context.
+
+    Pool threads don't inherit context variables, so calls made in them would
+    not reach the request's usage tracker otherwise.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+class UsageLedger:
+    """
+    Daily token usage totals per tenant, request operation, provider and model.
+
+    Each UTC day is one Redis hash with fields
+    ``tenant|operation|provider|model|field``, plus a hash counting requests
+    per ``tenant|operation``. Days expire after USAGE_RETENTION_DAYS. Redis
+    errors are logged and never fail a task.
+    """
+
+    def __init__(self, redis: Redis, retention_days: Optional[int] = None, prefix: str = "usage"):
+        self.redis = redis
+        self.retention = (retention_days or app_settings.USAGE_RETENTION_DAYS) * 86400
+        self.prefix = prefix
+
+    def _day(self, at: Optional[float] = None) -> str:
+        return time.strftime("%Y-%m-%d", time.gmtime(at if at is not None else time.time()))
+
+    def record(self, tenant: str, operation: str, tracker: UsageTracker) -> None:
+        day = self._day()
+        # Fields are "|"-separated, so tenant names can't contain one
+        tenant = tenant.replace("|", "_")
+        tokens_key, requests_key = f"{self.prefix}:{day}", f"{self.prefix}:{day}:requests"
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hincrby(requests_key, f"{tenant}|{operation}", 1)
+            for (_, provider, model), entry in tracker.entries.items():
+                for field in USAGE_FIELDS:
+                    if entry[field]:
+                        pipe.hincrby(tokens_key, f"{tenant}|{operation}|{provider}|{model}|{field}", entry[field])
+            pipe.expire(tokens_key, self.retention)
+            pipe.expire(requests_key, self.retention)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Usage ledger update failed: {str(e)}")
+
+    @staticmethod
+    def _row(rows: Dict[Tuple[str, ...], Dict[str, Any]], values: Dict[str, str],
+             group_by: Sequence[str]) -> Dict[str, Any]:
+        key = tuple(values[dimension] for dimension in group_by)
+        if key not in rows:
+            rows[key] = {**{d: values[d] for d in group_by}, **dict.fromkeys(USAGE_FIELDS, 0), "cost_usd": 0.0}
+        return rows[key]
+
+    def report(self, days: int = 1, tenant: Optional[str] = None,
+               group_by: Sequence[str] = ("tenant", "operation")) -> Dict[str, Any]:
+        """
+        Sum the last ``days`` UTC days, grouped by the given dimensions.
+
+        Request counts are per tenant and operation, so rows only carry
+        ``requests`` (and per-request averages) when not grouped by provider or model.
+
+        Returns:
+            Dict: The days covered, one row per group and the overall totals
+        """
+        now = time.time()
+        day_names = [self._day(now - offset * 86400) for offset in range(max(1, days))]
+        pipe = self.redis.pipeline(transaction=False)
+        for day in day_names:
+            pipe.hgetall(f"{self.prefix}:{day}")
+            pipe.hgetall(f"{self.prefix}:{day}:requests")
+        raw = pipe.execute()
+
+        rows: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        requests: Dict[Tuple[str, str], int] = {}
+        for tokens, counts in zip(raw[::2], raw[1::2]):
+            for field, value in tokens.items():
+                row_tenant, operation, provider, model, name = field.decode().split("|")
+                if tenant is not None and row_tenant != tenant:
+                    continue
+                values = dict(zip(GROUP_DIMENSIONS, (row_tenant, operation, provider, model)))
+                row = self._row(rows, values, group_by)
+                row[name] += int(value)
+                if name in ("input_tokens", "output_tokens") and row["cost_usd"] is not None:
+                    cost = token_cost(provider, model, int(value) if name == "input_tokens" else 0,
+                                      int(value) if name == "output_tokens" else 0)
+                    row["cost_usd"] = None if cost is None else row["cost_usd"] + cost
+            for field, value in counts.items():
+                row_tenant, operation = field.decode().split("|")
+                if tenant is None or row_tenant == tenant:
+                    requests[(row_tenant, operation)] = requests.get((row_tenant, operation), 0) + int(value)
+
+        with_requests = not {"provider", "model"} & set(group_by)
+        if with_requests:
+            # Requests that made no model call (cache hits, local engines) still count
+            for row_tenant, operation in requests:
+                self._row(rows, {"tenant": row_tenant, "operation": operation}, group_by)
+        result_rows: List[Dict[str, Any]] = []
+        for row in rows.values():
+            row["total_tokens"] = row["input_tokens"] + row["output_tokens"]
+            if row["cost_usd"] is not None:
+                row["cost_usd"] = round(row["cost_usd"], 6)
+            if with_requests:
+                count = sum(n for (t, o), n in requests.items()
+                            if row.get("tenant", t) == t and row.get("operation", o) == o)
+                row["requests"] = count
+                row["tokens_per_request"] = round(row["total_tokens"] / count, 1) if count else None
+            result_rows.append(row)
+        result_rows.sort(key=lambda row: -row["total_tokens"])
+
+        totals = {field: sum(row[field] for row in result_rows) for field in (*USAGE_FIELDS, "total_tokens")}
+        costs = [row["cost_usd"] for row in result_rows]
+        totals["cost_usd"] = round(sum(costs), 6) if None not in costs else None
+        totals["requests"] = sum(requests.values())
+        return {"days": day_names, "group_by": list(group_by), "rows": result_rows, "totals": totals}
@@ -1,6 +1,6 @@
 from typing import List, Dict, Any, Optional, Union
-from pydantic import BaseModel, Field, create_model
-from src.schemas.model import Status
+from pydantic import BaseModel, Field, create_model, field_validator, model_validator
+from src.schemas.model import Status, Category
 
 
 class Inputs(BaseModel):
@@ -29,7 +29,61 @@ class processResults(BaseModel):
     status: Status
 
 
-
-
-
-
+class taskResults(BaseModel):
+    # Stored payload of every text task: the processResults fields the operation
+    # produces (None fields are dropped when stored), a flat status and its message
+    summary: Optional[str] = None
+    category: Optional[str] = None
+    keywords: Optional[List[str]] = None
+    status: Status
+    message: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+    duplicate_of: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _flatten_legacy_status(cls, value: Any) -> Any:
+        # Results stored before the normalization nest the status as
+        # {"Status": ..., "Status Message": ...}, sometimes keyed "Status "
+        if isinstance(value, dict) and isinstance(value.get("status"), dict):
+            legacy = value["status"]
+            value = dict(value, status=legacy.get("Status", legacy.get("Status ", Status.ERROR)))
+            value.setdefault("message", legacy.get("Status Message"))
+        return value
+
+    def to_payload(self) -> Dict[str, Any]:
+        return self.model_dump(mode="json", exclude_none=True)
+
+
+class processLLMOutput(BaseModel):
+    # Fields parsed from a single-call process response; invalid or missing fields are None
+    summary: Optional[str] = None
+    category: Optional[Category] = None
+    keywords: Optional[List[str]] = None
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _check_summary(cls, value: Any) -> Optional[str]:
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return value.strip()
+
+    @field_validator("category", mode="before")
+    @classmethod
+    def _check_category(cls, value: Any) -> Optional[Category]:
+        if not isinstance(value, str):
+            return None
+        for category in Category:
+            if value.strip().lower() == category.value.lower():
+                return category
+        return None
+
+    @field_validator("keywords", mode="before")
+    @classmethod
+    def _check_keywords(cls, value: Any) -> Optional[List[str]]:
+        if isinstance(value, str):
+            value = value.split(",")
+        if not isinstance(value, list):
+            return None
+        keywords = [str(k).strip() for k in value if isinstance(k, (str, int, float)) and str(k).strip()]
+        return keywords or None
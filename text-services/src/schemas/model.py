@@ -6,4 +6,12 @@ class Status(str, Enum):
     ERROR = "ERROR"
 
 
+class Category(str, Enum):
+    TECHNOLOGY = "Technology"
+    SPORTS = "Sports"
+    HEALTH = "Health"
+    POLITICS = "Politics"
+    FINANCE = "Finance"
+    BUSINESS = "Business"
+
 
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Literal
 from pydantic import BaseModel, Field, create_model
 from src.schemas.model import Status
 
@@ -6,6 +6,13 @@ from src.schemas.model import Status
 # Input/Output models
 class TextRequest(BaseModel):
     text: str
+    # interactive requests are queued ahead of bulk work
+    priority: Literal["interactive", "bulk"] = "interactive"
+
+
+class KeywordRequest(TextRequest):
+    # Per-request override of KEYWORD_ENGINE
+    keyword_engine: Optional[Literal["llm", "local", "hybrid"]] = None
 
 
 class TaskResponse(BaseModel):
@@ -16,3 +23,28 @@ class TaskResult(BaseModel):
     status: str
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    articles: List[TextRequest] = Field(..., min_length=1)
+    operation: Literal["summarize", "categorize", "extract_keywords", "process"] = "process"
+    keyword_engine: Optional[Literal["llm", "local", "hybrid"]] = None
+    priority: Literal["interactive", "bulk"] = "bulk"
+    # offline: collected into provider batch jobs (cheaper, results within hours)
+    execution: Literal["online", "offline"] = "online"
+
+
+class BatchResponse(BaseModel):
+    batch_id: str
+    task_ids: List[str]
+    status: str = "Pending"
+
+
+class BatchStatus(BaseModel):
+    batch_id: str
+    total: int
+    pending: int
+    started: int
+    successful: int
+    failed: int
+    completed: bool
@@ -0,0 +1,48 @@
+import fakeredis
+import pytest
+from celery import states
+from celery.backends.redis import RedisBackend
+from celery.result import AsyncResult, GroupResult
+
+from src.app.worker import batch
+from src.app.worker.task import app, task_payload
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = RedisBackend(app=app, url="redis://localhost/0")
+    backend.client = fakeredis.FakeRedis()
+    monkeypatch.setattr(app._local, "backend", backend, raising=False)
+    return backend
+
+
+def save_batch(backend, *metas):
+    results = []
+    for index, (state, result) in enumerate(metas):
+        task_id = f"task-{index}"
+        if state is not None:
+            backend.store_result(task_id, result, state)
+        results.append(AsyncResult(task_id, app=app))
+    group_result = GroupResult("batch-1", results, app=app)
+    group_result.save(backend=backend)
+    return group_result.id
+
+
+def test_error_payloads_count_as_failed(backend):
+    batch_id = save_batch(
+        backend,
+        (states.SUCCESS, task_payload("SUCCESS", "summary")),
+        (states.SUCCESS, task_payload("ERROR", "upstream failed")),
+        (states.FAILURE, RuntimeError("worker crashed")),
+        (states.STARTED, None),
+        (None, None),
+    )
+
+    status = batch.get_batch_status(batch_id)
+
+    assert (status.successful, status.failed, status.started, status.pending) == (1, 2, 1, 1)
+    assert not status.completed
+
+
+def test_unknown_batch(backend):
+    assert batch.get_batch_status("missing") is None
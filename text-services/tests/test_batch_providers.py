@@ -0,0 +1,54 @@
+import fakeredis
+from langchain_core.messages import AIMessage
+
+from src.configs.app import app_settings
+from src.modules.batch_providers import LangChainBatchProvider
+from src.modules.model_factory import LLMClient
+from src.modules.resilience import CircuitBreaker
+
+
+class EchoLLM:
+    def __init__(self, fail_on: str = ""):
+        self.fail_on = fail_on
+
+    def invoke(self, messages):
+        text = "".join(block["text"] for block in messages[-1].content)
+        if self.fail_on and self.fail_on in text:
+            raise ConnectionError("reset by peer")
+        return AIMessage(content="answer", usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7})
+
+
+class Backend:
+    def __init__(self, llm):
+        self.provider = "ollama"
+        self.model_name = "model"
+        self.llm = llm
+        self.rate_limiter = None
+        self.breaker = CircuitBreaker("ollama:model", failure_threshold=1, cooldown=60)
+
+
+def make_provider(llm) -> LangChainBatchProvider:
+    client = LLMClient.__new__(LLMClient)
+    client.system_prompt = None
+    client.hedger = None
+    client.backends = [Backend(llm)]
+    provider = LangChainBatchProvider.__new__(LangChainBatchProvider)
+    provider.client = client
+    provider.redis = fakeredis.FakeRedis()
+    return provider
+
+
+def test_calls_go_through_the_client(monkeypatch):
+    monkeypatch.setattr(app_settings, "TASK_RETRY_COUNT", 0)
+    monkeypatch.setattr(app_settings, "OFFLINE_BATCH_CONCURRENCY", 1)
+    provider = make_provider(EchoLLM(fail_on="second"))
+
+    job_id = provider.submit([("a", "Summarize.", "first"), ("b", "Summarize.", "second"), ("c", "Summarize.", "third")],
+                             operation="summarize")
+    assert provider.poll(job_id)
+    results = provider.results(job_id)
+
+    assert results["a"] == ("answer", {"calls": [["ollama", "model", 1, 5, 2, 0]], "estimated": False})
+    assert results["b"] is None
+    # The failure opened the breaker, so the next request was never sent
+    assert results["c"] is None
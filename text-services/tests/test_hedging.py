@@ -0,0 +1,35 @@
+import threading
+import time
+
+from src.modules.hedging import Hedger
+
+
+def test_submit_runs_on_a_free_thread():
+    hedger = Hedger(threads=1)
+    future = hedger.submit(lambda: threading.current_thread().name)
+    assert future.result(timeout=1).startswith("llm-hedge")
+
+
+def test_submit_never_queues_on_a_saturated_pool():
+    hedger = Hedger(threads=2)
+    release = threading.Event()
+    busy = [hedger.submit(release.wait) for _ in range(2)]
+    assert all(busy)
+    # The caller makes the call itself instead of waiting for a thread
+    assert hedger.submit(lambda: "answer") is None
+
+    release.set()
+    # Threads free up once the done callbacks have run, just after the results
+    deadline = time.monotonic() + 1
+    future = None
+    while future is None and time.monotonic() < deadline:
+        future = hedger.submit(lambda: "answer")
+    assert future.result(timeout=1) == "answer"
+
+
+def test_delay_needs_samples():
+    hedger = Hedger(percentile=50, min_delay=0.1)
+    assert hedger.delay("key") is None
+    for latency in range(1, 21):
+        hedger.record("key", latency / 10)
+    assert 1.0 <= hedger.delay("key") <= 1.1
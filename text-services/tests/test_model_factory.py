@@ -0,0 +1,171 @@
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.configs.app import app_settings
+from src.modules.hedging import MIN_SAMPLES, Hedger
+from src.modules.model_factory import LLMClient
+from src.modules.resilience import CircuitBreaker, is_client_error
+from src.modules.usage import track_usage
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class BadRequestError(Exception):
+    """Named like the OpenAI/Anthropic 400 exceptions"""
+
+
+class ScriptedLLM:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return AIMessage(content=outcome)
+
+    def stream(self, messages):
+        # A string streams word by word with usage on the last chunk; a list streams until its error
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, list):
+            yield AIMessageChunk(content=outcome[0])
+            raise outcome[1]
+        for word in outcome.split():
+            yield AIMessageChunk(content=word + " ")
+        yield AIMessageChunk(content="", usage_metadata={"input_tokens": 7, "output_tokens": 3, "total_tokens": 10})
+
+
+class Backend:
+    def __init__(self, provider: str, llm: ScriptedLLM):
+        self.provider = provider
+        self.model_name = "model"
+        self.llm = llm
+        self.rate_limiter = None
+        self.breaker = CircuitBreaker(f"{provider}:model", failure_threshold=1, cooldown=60)
+
+
+def make_client(*backends) -> LLMClient:
+    client = LLMClient.__new__(LLMClient)
+    client.system_prompt = None
+    client.hedger = None
+    client.backends = list(backends)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(app_settings, "TASK_RETRY_COUNT", 2)
+    monkeypatch.setattr(app_settings, "TASK_RETRY_BACKOFF", 0)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (StatusError(400), True),
+    (StatusError(401), True),
+    (StatusError(429), False),
+    (StatusError(408), False),
+    (StatusError(503), False),
+    (BadRequestError("bad"), True),
+    (ValueError("This model's maximum context length is 8192 tokens"), True),
+    (TimeoutError("read timed out"), False),
+    (ConnectionError("reset by peer"), False),
+])
+def test_is_client_error(error, expected):
+    assert is_client_error(error) is expected
+
+
+def test_client_error_is_raised_without_retry_failover_or_breaker_failure():
+    primary = Backend("primary", ScriptedLLM(BadRequestError("prompt is too long")))
+    fallback = Backend("fallback", ScriptedLLM("unused"))
+    with pytest.raises(BadRequestError):
+        make_client(primary, fallback).query("prompt")
+    assert primary.llm.calls == 1
+    assert fallback.llm.calls == 0
+    assert primary.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_server_error_trips_breaker_and_fails_over():
+    primary = Backend("primary", ScriptedLLM(StatusError(503)))
+    fallback = Backend("fallback", ScriptedLLM("answer"))
+    assert make_client(primary, fallback).query("prompt") == "answer"
+    assert primary.breaker.state == CircuitBreaker.OPEN
+
+
+def test_timeouts_are_retried():
+    backend = Backend("primary", ScriptedLLM(TimeoutError("timed out"), "answer"))
+    backend.breaker.failure_threshold = 5
+    assert make_client(backend).query("prompt") == "answer"
+    assert backend.llm.calls == 2
+
+
+def test_stream_fails_over_before_the_first_fragment():
+    primary = Backend("primary", ScriptedLLM(StatusError(503)))
+    fallback = Backend("fallback", ScriptedLLM("a streamed answer"))
+    with track_usage() as usage:
+        text = "".join(make_client(primary, fallback).stream_query("prompt", operation="summarize"))
+    assert text == "a streamed answer "
+    assert primary.breaker.state == CircuitBreaker.OPEN
+    assert fallback.breaker.state == CircuitBreaker.CLOSED
+    assert usage.to_dict()["input_tokens"] == 7 and not usage.estimated
+
+
+def test_stream_error_after_first_fragment_is_raised():
+    primary = Backend("primary", ScriptedLLM(["partial ", StatusError(503)]))
+    fallback = Backend("fallback", ScriptedLLM("unused"))
+    fragments = make_client(primary, fallback).stream_query("prompt")
+    assert next(fragments) == "partial "
+    with pytest.raises(StatusError):
+        next(fragments)
+    assert fallback.llm.calls == 0
+
+
+def test_stream_closed_early_records_estimated_usage():
+    backend = Backend("primary", ScriptedLLM("one two three four"))
+    with track_usage() as usage:
+        fragments = make_client(backend).stream_query("prompt")
+        assert next(fragments) == "one "
+        fragments.close()
+    assert usage.estimated and usage.to_dict()["calls"] == 1
+    assert backend.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_query_timeout_covers_every_round_of_the_chain(monkeypatch):
+    monkeypatch.setattr(app_settings, "LLM_REQUEST_TIMEOUT", 60)
+    monkeypatch.setattr(app_settings, "LLM_RETRY_MAX_BACKOFF", 10.0)
+    client = make_client(Backend("primary", ScriptedLLM()), Backend("fallback", ScriptedLLM()))
+    # Three rounds over two providers, and two backoffs
+    assert client.query_timeout() == 3 * 2 * 60 + 2 * 10
+
+
+def test_saturated_hedge_pool_runs_the_call_inline():
+    client = make_client(Backend("openai", ScriptedLLM("answer")))
+    client.hedger = Hedger(min_delay=0.01, threads=1)
+    for _ in range(MIN_SAMPLES):
+        client.hedger.record(("openai", "model", "query"), 0.01)
+    release = threading.Event()
+    busy = client.hedger.submit(release.wait)
+
+    assert client.query("prompt") == "answer"
+    release.set()
+    busy.result(timeout=1)
+
+
+def test_stream_sends_the_prefix_first():
+    llm = ScriptedLLM("short answer")
+    seen = []
+    stream = llm.stream
+    llm.stream = lambda messages: seen.append(messages) or stream(messages)
+    client = make_client(Backend("openai", llm))
+
+    assert "".join(client.stream_query("Summarize.", prefix="Article: text")) == "short answer "
+    assert [block["text"] for block in seen[0][-1].content] == ["Article: text", "Summarize."]
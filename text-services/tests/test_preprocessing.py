@@ -0,0 +1,106 @@
+import pytest
+
+from src.modules.preprocessing import _is_boilerplate, clean_text
+
+ARTICLE_SENTENCES = [
+    "Copyright law reform passed the Senate on Tuesday by a vote of 62 to 38.",
+    "More from the ministry is expected on Friday, officials said.",
+    "Trending now among investors is a shift toward short-dated Treasury bills.",
+    "Related: the central bank said it would hold rates steady through the summer.",
+    "Video: Protesters gathered outside parliament as the vote was counted.",
+    "Photo: The finance minister arrives at the summit in Brussels on Monday morning.",
+    "Recommended reading lists from the ministry now include three climate novels.",
+    "Click here, the prosecutor said, was the button the defendant pressed to approve each transfer of funds.",
+    "The EU cookie policy rules forced publishers to redesign their consent banners.",
+    "Share prices on the exchange fell 3% after the announcement.",
+    "Home prices rose 4% in March, the fastest pace since 2022.",
+]
+
+BOILERPLATE_LINES = [
+    "Sign up for our daily newsletter",
+    "Share this article",
+    "Advertisement",
+    "Related articles",
+    "Read more:",
+    "More from Reuters",
+    "Trending now",
+    "© 2024 News Corp. All rights reserved.",
+    "Copyright 2023 The Associated Press",
+    "We use cookies to improve your experience. By continuing you agree to our policy.",
+    "Accept all cookies",
+    "Photo credit: Jane Doe/Reuters",
+    "(Image: Getty)",
+    "Home | World | Business | Sports",
+]
+
+
+@pytest.mark.parametrize("line", ARTICLE_SENTENCES)
+def test_article_sentences_are_kept(line):
+    assert not _is_boilerplate(line)
+
+
+@pytest.mark.parametrize("line", BOILERPLATE_LINES)
+def test_boilerplate_lines_are_dropped(line):
+    assert _is_boilerplate(line)
+
+
+def test_clean_text_keeps_the_article():
+    article = "\n".join(["Advertisement", *ARTICLE_SENTENCES, "Share this article", "Related articles"])
+    assert clean_text(article) == " ".join(ARTICLE_SENTENCES)
+
+
+class ProcessSpy:
+    """Stands in for the LLM paths of TextProcessingService.process and records the text each one gets"""
+
+    def __init__(self, service):
+        self.calls = {}
+        service._run_single_call = lambda text, keyword_engine=None, source=None: self._record("single", text, source)
+        service._run_sub_tasks = lambda text, operations=None, keyword_engine=None: self._record("multi", text)
+
+    def _record(self, path, text, source=None):
+        from src.schemas.ioSchema import categoryResults, extract_keywordsResults, summarizeResult
+        from src.schemas.model import Status
+        self.calls[path] = (text, source)
+        return {
+            "summarize": summarizeResult(summary="s", status=Status.SUCCESS),
+            "categorize": categoryResults(category="Technology", status=Status.SUCCESS),
+            "extract_keywords": extract_keywordsResults(keywords=["k"], status=Status.SUCCESS),
+        }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    from src.configs.app import app_settings
+    from src.modules.text_processing_services import TextProcessingService
+    monkeypatch.setattr(app_settings, "PREPROCESS_ENABLED", True)
+    monkeypatch.setattr(app_settings, "PROCESS_TOKEN_BUDGET", 20)
+    monkeypatch.setattr(app_settings, "CHUNKING_ENABLED", False)
+    return TextProcessingService.__new__(TextProcessingService)
+
+
+LONG_ARTICLE = "\n\n".join(ARTICLE_SENTENCES * 3)
+
+
+def test_process_budget_only_trims_the_single_call(service, monkeypatch):
+    from src.configs.app import app_settings
+    from src.modules.usage import track_usage
+    monkeypatch.setattr(app_settings, "PROCESS_MODE", "single")
+    spy = ProcessSpy(service)
+    with track_usage() as usage:
+        service.process(LONG_ARTICLE)
+    prompt_text, source = spy.calls["single"]
+    assert len(prompt_text) < len(LONG_ARTICLE)
+    # Fill-in calls get the article before the process budget
+    assert source == LONG_ARTICLE
+    assert usage.to_dict()["preprocess_tokens_removed"] > 0
+
+
+def test_multi_mode_passes_the_article_unchanged(service, monkeypatch):
+    from src.configs.app import app_settings
+    from src.modules.usage import track_usage
+    monkeypatch.setattr(app_settings, "PROCESS_MODE", "multi")
+    spy = ProcessSpy(service)
+    with track_usage() as usage:
+        service.process(LONG_ARTICLE)
+    assert spy.calls["multi"][0] == LONG_ARTICLE
+    assert usage.tokens_removed == 0
@@ -0,0 +1,71 @@
+import fakeredis
+import pytest
+
+from src.modules.rate_limiter import ProviderRateLimiter
+
+
+class RateLimitError(Exception):
+    """Named like the OpenAI/Anthropic 429 exceptions"""
+
+
+@pytest.fixture
+def limiter():
+    redis = fakeredis.FakeRedis()
+    limiter = ProviderRateLimiter(redis, "fake", "model", min_concurrency=1, max_concurrency=16, max_wait=1)
+    redis.hset(limiter.state_key, "limit", 10)
+    return limiter
+
+
+def test_default_lease_ttl_claims_a_slot(limiter):
+    lease = limiter._acquire(0)
+    assert lease is not None
+    assert limiter.state()["in_flight"] == 1
+    assert 0 < limiter.redis.ttl(limiter.leases_key) <= 120
+
+
+def test_fractional_lease_ttl_is_rounded_up(limiter):
+    limiter.lease_ttl = 0.5
+    assert limiter._acquire(0) is not None
+    assert limiter.redis.ttl(limiter.leases_key) == 1
+
+
+def test_burst_of_429s_cuts_the_limit_once(limiter):
+    leases = [limiter._acquire(0) for _ in range(8)]
+    for lease in leases:
+        limiter._release_slot(lease, 0.2, True)
+    state = limiter.state()
+    assert state["limit"] == pytest.approx(7.0)
+    assert state["in_flight"] == 0
+
+
+def test_429s_within_one_round_trip_count_once(limiter):
+    # With a 1s baseline, fast 429s in quick succession are one overload signal
+    limiter.redis.hset(limiter.state_key, "baseline", 1.0)
+    for _ in range(4):
+        with pytest.raises(RateLimitError):
+            with limiter.slot(0):
+                raise RateLimitError("429 rate limit exceeded")
+    assert limiter.state()["limit"] == pytest.approx(7.0)
+
+
+def test_other_failures_only_free_the_slot(limiter):
+    with pytest.raises(ValueError):
+        with limiter.slot(0):
+            raise ValueError("bad request")
+    state = limiter.state()
+    assert state["limit"] == pytest.approx(10.0)
+    assert state["in_flight"] == 0
+
+
+def test_success_grows_the_limit(limiter):
+    with limiter.slot(0):
+        pass
+    assert limiter.state()["limit"] == pytest.approx(10.1)
+
+
+def test_token_bucket_waits_when_empty(limiter):
+    assert float(limiter._take_script(keys=[limiter.tokens_key], args=[60, 1, 60, 0])) == 0
+    wait = float(limiter._take_script(keys=[limiter.tokens_key], args=[60, 1, 30, 0]))
+    assert wait == pytest.approx(30, abs=0.5)
+    # Forced takes never wait and may leave the bucket in debt
+    assert float(limiter._take_script(keys=[limiter.tokens_key], args=[60, 1, 30, 1])) == 0